@@ -0,0 +1,195 @@
+"""
+Measures what one score tap costs, path by path.
+
+Run from the repository root (no display or Kivy needed):
+
+    python -m benchmarks.hot_paths
+    python -m benchmarks.hot_paths --json --output before.json     # save results
+    python -m benchmarks.hot_paths --compare before.json           # ratios against a saved run
+    python -m benchmarks.hot_paths --clients 1,10,100              # skip the 1000-client case
+
+Each benchmark runs the same calls as the app method it is named after, on the
+same objects (`SnapshotStore`, `SaveScheduler`, `GameJournal`, `GameState`,
+`WebSocketServer`), without building the Kivy app:
+
+- `get_game_state`: `ScorerApp.get_game_state`, the web threads' read.
+- `save_game_state`: the Kivy thread's part of `ScorerApp.save_game_state`
+  (publish a snapshot and hand it to the save scheduler; broadcast excluded).
+- `save_write`: the save scheduler's background write (one journal record).
+- `load_game_state`: `ScorerApp.load_game_state` from a snapshot plus a
+  journal tail of 100 records.
+- `update_timer_display`: the clock arithmetic and formatting done by
+  `ScorerRootWidget.update_timer_display` each second (label updates excluded).
+- `broadcast_game_state[N]`: `WebSocketServer.broadcast_game_state` after a
+  score change with N observers connected through the Socket.IO test client
+  (projection, diff, one encode, per-client dispatch; no network).
+- `encode_state[backend]`: encoding the full state dict for a snapshot.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import timing
+from persistence.journal import GameJournal
+from persistence.save_scheduler import SaveScheduler
+from state.model import GameState, format_hms
+from state.serialization import available_serializers, get_serializer
+from state.snapshot import SnapshotStore
+
+DEFAULT_CLIENT_COUNTS = (1, 10, 100, 1000)
+
+
+def _game_in_progress():
+    gs = GameState()
+    gs.players[1].name = "Blue Commander"
+    gs.players[2].name = "Red Warlord"
+    gs.game_phase = "game_play"
+    gs.current_round = 3
+    gs.active_player_id = 1
+    gs.first_turn_player_id = gs.first_player_of_game_id = 1
+    gs.deployment_attacker_id, gs.deployment_defender_id = 1, 2
+    now = time.time()
+    gs.game_timer.status = "running"
+    gs.game_timer.start_time = now - 3600
+    gs.game_timer.turn_segment_start_time = now - 120
+    gs.status_message = "Round 3 - Player 1's Turn"
+    return gs
+
+
+def _score_tap(gs):
+    player = gs.players[1]
+    player.primary_score += 1
+    player.total_score = player.primary_score + player.secondary_score
+    gs.status_message = f"{player.name} Score Updated"
+
+
+def bench_state(results, data_dir):
+    gs = _game_in_progress()
+    snapshots = SnapshotStore(gs.to_dict())
+    results["get_game_state"] = timing.measure(lambda: snapshots.current)
+
+    # A window longer than the run, so the scheduler thread never writes while timing
+    scheduler = SaveScheduler(lambda state: None, window=3600)
+
+    def save_game_state():
+        _score_tap(gs)
+        snapshots.publish(gs.to_dict())
+        version, snapshot = snapshots.head
+        scheduler.request_save(snapshot, version=version)
+
+    results["save_game_state"] = timing.measure(save_game_state)
+    scheduler.stop()
+
+    journal = GameJournal(os.path.join(data_dir, "game_state.json"))
+
+    def save_write():
+        _score_tap(gs)
+        journal.record(snapshots.publish(gs.to_dict()))
+
+    # Each write is fsynced, so take fewer, fixed samples
+    results["save_write"] = timing.measure(save_write, repeat=5, number=20)
+    journal.close()
+
+    load_dir = os.path.join(data_dir, "load")
+    os.makedirs(load_dir)
+    journal = GameJournal(os.path.join(load_dir, "game_state.json"), compact_every=10_000, fsync=False)
+    for _ in range(100):
+        _score_tap(gs)
+        journal.record(gs.to_dict())
+    journal.close()
+    load_journal = GameJournal(os.path.join(load_dir, "game_state.json"), compact_every=10_000, fsync=False)
+
+    def load_game_state():
+        loaded = load_journal.load()
+        return GameState.from_dict(loaded), SnapshotStore(loaded)
+
+    results["load_game_state"] = timing.measure(load_game_state)
+    load_journal.close()
+
+    def update_timer_display():
+        total, players = gs.timer_seconds(time.time())
+        return format_hms(total), {player_id: format_hms(seconds) for player_id, seconds in players.items()}
+
+    results["update_timer_display"] = timing.measure(update_timer_display)
+
+    state = gs.to_dict()
+    for name in available_serializers():
+        serializer = get_serializer(name, binary=True)
+        results[f"encode_state[{name}]"] = timing.measure(lambda: serializer.dumps(state))
+
+
+def bench_broadcast(results, client_counts):
+    from websocket_server import WebSocketServer
+
+    gs = _game_in_progress()
+    snapshots = SnapshotStore(gs.to_dict())
+    # Observers unthrottled, so every broadcast does the full fan-out
+    server = WebSocketServer(get_game_state_callback=lambda: snapshots.current, observer_broadcast_hz=None)
+    clients = []
+    number, repeat = 10, 5
+
+    def drain():
+        for client in clients:
+            client.get_received()
+
+    def broadcast():
+        _score_tap(gs)
+        snapshots.publish(gs.to_dict())
+        server.broadcast_game_state()
+
+    try:
+        for count in sorted(client_counts):
+            while len(clients) < count:
+                clients.append(server.socketio.test_client(server.app))
+            drain()
+            results[f"broadcast_game_state[{count}]"] = timing.measure(
+                broadcast, repeat=repeat, number=number, setup=drain
+            )
+    finally:
+        for client in clients:
+            client.disconnect()
+
+
+def run(client_counts=DEFAULT_CLIENT_COUNTS):
+    """Returns {"environment": ..., "results": {benchmark name: timing}}."""
+    results = {}
+    data_dir = tempfile.mkdtemp(prefix="scorer-bench-")
+    try:
+        bench_state(results, data_dir)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    if client_counts:
+        bench_broadcast(results, client_counts)
+    return {"environment": timing.environment(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", default=",".join(map(str, DEFAULT_CLIENT_COUNTS)),
+                        help="comma-separated observer counts for the broadcast benchmark (empty to skip)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also save the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against results saved with --output")
+    args = parser.parse_args()
+
+    # The server logs every broadcast at INFO
+    logging.disable(logging.INFO)
+    client_counts = [int(count) for count in args.clients.split(",") if count.strip()]
+    data = run(client_counts)
+
+    if args.output:
+        timing.dump(data, args.output)
+    if args.json:
+        timing.dump(data)
+    elif args.compare:
+        timing.print_comparison(timing.compare(timing.load(args.compare), data))
+    else:
+        timing.print_results(data["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares the state serializers on a broadcast-sized workload.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --json   # machine-readable output
+
+For every available backend it reports the encoded size and the encode time
+of a full snapshot (sent on connect / resync) and of a typical score patch
+(sent on every change), plus the time to decode the snapshot again.
+"""
+
+import argparse
+import json
+import time
+
+from state.delta import diff_state
+from state.model import GameState
+from state.serialization import available_serializers, get_serializer
+from state.snapshot import freeze
+
+
+def _sample_states():
+    gs = GameState()
+    gs.players[1].name = "Blue Commander"
+    gs.players[2].name = "Red Warlord"
+    gs.game_phase = "game_play"
+    gs.current_round = 3
+    gs.active_player_id = 1
+    gs.deployment_attacker_id = 1
+    gs.deployment_defender_id = 2
+    gs.game_timer.status = "running"
+    gs.game_timer.start_time = 1_700_000_000.0
+    gs.game_timer.turn_segment_start_time = 1_700_001_200.0
+    gs.status_message = "Round 3 - Player 1's Turn"
+    before = gs.to_dict()
+
+    gs.players[1].primary_score += 5
+    gs.players[1].total_score += 5
+    gs.players[1].cp -= 1
+    after = gs.to_dict()
+
+    snapshot = freeze(dict(after, state_version=42))
+    patch = {"base": 41, "version": 42, "ops": diff_state(before, after)}
+    return snapshot, patch
+
+
+def _time_per_call(fn, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def run(iterations=20_000):
+    """Returns one result dict per available backend."""
+    snapshot, patch = _sample_states()
+    results = []
+    for name in available_serializers():
+        serializer = get_serializer(name, binary=True)
+        encoded_snapshot = serializer.dumps(snapshot)
+        encoded_patch = serializer.dumps(patch)
+        results.append({
+            "backend": name,
+            "binary": serializer.binary,
+            "snapshot_bytes": len(encoded_snapshot if serializer.binary else encoded_snapshot.encode("utf-8")),
+            "snapshot_encode_us": round(_time_per_call(serializer.dumps, snapshot, iterations), 2),
+            "snapshot_decode_us": round(_time_per_call(serializer.loads, encoded_snapshot, iterations), 2),
+            "patch_bytes": len(encoded_patch if serializer.binary else encoded_patch.encode("utf-8")),
+            "patch_encode_us": round(_time_per_call(serializer.dumps, patch, iterations), 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = f"{'backend':<8} {'snapshot B':>10} {'encode us':>10} {'decode us':>10} {'patch B':>8} {'encode us':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['backend']:<8} {r['snapshot_bytes']:>10} {r['snapshot_encode_us']:>10} "
+            f"{r['snapshot_decode_us']:>10} {r['patch_bytes']:>8} {r['patch_encode_us']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measures cold start (process launch to first frame) and fails on regressions.
+
+Run from the repository root on the reference config (the Pi, with a display):
+
+    python -m benchmarks.startup --output startup_baseline.json        # record a baseline
+    python -m benchmarks.startup --baseline startup_baseline.json      # exit 1 if slower
+
+Each run launches `main.py` in a fresh process with
+`SCORER_EXIT_AFTER_FIRST_FRAME=1`, so the app writes its startup report
+(diagnostics/startup.py) once the first frame is flipped and quits. The
+median of `--runs` launches is kept for the time to first frame and for each
+phase (imports, fonts, KV load, build, on_start). With `--baseline`, the run
+fails if the median time to first frame is more than `--max-regression`
+(default 10%) above the baseline's. Phases are reported alongside, to show
+where a regression came from.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import timing
+
+TOTAL = "time_to_first_frame"
+DEFAULT_RUNS = 5
+DEFAULT_MAX_REGRESSION = 0.10
+
+
+def launch(report_path, timeout=120):
+    """Starts the app once and returns its startup report."""
+    env = dict(os.environ, SCORER_EXIT_AFTER_FIRST_FRAME="1", SCORER_STARTUP_REPORT=report_path)
+    subprocess.run([sys.executable, "main.py"], env=env, timeout=timeout, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return timing.load(report_path)
+
+
+def summarize(reports):
+    """Median, min and max milliseconds for the total and every phase across `reports`."""
+    samples = {TOTAL: [report["time_to_first_frame_ms"] for report in reports]}
+    for report in reports:
+        for phase in report["phases"]:
+            samples.setdefault(phase["name"], []).append(phase["duration_ms"])
+    return {
+        name: {"median_ms": statistics.median(values), "min_ms": min(values), "max_ms": max(values)}
+        for name, values in samples.items()
+    }
+
+
+def run(runs=DEFAULT_RUNS):
+    with tempfile.TemporaryDirectory(prefix="scorer-startup-") as report_dir:
+        reports = [launch(os.path.join(report_dir, f"run{index}.json")) for index in range(runs)]
+    return {"environment": timing.environment(), "runs": runs, "results": summarize(reports)}
+
+
+def check_regression(baseline, current, max_regression=DEFAULT_MAX_REGRESSION):
+    """Returns (ok, ratio) for the median time to first frame against the baseline."""
+    ratio = current["results"][TOTAL]["median_ms"] / baseline["results"][TOTAL]["median_ms"]
+    return ratio <= 1 + max_regression, round(ratio, 3)
+
+
+def print_results(results):
+    header = f"{'phase':<28} {'median ms':>10} {'min ms':>10} {'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<28} {r['median_ms']:>10} {r['min_ms']:>10} {r['max_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="cold starts to take the median of")
+    parser.add_argument("--output", help="save the results as a baseline")
+    parser.add_argument("--baseline", help="fail if slower than the results saved with --output")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="allowed slowdown of the time to first frame, as a fraction (default 0.10)")
+    args = parser.parse_args()
+
+    data = run(args.runs)
+    print_results(data["results"])
+    if args.output:
+        timing.dump(data, args.output)
+    if not args.baseline:
+        return 0
+
+    baseline = timing.load(args.baseline)
+    if baseline["environment"].get("machine") != data["environment"]["machine"]:
+        print(f"Warning: baseline was recorded on {baseline['environment'].get('machine')}, "
+              f"this run is on {data['environment']['machine']}")
+    print()
+    print(f"{'phase':<28} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for name, old, new, ratio in timing.compare(baseline, data, key="median_ms"):
+        print(f"{name:<28} {old:>10} {new:>10} {ratio:>7}")
+    ok, ratio = check_regression(baseline, data, args.max_regression)
+    if not ok:
+        print(f"FAIL: time to first frame is {ratio}x the baseline (allowed {1 + args.max_regression:.2f}x)")
+        return 1
+    print(f"OK: time to first frame is {ratio}x the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
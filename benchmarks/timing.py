@@ -0,0 +1,124 @@
+"""
+Timing and reporting helpers shared by the benchmarks.
+
+`measure` follows `timeit`: the garbage collector is off while timing, each
+sample runs the function enough times to last a few tens of milliseconds, and
+the median of several samples is reported, so results are stable enough to
+compare between commits. Results are saved as JSON with `environment()` and
+compared with `compare()`.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure(fn, repeat=7, min_sample_seconds=0.05, number=None, setup=None):
+    """
+    Times `fn()` and returns per-call microseconds (median, min, max, stdev).
+    `number` calls per sample are calibrated to `min_sample_seconds` unless
+    given. `setup()`, if given, runs untimed before each sample.
+    """
+    if number is None:
+        number = _calibrate(fn, min_sample_seconds, setup)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter_ns() - start) / number / 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "max_us": round(max(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _calibrate(fn, min_sample_seconds, setup):
+    number = 1
+    while True:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_sample_seconds or number >= 1_000_000:
+            return number
+        number *= 10
+
+
+def environment():
+    """What the numbers were measured on, so saved results can be told apart."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(baseline, current, key="median_us"):
+    """
+    Returns one row per benchmark in both result sets: (name, old, new, ratio).
+    A ratio above 1 means the current run is slower.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or not old.get(key):
+            continue
+        rows.append((name, old[key], result[key], round(result[key] / old[key], 3)))
+    return rows
+
+
+def print_results(results):
+    header = f"{'benchmark':<36} {'median us':>12} {'min us':>12} {'stdev us':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<36} {r['median_us']:>12} {r['min_us']:>12} {r['stdev_us']:>10}")
+
+
+def print_comparison(rows):
+    header = f"{'benchmark':<36} {'before us':>12} {'after us':>12} {'ratio':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, old, new, ratio in rows:
+        print(f"{name:<36} {old:>12} {new:>12} {ratio:>7}")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump(data, path=None):
+    text = json.dumps(data, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
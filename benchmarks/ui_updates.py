@@ -0,0 +1,181 @@
+"""
+Counts the widget property writes each command causes on the visible screen.
+
+Run from the repository root (no display or Kivy needed):
+
+    python -m benchmarks.ui_updates
+    python -m benchmarks.ui_updates --json
+
+A seeded game is played through the `GameEngine` (deployment and first turn
+rolls, then CP, score and end turn commands until the last round), twice:
+
+- `redraw`: after each command the visible screen recomputes and writes every
+  widget property and rebuilds its choice buttons, as `update_ui_from_state`
+  and `update_view_from_state` did.
+- `store`: each command's snapshot goes to a `StateStore` and the visible
+  screen's bindings (screens/state_bindings.py) update only what changed.
+
+Widgets are stand-ins that count writes, and dispatches (writes that change
+the value; Kivy properties only dispatch then). Choice box rebuilds are
+counted separately; each is a clear_widgets() plus up to two new widgets.
+"""
+
+import argparse
+import json
+import random
+from collections import defaultdict
+
+from game.engine import GameEngine
+from screens.state_bindings import (
+    DEPLOYMENT_SCREEN_BINDINGS, FIRST_TURN_SCREEN_BINDINGS, GAME_SCREEN_BINDINGS, ScreenBindings,
+)
+from state.store import StateStore
+
+CHOICE_PATHS = {
+    "deployment_setup": ["deployment_initiative_winner_id", "deployment_attacker_id"],
+    "first_turn_setup": ["first_turn_initiative_winner_id", "first_turn_player_id"],
+}
+SCREEN_BINDINGS = {
+    "deployment_setup": DEPLOYMENT_SCREEN_BINDINGS,
+    "first_turn_setup": FIRST_TURN_SCREEN_BINDINGS,
+    "game": GAME_SCREEN_BINDINGS,
+}
+PHASE_SCREENS = {
+    "deployment_setup": "deployment_setup",
+    "first_turn_setup": "first_turn_setup",
+    "game_play": "game",
+    "game_over": "game",
+}
+
+
+class _Counts:
+    def __init__(self):
+        self.writes = self.dispatches = self.rebuilds = 0
+
+    def values(self):
+        return (self.writes, self.dispatches, self.rebuilds)
+
+
+class _Widget:
+    def __init__(self, counts):
+        object.__setattr__(self, "_counts", counts)
+        object.__setattr__(self, "_values", {})
+
+    def __getattr__(self, name):
+        return self._values.get(name)
+
+    def __setattr__(self, name, value):
+        self._counts.writes += 1
+        if self._values.get(name, object()) != value:
+            self._counts.dispatches += 1
+            self._values[name] = value
+
+
+class _Screen:
+    """Hands out a counting widget for every attribute the bindings ask for."""
+
+    def __init__(self, counts):
+        self._counts = counts
+        self._widgets = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._widgets.setdefault(name, _Widget(self._counts))
+
+    def update_choice_boxes(self, *values):
+        self._counts.rebuilds += 1
+
+
+def _commands(engine):
+    """Yields (name, callable) for a full game; later commands depend on earlier results."""
+    gs = engine.state
+    yield "start_deployment", engine.start_deployment
+    while gs.deployment_initiative_winner_id is None:
+        yield "roll_deployment", lambda: engine.roll_deployment(1)
+        yield "roll_deployment", lambda: engine.roll_deployment(2)
+    yield "choose_deployment_role", lambda: engine.choose_deployment_role(gs.deployment_initiative_winner_id, True)
+    yield "start_first_turn", engine.start_first_turn
+    yield "roll_first_turn", lambda: engine.roll_first_turn(1)
+    yield "roll_first_turn", lambda: engine.roll_first_turn(2)
+    yield "choose_first_turn", lambda: engine.choose_first_turn(gs.first_turn_initiative_winner_id, True)
+    yield "start_game", engine.start_game
+    while gs.game_phase == "game_play":
+        player_id = gs.active_player_id
+        yield "add_cp", lambda: engine.add_cp(player_id)
+        yield "set_score", lambda: engine.set_score(player_id, gs.players[player_id].primary_score + 5)
+        yield "remove_cp", lambda: engine.remove_cp(player_id)
+        yield "end_turn", lambda: engine.end_turn(player_id)
+
+
+def _redraw(screen, bindings, choice_paths, store):
+    for widget, prop, paths, compute in bindings:
+        values = [store.get(path) for path in paths]
+        setattr(getattr(screen, widget), prop, compute(*values) if compute else values[0])
+    if choice_paths:
+        screen.update_choice_boxes(*(store.get(path) for path in choice_paths))
+
+
+def play(mode, seed=1):
+    """Returns {command name: [count, writes, dispatches, rebuilds]} for one game."""
+    engine = GameEngine(rng=random.Random(seed))
+    engine.new_game()
+    store = StateStore(engine.state.to_dict())
+    counts = _Counts()
+    screens = {}
+    bound = bound_name = None
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for name, command in _commands(engine):
+        before = counts.values()
+        command()
+        store.update(engine.state.to_dict())
+        screen_name = PHASE_SCREENS.get(engine.state.game_phase)
+        if screen_name is not None:
+            screen = screens.setdefault(screen_name, _Screen(counts))
+            if mode == "store":
+                if screen_name != bound_name:
+                    # Entering a screen binds (and draws) it; the old one is unbound
+                    if bound:
+                        bound.unbind()
+                    subscribers = [(CHOICE_PATHS[screen_name], "update_choice_boxes")] if screen_name in CHOICE_PATHS else []
+                    bound = ScreenBindings(screen, SCREEN_BINDINGS[screen_name], subscribers)
+                    bound.bind(store)
+                    bound_name = screen_name
+            else:
+                _redraw(screen, SCREEN_BINDINGS[screen_name], CHOICE_PATHS.get(screen_name), store)
+        after = counts.values()
+        row = totals[name]
+        row[0] += 1
+        for index, (start, end) in enumerate(zip(before, after), start=1):
+            row[index] += end - start
+    return dict(totals)
+
+
+def run(seed=1):
+    return {mode: play(mode, seed) for mode in ("redraw", "store")}
+
+
+def print_results(results):
+    header = f"{'command':<24}{'n':>4}  {'redraw writes/dispatches/rebuilds':>34}  {'store writes/dispatches/rebuilds':>34}"
+    print(header)
+    print("-" * len(header))
+    for name, (count, *redraw) in results["redraw"].items():
+        store = results["store"][name][1:]
+        per = lambda values: "/".join(f"{value / count:.1f}" for value in values)
+        print(f"{name:<24}{count:>4}  {per(redraw):>34}  {per(store):>34}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    results = run(args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
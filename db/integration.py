@@ -0,0 +1,87 @@
+"""
+Records games from the running app into the game history database.
+
+Every function here only copies a few values out of the live `GameState` and
+queues a write on the store's background thread, so they are safe to call from
+the Kivy main loop.
+"""
+
+import os
+import time
+import uuid
+
+from db.store import GameHistoryStore
+from state.serialization import get_serializer
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scorer.db")
+
+_store = None
+
+
+def configure(path):
+    """Points the integration at a different database file (closing the current one)."""
+    global _store
+    close()
+    _store = GameHistoryStore(path)
+    return _store
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = GameHistoryStore(DEFAULT_DB_PATH)
+    return _store
+
+
+def close():
+    """Commits queued writes and stops the writer thread."""
+    if _store is not None:
+        _store.close()
+
+
+def reset_db_for_new_game_sync():
+    """
+    Called when a new game is started. Finished games are kept; a game that
+    was still in progress is marked abandoned. Returns without waiting for
+    the write.
+    """
+    get_store().abandon_unfinished(time.time())
+
+
+def record_game_started(gs):
+    """Creates the history record for `gs`, assigning it a game_id if it has none."""
+    if gs.game_id is None:
+        gs.game_id = uuid.uuid4().hex
+    names = {player_id: player.name for player_id, player in gs.players.items()}
+    get_store().start_game(gs.game_id, time.time(), names, gs.deployment_attacker_id)
+
+
+def record_turn_ended(gs, turn):
+    """Records the turn `GameEngine.end_turn` just ended (its `TurnEnded`), under the round it was played in."""
+    if gs.game_id is None: # game started before history was recorded
+        return
+    player = gs.players[turn.player_id]
+    get_store().record_turn(
+        gs.game_id, turn.round_number, turn.player_id, turn.duration, player.total_score, player.cp, time.time(),
+    )
+
+
+def record_game_finished(gs, result, winner_player_id=None):
+    """
+    Marks the game finished. `result` is "rounds" or "concede"; for "rounds"
+    the winner is worked out from the scores (None for a tie).
+    """
+    if gs.game_id is None:
+        return
+    if winner_player_id is None and result == "rounds":
+        p1_score, p2_score = gs.players[1].total_score, gs.players[2].total_score
+        if p1_score != p2_score:
+            winner_player_id = 1 if p1_score > p2_score else 2
+    players = {
+        player_id: (player.total_score, player.cp, player.player_elapsed_time_seconds)
+        for player_id, player in gs.players.items()
+    }
+    get_store().finish_game(
+        gs.game_id, time.time(), result, winner_player_id,
+        gs.last_round_played or gs.current_round, players, get_serializer().dumps(gs.to_dict()),
+    )
@@ -0,0 +1,284 @@
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE -- the UNIQUE constraint is the name index
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    game_key TEXT NOT NULL UNIQUE,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'in_progress',
+    result TEXT,
+    winner_player_number INTEGER,
+    rounds_played INTEGER,
+    attacker_player_number INTEGER,
+    final_state TEXT
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+    player_number INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    final_score INTEGER,
+    final_cp INTEGER,
+    elapsed_seconds REAL,
+    PRIMARY KEY (game_id, player_number)
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    game_id INTEGER NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+    round_number INTEGER NOT NULL,
+    player_number INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    total_score INTEGER NOT NULL,
+    cp INTEGER NOT NULL,
+    ended_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_games_finished_at ON games(finished_at);
+CREATE INDEX IF NOT EXISTS idx_game_players_player ON game_players(player_id);
+CREATE INDEX IF NOT EXISTS idx_turns_game ON turns(game_id, round_number);
+"""
+
+# Statements used by the writer. sqlite3 keeps each one prepared in the
+# connection's statement cache, so repeated inserts skip re-parsing.
+INSERT_GAME = "INSERT OR IGNORE INTO games (game_key, started_at, attacker_player_number) VALUES (?, ?, ?)"
+UPSERT_PLAYER = "INSERT INTO players (name) VALUES (?) ON CONFLICT(name) DO NOTHING"
+INSERT_GAME_PLAYER = """
+    INSERT OR REPLACE INTO game_players (game_id, player_number, player_id)
+    SELECT g.id, ?, p.id FROM games g, players p WHERE g.game_key = ? AND p.name = ?
+"""
+INSERT_TURN = """
+    INSERT INTO turns (game_id, round_number, player_number, duration_seconds, total_score, cp, ended_at)
+    SELECT id, ?, ?, ?, ?, ?, ? FROM games WHERE game_key = ?
+"""
+FINISH_GAME = """
+    UPDATE games SET finished_at = ?, status = 'finished', result = ?, winner_player_number = ?,
+        rounds_played = ?, final_state = ?
+    WHERE game_key = ?
+"""
+FINISH_GAME_PLAYER = """
+    UPDATE game_players SET final_score = ?, final_cp = ?, elapsed_seconds = ?
+    WHERE player_number = ? AND game_id = (SELECT id FROM games WHERE game_key = ?)
+"""
+ABANDON_UNFINISHED = "UPDATE games SET status = 'abandoned', finished_at = ? WHERE status = 'in_progress'"
+
+_STOP = object()
+
+
+class GameHistoryStore:
+    """
+    SQLite record of played games, their players and every turn.
+
+    All writes are queued and applied by a single background thread, so callers
+    (the Kivy main loop) never wait on disk I/O or SQLite locks. The writer drains
+    whatever has queued up into one transaction. Reads open their own connection
+    and can run on any thread; the database is in WAL mode, so they do not block
+    the writer.
+    """
+
+    def __init__(self, path, batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._failed_writes = 0
+
+    # --- Writes (non-blocking) ---
+
+    def start_game(self, game_key, started_at, player_names, attacker_player_number=None):
+        """Records a new game. `player_names` maps player number to name."""
+        self._submit(self._write_start_game, game_key, started_at, dict(player_names), attacker_player_number)
+
+    def record_turn(self, game_key, round_number, player_number, duration_seconds, total_score, cp, ended_at):
+        self._submit(
+            self._write_turn, game_key, round_number, player_number, duration_seconds, total_score, cp, ended_at,
+        )
+
+    def finish_game(self, game_key, finished_at, result, winner_player_number, rounds_played, players, final_state=None):
+        """
+        Marks a game as finished. `players` maps player number to a
+        (final_score, final_cp, elapsed_seconds) tuple; `final_state` is an
+        optional JSON string of the final game state.
+        """
+        self._submit(
+            self._write_finish_game, game_key, finished_at, result, winner_player_number,
+            rounds_played, dict(players), final_state,
+        )
+
+    def abandon_unfinished(self, abandoned_at):
+        """Closes out any game that was never finished (e.g. a new game was started instead)."""
+        self._submit(self._write_abandon_unfinished, abandoned_at)
+
+    def flush(self, timeout=5):
+        """Blocks until every write queued so far is committed. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "failed_writes": self._failed_writes}
+
+    # --- Reads (run on the caller's thread) ---
+
+    def recent_games(self, limit=20):
+        """Returns finished games, most recent first."""
+        return self._query(
+            "SELECT * FROM games WHERE status = 'finished' ORDER BY finished_at DESC LIMIT ?", (limit,)
+        )
+
+    def games_for_player(self, name, limit=50):
+        return self._query(
+            """
+            SELECT g.*, gp.player_number, gp.final_score FROM games g
+            JOIN game_players gp ON gp.game_id = g.id
+            JOIN players p ON p.id = gp.player_id
+            WHERE p.name = ? AND g.status = 'finished'
+            ORDER BY g.finished_at DESC LIMIT ?
+            """,
+            (name, limit),
+        )
+
+    def game_players(self, game_key):
+        return self._query(
+            """
+            SELECT gp.player_number, p.name, gp.final_score, gp.final_cp, gp.elapsed_seconds
+            FROM game_players gp JOIN players p ON p.id = gp.player_id
+            JOIN games g ON g.id = gp.game_id
+            WHERE g.game_key = ? ORDER BY gp.player_number
+            """,
+            (game_key,),
+        )
+
+    def turns_for_game(self, game_key):
+        return self._query(
+            """
+            SELECT t.round_number, t.player_number, t.duration_seconds, t.total_score, t.cp, t.ended_at
+            FROM turns t JOIN games g ON g.id = t.game_id
+            WHERE g.game_key = ? ORDER BY t.id
+            """,
+            (game_key,),
+        )
+
+    def _query(self, sql, params=()):
+        self._ensure_started()
+        self._ready.wait(5)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    # --- Writer thread ---
+
+    def _submit(self, fn, *args):
+        self._ensure_started()
+        self._queue.put((fn, args))
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="GameHistoryWriter", daemon=True)
+                self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return conn
+
+    def _run(self):
+        conn = None
+        try:
+            conn = self._connect()
+        except sqlite3.Error:
+            # Keep draining the queue so flush() callers are still released
+            logger.exception("Could not open game history database %s", self.path)
+        finally:
+            self._ready.set()
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if isinstance(item, tuple)]
+            if writes:
+                self._commit(conn, writes)
+            # Flush markers are released only once everything queued before them is committed
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is _STOP for item in batch):
+                if conn is not None:
+                    conn.close()
+                return
+
+    def _commit(self, conn, writes):
+        if conn is None:
+            self._failed_writes += len(writes)
+            return
+        try:
+            with conn:
+                for fn, args in writes:
+                    fn(conn, *args)
+            return
+        except sqlite3.Error:
+            logger.exception("Game history batch of %d writes failed, retrying one by one", len(writes))
+        # Retry individually so one bad write does not take the rest of the batch with it
+        for fn, args in writes:
+            try:
+                with conn:
+                    fn(conn, *args)
+            except sqlite3.Error:
+                self._failed_writes += 1
+                logger.exception("Dropped game history write %s", fn.__name__)
+
+    def _write_start_game(self, conn, game_key, started_at, player_names, attacker_player_number):
+        conn.execute(INSERT_GAME, (game_key, started_at, attacker_player_number))
+        conn.executemany(UPSERT_PLAYER, [(name,) for name in player_names.values()])
+        conn.executemany(
+            INSERT_GAME_PLAYER,
+            [(number, game_key, name) for number, name in player_names.items()],
+        )
+
+    def _write_turn(self, conn, game_key, round_number, player_number, duration_seconds, total_score, cp, ended_at):
+        conn.execute(INSERT_TURN, (round_number, player_number, duration_seconds, total_score, cp, ended_at, game_key))
+
+    def _write_finish_game(self, conn, game_key, finished_at, result, winner_player_number, rounds_played, players, final_state):
+        conn.execute(FINISH_GAME, (finished_at, result, winner_player_number, rounds_played, final_state, game_key))
+        conn.executemany(
+            FINISH_GAME_PLAYER,
+            [(score, cp, elapsed, number, game_key) for number, (score, cp, elapsed) in players.items()],
+        )
+
+    def _write_abandon_unfinished(self, conn, abandoned_at):
+        conn.execute(ABANDON_UNFINISHED, (abandoned_at,))
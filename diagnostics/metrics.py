@@ -0,0 +1,328 @@
+"""
+Counters, gauges and histograms, exposed in the Prometheus text format at /metrics.
+
+Recording is meant to stay on in production, including on the Kivy thread, so
+it takes no locks: every thread that records gets its own shard of each
+metric (a plain list it alone writes), and `render()` adds the shards up when
+the endpoint is scraped. Shards of threads that have exited are folded into
+one retired total, so short-lived handler threads do not accumulate. A
+counter increment or histogram observation is a thread-local lookup plus a
+few list operations, a few hundred nanoseconds.
+
+Labelled metrics hand out one child per label value; hot paths can keep the
+child (`EVENTS_RECEIVED.labels("end_turn")`) instead of looking it up per update.
+
+    from diagnostics import metrics
+    metrics.SAVE_SECONDS.observe(duration)
+    with metrics.HANDLER_SECONDS.labels("end_turn").time():
+        ...
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds, from sub-millisecond handler work up to multi-second stalls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+# Frame times around the 60 fps budget
+FRAME_BUCKETS = (0.008, 0.017, 0.025, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0)
+STALL_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Decoding and scaling one full-size billboard image
+DECODE_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Sharded:
+    """
+    Per-thread value lists, summed on read. Only shard creation and reads take a lock.
+
+    Socket.IO runs each event on a new thread, so the shards of threads that
+    have exited are folded into `_retired` (whenever a shard is created or the
+    totals are read) instead of piling up one per event.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = [] # (thread, shard)
+        self._retired = [0] * size
+        self._lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0] * self._size
+            with self._lock:
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def shard_count(self):
+        with self._lock:
+            self._retire_dead()
+            return len(self._shards)
+
+    def _retire_dead(self):
+        # A thread that has exited no longer writes its shard, so it can be read without racing
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for index, value in enumerate(shard):
+                    self._retired[index] += value
+        self._shards = live
+
+    def totals(self):
+        with self._lock:
+            self._retire_dead()
+            shards = [shard for _, shard in self._shards]
+            totals = list(self._retired)
+        for shard in shards:
+            for index, value in enumerate(shard):
+                totals[index] += value
+        return totals
+
+
+class _Timer:
+    __slots__ = ("_observe", "_start")
+
+    def __init__(self, observe):
+        self._observe = observe
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._observe(time.perf_counter() - self._start)
+
+
+class CounterChild:
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount=1):
+        self._values.shard()[0] += amount
+
+    def value(self):
+        return self._values.totals()[0]
+
+
+class GaugeChild:
+    """A value set by one writer, or read from a function when scraped."""
+
+    def __init__(self):
+        self._value = 0
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def value(self):
+        return self._function() if self._function else self._value
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # One slot per bucket plus +Inf, then the count and the sum
+        self._values = _Sharded(len(buckets) + 3)
+
+    def observe(self, value):
+        shard = self._values.shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-2] += 1
+        shard[-1] += value
+
+    def time(self):
+        """Context manager that observes the seconds spent in its block."""
+        return _Timer(self.observe)
+
+    def snapshot(self):
+        """Returns (cumulative bucket counts including +Inf, count, sum)."""
+        totals = self._values.totals()
+        cumulative, running = [], 0
+        for count in totals[:-2]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values):
+        """Returns the child for these label values, creating it on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values):
+        """Drops the child for these label values (e.g. when a table is closed)."""
+        with self._lock:
+            self._children.pop(tuple(str(value) for value in values), None)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(list(self._children.items())):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value())}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+    def set_function(self, function):
+        self._default.set_function(function)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _render_child(self, values, child):
+        cumulative, count, total = child.snapshot()
+        lines = []
+        for bound, running in zip(self.buckets + (float("inf"),), cumulative):
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            lines.append(f"{self.name}_bucket{self._label_text(values, [('le', le)])} {running}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {count}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """The Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+
+CONNECTED_CLIENTS = Gauge(
+    "scorer_connected_clients", "Web clients currently connected, per table and role.", ("table", "role"))
+EVENTS_RECEIVED = Counter(
+    "scorer_socket_events_total", "Socket.IO events received from clients, per event.", ("event",))
+HANDLER_SECONDS = Histogram(
+    "scorer_socket_handler_seconds", "Time spent in each Socket.IO event handler.", ("event",))
+BROADCAST_SECONDS = Histogram(
+    "scorer_broadcast_seconds", "Time to project, diff, encode and emit one table broadcast.")
+PAYLOAD_BYTES = Histogram(
+    "scorer_payload_bytes", "Size of each encoded state payload emitted, per event and encoding.",
+    ("event", "encoding"), buckets=BYTES_BUCKETS)
+SAVE_SECONDS = Histogram(
+    "scorer_save_game_state_seconds", "Time save_game_state takes on the calling (Kivy) thread.")
+SAVE_WRITE_SECONDS = Histogram(
+    "scorer_save_write_seconds", "Time to write one record to the save journal, including fsync.")
+FSYNC_SECONDS = Histogram(
+    "scorer_fsync_seconds", "Time spent in fsync for save journal writes.")
+FRAME_SECONDS = Histogram(
+    "scorer_frame_seconds", "Kivy main loop frame time.", buckets=FRAME_BUCKETS)
+MAIN_LOOP_STALLS = Counter(
+    "scorer_main_loop_stalls_total", "Kivy main loop stalls longer than the watchdog threshold.")
+MAIN_LOOP_STALL_SECONDS = Histogram(
+    "scorer_main_loop_stall_seconds", "Duration of each Kivy main loop stall.", buckets=STALL_BUCKETS)
+BILLBOARD_DECODE_SECONDS = Histogram(
+    "scorer_billboard_decode_seconds", "Time to decode and scale one screensaver billboard, off the Kivy thread.",
+    buckets=DECODE_BUCKETS)
+BILLBOARD_UPLOAD_SECONDS = Histogram(
+    "scorer_billboard_upload_seconds", "Time to upload one decoded billboard as a texture on the Kivy thread.")
+BILLBOARD_TRANSITION_DROPPED_FRAMES = Counter(
+    "scorer_billboard_transition_dropped_frames_total", "Frames dropped during screensaver crossfades.")
+BILLBOARD_NOT_READY = Counter(
+    "scorer_billboard_not_ready_total", "Screensaver slide changes put off because the next texture was not ready.")
@@ -0,0 +1,93 @@
+"""
+Records where cold start time goes, up to the first frame on screen.
+
+`main.py` imports this module first, so the clock starts before the heavy
+imports. `mark(name)` closes a phase that ran since the previous mark (used
+for the module imports); `phase(name)` times a block (fonts, KV load, build).
+When the first frame has been flipped, `finish()` writes the phases as JSON
+to `report_file` and prints a one-line summary:
+
+    {"time_to_first_frame_ms": 1834.2,
+     "phases": [{"name": "import:kivy", "start_ms": 0.0, "duration_ms": 612.4}, ...]}
+
+`benchmarks/startup.py` launches the app with `SCORER_EXIT_AFTER_FIRST_FRAME=1`
+and reads these reports to compare cold starts against a saved baseline.
+"""
+
+import json
+import os
+import sys
+import time
+
+from persistence.atomic_file import atomic_write
+
+DEFAULT_REPORT_FILE = "startup_report.json"
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.profiler._clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, self.profiler._clock())
+
+
+class StartupProfiler:
+    def __init__(self, report_file=DEFAULT_REPORT_FILE, clock=time.perf_counter):
+        self.report_file = report_file
+        self._clock = clock
+        self.started = self._last_mark = clock()
+        self.phases = []
+        self.time_to_first_frame = None
+
+    def mark(self, name):
+        """Records the time since the previous phase ended (or since start) as phase `name`."""
+        self.record(name, self._last_mark, self._clock())
+
+    def phase(self, name):
+        """Context manager that records its block as phase `name`."""
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        self._last_mark = max(self._last_mark, end)
+        self.phases.append({
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 1),
+            "duration_ms": round((end - start) * 1000, 1),
+        })
+
+    def report(self):
+        return {
+            "time_to_first_frame_ms": self.time_to_first_frame,
+            "python": sys.version.split()[0],
+            "phases": list(self.phases),
+        }
+
+    def finish(self):
+        """Called once the first frame is on screen: stamps the total, saves and prints the report."""
+        if self.time_to_first_frame is not None:
+            return None
+        self.mark("first_frame")
+        self.time_to_first_frame = round((self._clock() - self.started) * 1000, 1)
+        path = self.save()
+        slowest = sorted(self.phases, key=lambda phase: phase["duration_ms"], reverse=True)[:3]
+        print(f"Startup: first frame after {self.time_to_first_frame:.0f} ms; slowest "
+              + ", ".join(f"{phase['name']} {phase['duration_ms']:.0f} ms" for phase in slowest))
+        return path
+
+    def save(self, path=None):
+        path = path or self.report_file
+        if not path:
+            return None
+        atomic_write(path, json.dumps(self.report(), indent=2))
+        return path
+
+
+profiler = StartupProfiler(report_file=os.environ.get("SCORER_STARTUP_REPORT", DEFAULT_REPORT_FILE))
@@ -0,0 +1,181 @@
+"""
+Follows one web command through the server as spans in a Chrome trace.
+
+Player pages attach a `trace_id` to every command they emit. The socket
+handler makes it the current correlation id, and it is carried with the
+command onto the Kivy thread (`CommandBus`), into the save scheduler's
+background write and into each broadcast, so every span a command causes is
+tagged with its id. Open the trace file in chrome://tracing or
+https://ui.perfetto.dev and filter on `trace_id` to see where the time went.
+
+Tracing is off by default and can be switched at runtime (`GET
+/trace?enable=1` / `?enable=0` on the web server, from the device itself
+only, or `SCORER_TRACE=1` at start). Spans go into a ring buffer of the last
+`max_events`, which is written to `trace_file` when tracing is stopped, when
+`/trace` is fetched and on app exit, so the file never grows past that bound.
+While off, `span()` returns a shared no-op context manager.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from persistence.atomic_file import atomic_write
+
+DEFAULT_MAX_EVENTS = 20_000
+DEFAULT_TRACE_FILE = "scorer_trace.json"
+# Thread names kept before those of exited threads with no buffered spans are dropped
+MAX_THREAD_NAMES = 256
+
+_current_id = contextvars.ContextVar("trace_id", default=None)
+_server_ids = itertools.count(1)
+
+
+def current_id():
+    """The correlation id of the work running in this thread, or None."""
+    return _current_id.get()
+
+
+def new_id():
+    """A correlation id for work that did not arrive with one from a client."""
+    return f"srv-{next(_server_ids)}"
+
+
+class correlation:
+    """Makes `trace_id` the current correlation id inside the block (None keeps the current one)."""
+
+    __slots__ = ("trace_id", "_token")
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+
+    def __enter__(self):
+        self._token = _current_id.set(self.trace_id) if self.trace_id is not None else None
+        return self.trace_id
+
+    def __exit__(self, *exc):
+        if self._token is not None:
+            _current_id.reset(self._token)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def annotate(self, **args):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if exc[0] is not None:
+            self.args["error"] = exc[0].__name__
+        self.tracer.complete(self.name, self.start, end - self.start, self.args)
+
+    def annotate(self, **args):
+        self.args.update(args)
+
+
+class Tracer:
+    def __init__(self, trace_file=DEFAULT_TRACE_FILE, max_events=DEFAULT_MAX_EVENTS):
+        self.trace_file = trace_file
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._thread_names = {}
+        self._thread_names_limit = MAX_THREAD_NAMES
+        self._pid = os.getpid()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        self.enabled = True
+
+    def stop(self):
+        """Stops recording and writes what was recorded to the trace file."""
+        self.enabled = False
+        return self.save()
+
+    def span(self, name, trace_id=None, **args):
+        """
+        Times the block as a span tagged with `trace_id` (default: the current
+        correlation id). Extra keyword arguments are shown in the span's args.
+        """
+        if not self.enabled:
+            return _NOOP
+        args["trace_id"] = trace_id if trace_id is not None else _current_id.get()
+        return _Span(self, name, args)
+
+    def complete(self, name, start_ns, duration_ns, args):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            if len(self._thread_names) >= self._thread_names_limit:
+                self._prune_thread_names()
+            self._thread_names[tid] = threading.current_thread().name
+        # deque.append is atomic, so recording threads need no lock
+        self._events.append({
+            "name": name, "ph": "X", "pid": self._pid, "tid": tid,
+            "ts": start_ns / 1000, "dur": duration_ns / 1000, "args": args,
+        })
+
+    def _prune_thread_names(self):
+        # Socket.IO handles each event on a new thread; keep the names of live threads and of spans still buffered
+        keep = {thread.ident for thread in threading.enumerate()}
+        keep.update(event["tid"] for event in list(self._events))
+        self._thread_names = {tid: name for tid, name in list(self._thread_names.items()) if tid in keep}
+        # Pruning walks the buffer, so it is done again only once the names have doubled
+        self._thread_names_limit = max(MAX_THREAD_NAMES, 2 * len(self._thread_names))
+
+    def events(self):
+        """The buffered spans plus thread name metadata, in Chrome trace event format."""
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._thread_names.items())
+        ]
+        return metadata + list(self._events)
+
+    def to_json(self):
+        return json.dumps({"traceEvents": self.events(), "displayTimeUnit": "ms"})
+
+    def save(self, path=None):
+        """Writes the buffer to `path` (default: `trace_file`). Returns the path, or None if there was nothing to write."""
+        path = path or self.trace_file
+        if not path or not self._events:
+            return None
+        with self._write_lock:
+            atomic_write(path, self.to_json())
+        return path
+
+    def clear(self):
+        self._events.clear()
+        self._thread_names = {}
+        self._thread_names_limit = MAX_THREAD_NAMES
+
+
+tracer = Tracer(trace_file=os.environ.get("SCORER_TRACE_FILE", DEFAULT_TRACE_FILE))
+if os.environ.get("SCORER_TRACE") == "1":
+    tracer.start()
+
+span = tracer.span
@@ -0,0 +1,146 @@
+"""
+Notices when the Kivy main loop stops ticking and records what it was doing.
+
+The main loop calls `heartbeat()` every frame (a single attribute write). A
+daemon thread checks the last heartbeat every `threshold / 4` seconds; once it
+is older than `threshold`, the main thread is stalled and its stack is taken
+from `sys._current_frames()`. Stacks are sampled again while the stall lasts,
+and the stall is closed at the next heartbeat. The `max_stalls` longest stalls
+are kept, each with the stack first seen and the one seen most often, and can
+be read over HTTP (`/stalls`, `/stalls?format=text`) or on the device (F12).
+The threshold is set with `SCORER_STALL_THRESHOLD` (seconds).
+"""
+
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from diagnostics import metrics
+
+DEFAULT_THRESHOLD_SECONDS = 0.5
+DEFAULT_MAX_STALLS = 20
+
+
+class StallWatchdog:
+    def __init__(self, threshold=DEFAULT_THRESHOLD_SECONDS, max_stalls=DEFAULT_MAX_STALLS,
+                 clock=time.monotonic, wall=time.time):
+        self.threshold = threshold
+        self.max_stalls = max_stalls
+        self._clock = clock
+        self._wall = wall
+        self._last_beat = None
+        self._target_ident = None
+        self._stall = None # the stall in progress, only touched by the watchdog thread
+        self._worst = [] # min-heap of (duration, seq, stall) holding the longest stalls
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.total_stalls = 0
+
+    def start(self, target_thread=None):
+        """Starts watching `target_thread` (default: the calling thread, i.e. call this from the main loop)."""
+        self._target_ident = (target_thread or threading.current_thread()).ident
+        self._last_beat = self._clock()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="StallWatchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def heartbeat(self, *args):
+        """Called by the watched loop every frame. Accepts and ignores Clock's dt."""
+        self._last_beat = self._clock()
+
+    def _run(self):
+        while not self._stop.wait(self.threshold / 4):
+            self.check()
+
+    def check(self):
+        """One watchdog pass: opens, samples or closes a stall. Runs on the watchdog thread."""
+        last_beat = self._last_beat
+        if last_beat is None:
+            return
+        stalled_for = self._clock() - last_beat
+        stall = self._stall
+        if stall is not None and stall["last_beat"] != last_beat:
+            # The loop ticked again; the stall ended at that heartbeat
+            self._finish(stall, last_beat - stall["last_beat"])
+            stall = None
+        if stalled_for < self.threshold:
+            return
+        stack = self._capture()
+        if stall is None:
+            self._stall = {
+                "last_beat": last_beat,
+                "started_at": self._wall() - stalled_for,
+                "first_stack": stack,
+                "stacks": Counter(),
+            }
+            stall = self._stall
+        if stack:
+            stall["stacks"][tuple(stack)] += 1
+
+    def _capture(self):
+        frame = sys._current_frames().get(self._target_ident)
+        if frame is None:
+            return None
+        return traceback.format_stack(frame)
+
+    def _finish(self, stall, duration):
+        self._stall = None
+        samples = sum(stall["stacks"].values())
+        most_common = stall["stacks"].most_common(1)
+        record = {
+            "started_at": round(stall["started_at"], 3),
+            "duration": round(duration, 3),
+            "samples": samples,
+            "first_stack": stall["first_stack"],
+            "stack": list(most_common[0][0]) if most_common else stall["first_stack"],
+        }
+        metrics.MAIN_LOOP_STALLS.inc()
+        metrics.MAIN_LOOP_STALL_SECONDS.observe(duration)
+        with self._lock:
+            self.total_stalls += 1
+            entry = (duration, next(self._seq), record)
+            if len(self._worst) < self.max_stalls:
+                heapq.heappush(self._worst, entry)
+            elif duration > self._worst[0][0]:
+                heapq.heapreplace(self._worst, entry)
+
+    def stalls(self):
+        """The recorded stalls, longest first."""
+        with self._lock:
+            entries = sorted(self._worst, key=lambda entry: (-entry[0], entry[1]))
+        return [record for _, _, record in entries]
+
+    def report(self):
+        return {
+            "threshold": self.threshold,
+            "total_stalls": self.total_stalls,
+            "stalled_now": self._stall is not None,
+            "stalls": self.stalls(),
+        }
+
+    def format_report(self, limit=None):
+        """The recorded stalls as plain text, for the device popup or a terminal."""
+        stalls = self.stalls()[:limit]
+        lines = [f"{self.total_stalls} stalls over {self.threshold}s; {len(stalls)} longest shown"]
+        for stall in stalls:
+            started = time.strftime("%H:%M:%S", time.localtime(stall["started_at"]))
+            lines.append("")
+            lines.append(f"{stall['duration']:.2f}s at {started} ({stall['samples']} samples)")
+            lines.extend(line.rstrip() for line in stall["stack"] or ["(no stack)"])
+        return "\n".join(lines)
+
+
+watchdog = StallWatchdog(threshold=float(os.environ.get("SCORER_STALL_THRESHOLD", DEFAULT_THRESHOLD_SECONDS)))
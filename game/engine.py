@@ -0,0 +1,309 @@
+"""
+The rules of a game, independent of any UI.
+
+`GameEngine` owns the phase state machine (name entry, deployment, first turn,
+play, game over), the initiative rolls, turns, rounds, CP and scoring. It only
+reads and writes a `GameState`; it does not import Kivy, save, broadcast or
+record history. The Kivy screens, the web command handlers and `HostedGame`
+call into it and then do those things themselves.
+
+Time and dice come from the injected `clock` (seconds, like `time.time`) and
+`rng` (like `random.Random`), so tests and simulations can run games
+deterministically and much faster than real time.
+"""
+
+import math
+import random
+import time
+from collections import namedtuple
+
+from state.model import PLAYER_IDS, GameState, other_player_id
+
+MAX_ROUNDS = 5
+# Every value `game_phase` takes, in the order a game goes through them
+PHASES = ('setup', 'name_entry', 'deployment_setup', 'first_turn_setup', 'game_play', 'game_over')
+TIMER_STATUSES = ('running', 'stopped')
+
+# Returned by `end_turn`; `game_over` is True if that turn ended the last round. `round_number`
+# is the round the turn was played in (`current_round` has already moved on after player 2's turn)
+TurnEnded = namedtuple("TurnEnded", ["player_id", "duration", "game_over", "round_number"])
+
+
+class GameEngine:
+    def __init__(self, state=None, clock=time.time, rng=None, max_rounds=MAX_ROUNDS):
+        self.state = state if state is not None else GameState()
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.max_rounds = max_rounds
+
+    # --- Setup phases ---
+
+    def new_game(self):
+        """Replaces the state with a fresh game at the name entry phase. Returns the new state."""
+        self.state = GameState()
+        self.state.game_phase = 'name_entry'
+        return self.state
+
+    def set_player_name(self, player_id, name):
+        player = self.state.players.get(player_id)
+        if player is None:
+            return False
+        player.name = name
+        return True
+
+    def start_deployment(self):
+        gs = self.state
+        gs.deployment_initiative_winner_id = None
+        gs.deployment_attacker_id = None
+        gs.deployment_defender_id = None
+        for player in gs.players.values():
+            player.deployment_roll = 0
+        gs.game_phase = 'deployment_setup'
+
+    def roll_deployment(self, player_id):
+        """
+        Rolls a player's deployment die. Once both have rolled the higher roll
+        wins the initiative; a tie clears both rolls to roll again. Returns the
+        roll, or None if the initiative is already decided.
+        """
+        gs = self.state
+        if gs.deployment_initiative_winner_id is not None:
+            return None
+        roll = self._roll()
+        gs.players[player_id].deployment_roll = roll
+
+        p1_roll, p2_roll = gs.players[1].deployment_roll, gs.players[2].deployment_roll
+        if p1_roll > 0 and p2_roll > 0:
+            if p1_roll != p2_roll:
+                gs.deployment_initiative_winner_id = 1 if p1_roll > p2_roll else 2
+            else:
+                gs.players[1].deployment_roll = 0
+                gs.players[2].deployment_roll = 0
+        return roll
+
+    def choose_deployment_role(self, chooser_id, chose_attacker):
+        if chooser_id is None:
+            return False
+        other_id = other_player_id(chooser_id)
+        gs = self.state
+        gs.deployment_attacker_id = chooser_id if chose_attacker else other_id
+        gs.deployment_defender_id = other_id if chose_attacker else chooser_id
+        return True
+
+    def start_first_turn(self):
+        gs = self.state
+        gs.first_turn_initiative_winner_id = None
+        gs.first_turn_player_id = None
+        for player in gs.players.values():
+            player.first_turn_roll = 0
+        gs.game_phase = 'first_turn_setup'
+
+    def roll_first_turn(self, player_id):
+        """
+        Rolls a player's first turn die. Once both have rolled the higher roll
+        wins; a tie goes to the attacker. Returns the roll, or None if the
+        winner is already decided.
+        """
+        gs = self.state
+        if gs.first_turn_initiative_winner_id is not None:
+            return None
+        roll = self._roll()
+        gs.players[player_id].first_turn_roll = roll
+
+        p1_roll, p2_roll = gs.players[1].first_turn_roll, gs.players[2].first_turn_roll
+        if p1_roll > 0 and p2_roll > 0:
+            if p1_roll != p2_roll:
+                gs.first_turn_initiative_winner_id = 1 if p1_roll > p2_roll else 2
+            else:
+                # Without an attacker the game would stall, so fall back to player 1
+                gs.first_turn_initiative_winner_id = gs.deployment_attacker_id or 1
+        return roll
+
+    def choose_first_turn(self, chooser_id, chose_self):
+        if chooser_id is None:
+            return False
+        gs = self.state
+        gs.first_turn_player_id = chooser_id if chose_self else other_player_id(chooser_id)
+        gs.first_player_of_game_id = gs.first_turn_player_id
+        return True
+
+    def start_game(self):
+        """Moves into play with the first turn player active. Returns False if nobody has been picked to start."""
+        gs = self.state
+        if not gs.first_turn_player_id:
+            return False
+        gs.active_player_id = gs.first_turn_player_id
+        gs.game_phase = 'game_play'
+        gs.current_round = 1
+        gs.status_message = f"Round 1 - Player {gs.active_player_id}'s Turn"
+        self.start_timer()
+        return True
+
+    # --- Timer ---
+
+    def start_timer(self):
+        """Starts the game clock (and the active player's turn clock) if it is stopped."""
+        timer = self.state.game_timer
+        if timer.is_running:
+            return False
+        now = self.clock()
+        timer.start_time = now
+        timer.turn_segment_start_time = now
+        timer.status = 'running'
+        return True
+
+    def stop_timer(self, bank_active_turn=False):
+        """
+        Stops the clocks and stores their final displays. With
+        `bank_active_turn`, the time the active player has spent on the
+        current turn is added to their total first (e.g. when the app exits).
+        """
+        gs = self.state
+        timer = gs.game_timer
+        if not timer.is_running:
+            return False
+        now = self.clock()
+        if bank_active_turn and gs.game_phase == 'game_play' and gs.active_player and timer.turn_segment_start_time:
+            gs.active_player.player_elapsed_time_seconds += now - timer.turn_segment_start_time
+            timer.turn_segment_start_time = now
+        gs.store_timer_displays(now)
+        timer.status = 'stopped'
+        return True
+
+    # --- Play ---
+
+    def set_score(self, player_id, value, score_type='primary'):
+        gs = self.state
+        player = gs.players.get(player_id)
+        if player is None or score_type not in ('primary', 'secondary'):
+            gs.status_message = "Error: Invalid player ID"
+            return False
+        if score_type == 'primary':
+            player.primary_score = value
+        else:
+            player.secondary_score = value
+        player.total_score = player.primary_score + player.secondary_score
+        gs.status_message = f"{player.name} Score Updated"
+        return True
+
+    def add_cp(self, player_id, amount=1):
+        gs = self.state
+        player = gs.players.get(player_id)
+        if gs.game_phase != 'game_play' or player is None:
+            return False
+        player.cp = max(0, player.cp + amount)
+        gs.status_message = f"{player.name} CP Updated"
+        return True
+
+    def remove_cp(self, player_id, amount=1):
+        gs = self.state
+        player = gs.players.get(player_id)
+        if gs.game_phase != 'game_play' or player is None:
+            return False
+        if player.cp == 0:
+            gs.status_message = f"{player.name} CP is 0"
+            return False
+        player.cp = max(0, player.cp - amount)
+        gs.status_message = f"{player.name} CP Updated"
+        return True
+
+    def end_turn(self, player_id=None):
+        """
+        Ends the active player's turn (`player_id` must be the active player if
+        given). The round advances after player 2's turn, and the game ends
+        after the last round. Returns a `TurnEnded`, or None if it was not
+        that player's turn.
+        """
+        gs = self.state
+        if player_id is None:
+            player_id = gs.active_player_id
+        if gs.game_phase != 'game_play' or player_id is None or player_id != gs.active_player_id:
+            return None
+
+        round_number = gs.current_round
+        timer = gs.game_timer
+        now = self.clock()
+        duration = now - timer.turn_segment_start_time if timer.turn_segment_start_time else 0.0
+        gs.players[player_id].player_elapsed_time_seconds += duration
+        gs.active_player_id = other_player_id(player_id)
+        timer.turn_segment_start_time = now
+
+        if player_id == 2:
+            gs.current_round += 1
+            if gs.current_round > self.max_rounds:
+                gs.game_phase = 'game_over'
+                gs.last_round_played = self.max_rounds
+                gs.status_message = "Game Over"
+                self.stop_timer()
+                return TurnEnded(player_id, duration, True, round_number)
+
+        gs.status_message = f"Round {gs.current_round} - Player {gs.active_player_id}'s Turn"
+        return TurnEnded(player_id, duration, False, round_number)
+
+    def concede(self, player_id):
+        """Ends the game with the other player as the winner. Returns the winner's id, or None."""
+        gs = self.state
+        if gs.game_phase != 'game_play' or player_id not in PLAYER_IDS:
+            return None
+        winner_id = other_player_id(player_id)
+        gs.game_phase = 'game_over'
+        gs.status_message = f"{gs.players[player_id].name} concedes. {gs.players[winner_id].name} wins!"
+        gs.last_round_played = gs.current_round
+        self.stop_timer()
+        return winner_id
+
+    # --- Direct edits (web clients) ---
+
+    def set_game_phase(self, phase):
+        """Moves to `phase`. Returns False, changing nothing, if it is not one of `PHASES`."""
+        if phase not in PHASES:
+            return False
+        self.state.game_phase = phase
+        return True
+
+    def set_round(self, round_number):
+        """Sets the current round. Returns False, changing nothing, unless it is a whole number from 1 to `max_rounds`."""
+        if not _is_number(round_number) or round_number != int(round_number) or not 1 <= round_number <= self.max_rounds:
+            return False
+        self.state.current_round = int(round_number)
+        return True
+
+    def update_timer(self, data):
+        """
+        Applies a partial timer dict (`status`, `start_time`,
+        `turn_segment_start_time`, `elapsed_display`). Returns False, changing
+        nothing, if any key is unknown or any value is invalid: the clock
+        arithmetic in `timer_seconds` and `end_turn` needs numeric times.
+        """
+        if not isinstance(data, dict) or not data:
+            return False
+        for key, value in data.items():
+            if key == 'status':
+                valid = value in TIMER_STATUSES
+            elif key in ('start_time', 'turn_segment_start_time'):
+                valid = value is None or _is_number(value)
+            elif key == 'elapsed_display':
+                valid = isinstance(value, str)
+            else:
+                valid = False
+            if not valid:
+                return False
+        self.state.game_timer.update(data)
+        return True
+
+    def winner_id(self):
+        """The player with the higher score once the game is over (None for a tie or an unfinished game)."""
+        gs = self.state
+        if gs.game_phase != 'game_over':
+            return None
+        p1_score, p2_score = gs.players[1].total_score, gs.players[2].total_score
+        if p1_score == p2_score:
+            return None
+        return 1 if p1_score > p2_score else 2
+
+    def _roll(self):
+        return self.rng.randint(1, 6)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
@@ -0,0 +1,116 @@
+"""
+Plays whole games through the headless `GameEngine` as fast as possible.
+
+Run from the repository root:
+
+    python -m game.simulation --games 10000
+    python -m game.simulation --games 10000 --seed 1 --json   # machine-readable output
+
+Each game goes through every phase the app does (names, deployment roll-off,
+first turn roll-off, five rounds of scoring and CP, game over), with a
+simulated clock so turns take minutes of game time and no wall time. A
+fraction of games end in a concession. Useful for checking rule changes and
+for measuring the cost of the rules themselves.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from game.engine import GameEngine
+
+
+class SimulatedClock:
+    """A clock that only moves when told to, for running games faster than real time."""
+
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def simulate_game(engine, clock, concede_chance=0.005):
+    """
+    Plays one game on `engine` from name entry to game over, drawing every
+    decision from the engine's RNG. Returns how the game ended ("rounds" or
+    "concede") and the winner's id (None for a tie).
+    """
+    rng = engine.rng
+    engine.new_game()
+    engine.set_player_name(1, "Player 1")
+    engine.set_player_name(2, "Player 2")
+
+    engine.start_deployment()
+    while engine.state.deployment_initiative_winner_id is None:
+        engine.roll_deployment(1)
+        engine.roll_deployment(2)
+    engine.choose_deployment_role(engine.state.deployment_initiative_winner_id, rng.random() < 0.5)
+
+    engine.start_first_turn()
+    engine.roll_first_turn(1)
+    engine.roll_first_turn(2)
+    engine.choose_first_turn(engine.state.first_turn_initiative_winner_id, rng.random() < 0.5)
+    engine.start_game()
+
+    gs = engine.state
+    while gs.game_phase == 'game_play':
+        player_id = gs.active_player_id
+        player = gs.players[player_id]
+        clock.advance(rng.uniform(60, 900))
+        engine.add_cp(player_id)
+        if rng.random() < 0.5:
+            engine.remove_cp(player_id)
+        engine.set_score(player_id, player.primary_score + rng.randint(0, 15), 'primary')
+        engine.set_score(player_id, player.secondary_score + rng.randint(0, 5), 'secondary')
+        if rng.random() < concede_chance: # per turn
+            return "concede", engine.concede(player_id)
+        engine.end_turn(player_id)
+    return "rounds", engine.winner_id()
+
+
+def run(games=1000, seed=None):
+    """Plays `games` games and returns a summary dict."""
+    clock = SimulatedClock()
+    engine = GameEngine(clock=clock, rng=random.Random(seed))
+    endings = {"rounds": 0, "concede": 0}
+    wins = {1: 0, 2: 0, None: 0}
+
+    start = time.perf_counter()
+    for _ in range(games):
+        ending, winner_id = simulate_game(engine, clock)
+        endings[ending] += 1
+        wins[winner_id] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "seconds": round(elapsed, 3),
+        "games_per_second": round(games / elapsed) if elapsed else None,
+        "endings": endings,
+        "wins": {"player1": wins[1], "player2": wins[2], "tie": wins[None]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible games")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args.games, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['games']} games in {result['seconds']}s ({result['games_per_second']} games/s)")
+    print(f"ended by rounds: {result['endings']['rounds']}, by concession: {result['endings']['concede']}")
+    print(f"wins: player 1 {result['wins']['player1']}, player 2 {result['wins']['player2']}, ties {result['wins']['tie']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 import platform # For OS detection
 import os # Import os
 import json # For saving/loading game state
-import time # Added for timer
-import qrcode
-import io
+import time
+
+# First, so the startup report covers every import below
+from diagnostics import startup
 
 from kivy.config import Config # Ensure Config is imported AFTER env vars are set
 
@@ -24,8 +25,8 @@ else:  # Default to development mode (e.g., macOS, Windows)
     Config.set('graphics', 'resizable', False)
 
 from kivy.core.window import Window # Ensure Window is imported AFTER Config changes
+startup.profiler.mark("import:kivy_window")
 
-import random # Added for initiative roll
 # Set default font *before* other Kivy components are imported if possible
 # Note: Paths here assume the script is run from the project root where assets/fonts exists.
 # If running from a different CWD, these paths might need to be absolute or adjusted.
@@ -34,35 +35,30 @@ from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button # Import Button
-from kivy.properties import StringProperty, DictProperty # Removed BooleanProperty, DictProperty, NumericProperty, ObjectProperty
+from kivy.properties import ObjectProperty # Removed BooleanProperty, DictProperty, NumericProperty
 from kivy.uix.popup import Popup # Import Popup
+from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp # Import dp from kivy.metrics
 from kivy.uix.screenmanager import ScreenManager, Screen, FadeTransition # Added ScreenManager, Screen, FadeTransition
 from kivy.clock import Clock # Added for timer updates
 from kivy.core.text import LabelBase # For registering fonts by name
-from db.integration import reset_db_for_new_game_sync
-from websocket_server import WebSocketServer
-from screens.screensaver_screen import ScreensaverScreen
-from screens.splash_screen import SplashScreen
-from screens.deployment_setup_screen import DeploymentSetupScreen
-from screens.name_entry_screen import NameEntryScreen
-from screens.first_turn_setup_screen import FirstTurnSetupScreen
-from screens.scorer_root_widget import ScorerRootWidget
-from screens.game_over_screen import GameOverScreen
-from screens.resume_or_new_screen import ResumeOrNewScreen
-
-# Register the Inter font family so it can be referred to by name 'Inter' in KV if needed.
-# This also acts as a fallback or explicit way to use it.
-
-# Register NotoColorEmoji font
-
-# Register Inter Black specifically for the new design
-_inter_black_font_path = "assets/fonts/Inter/static/Inter_18pt-Black.ttf"
-if os.path.exists(_inter_black_font_path):
-    LabelBase.register(name='InterBlack', fn_regular=_inter_black_font_path)
-    print(f"Registered font: InterBlack from {_inter_black_font_path}")
-else:
-    print(f"Warning: Font file not found at {_inter_black_font_path}. InterBlack will not be available.")
+from kivy.cache import Cache
+from kivy.uix.image import Image
+startup.profiler.mark("import:kivy_widgets")
+from db import integration as game_history
+from diagnostics import metrics, tracing, watchdog
+from web.command_bus import CommandBus
+from persistence.journal import GameJournal
+from persistence.save_scheduler import SaveScheduler
+from state.snapshot import SnapshotStore
+from state.store import StateStore
+from state.model import GameState
+from game.engine import GameEngine
+from screens.screen_registry import ScreenRegistry, deferred
+from widgets.qr_cache import QRCache
+# Screen modules, qrcode, the network popups and the web server (Flask, Socket.IO)
+# are imported where they are first used, not here
+startup.profiler.mark("import:app_modules")
 
 # Configure the window to be a fixed size, simulating the Pi screen for now
 # We can make this more dynamic or fullscreen later.
@@ -73,48 +69,96 @@ else:
 # --- New Setup Screens ---
 
 class ScorerApp(App):
-    game_state = DictProperty({})
+    game_state = ObjectProperty(None)
     SAVE_FILE_NAME = "game_state.json"
+    SAVE_COALESCE_WINDOW_SECONDS = 0.25 # Saves requested within this window are merged into one write
+    OBSERVER_BROADCAST_HZ = 2 # State updates per second sent to observer pages; players get every change
     VISIBLE_SPLASH_TIME = 4 # Desired visible time for the splash screen
     INACTIVITY_TIMEOUT_SECONDS = 60 # 5 minutes
+    INTER_BLACK_FONT_PATH = "assets/fonts/Inter/static/Inter_18pt-Black.ttf"
+    # Screens to build ahead, in idle frames, once a screen is shown
+    SCREEN_PREWARM = {
+        'resume_or_new': ['name_entry', 'game', 'screensaver'],
+        'name_entry': ['deployment_setup'],
+        'deployment_setup': ['first_turn_setup'],
+        'first_turn_setup': ['game'],
+        'game': ['game_over'],
+        'game_over': ['name_entry'],
+    }
+    # Screens not shown again once a screen is reached; their widgets and textures are dropped
+    SCREEN_EVICTIONS = {
+        'name_entry': ['splash', 'resume_or_new', 'game_over'],
+        'game': ['splash', 'resume_or_new', 'deployment_setup', 'first_turn_setup'],
+    }
     target_screen_after_splash = None
     last_active_screen = None # To store the screen before screensaver
-    p1_qr_path = StringProperty(".cache/p1_qr.png")
-    p2_qr_path = StringProperty(".cache/p2_qr.png")
-    observer_qr_path = StringProperty(".cache/observer_qr.png")
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # The game rules; screens and web handlers call into it, then save and update the UI
+        self.engine = GameEngine()
         self.game_state = self._get_default_game_state()
-        self.ws_server = WebSocketServer(
-            get_game_state_callback=self.get_game_state,
-            update_score_callback=self.handle_web_score_update,
-            increment_cp_callback=self.handle_web_increment_cp,
-            end_turn_callback=self.handle_web_end_turn,
-            concede_game_callback=self.handle_web_concede_game,
-        )
+        self.journal = None
+        # Immutable, structurally shared copies of game_state for other threads to read
+        self.snapshots = SnapshotStore(self.game_state.to_dict())
+        # The screens' widgets subscribe to the paths they show and update from each published snapshot
+        self.store = StateStore(self.snapshots.current)
+        self.save_scheduler = SaveScheduler(self._write_game_state, window=self.SAVE_COALESCE_WINDOW_SECONDS)
+        # Web events are queued here and applied on the Kivy thread, once per frame
+        self.command_bus = CommandBus()
+        self._draining_commands = False
+        self._save_requested_in_batch = False
+        self._batch_trace_ids = [] # trace ids of the commands whose saves a batch merged
+        # Started after the first frame (see _start_web_server); Flask is not imported until then
+        self.ws_server = None
+        # QR codes for the client URLs, kept in .cache/qr across restarts; the splash screen fills qr_textures
+        self.qr_cache = QRCache()
+        self.qr_textures = {}
+        startup.profiler.mark("app_init")
+
+    def _start_web_server(self, *args):
+        """Imports, creates and starts the web server. Runs in the frame after the first one."""
+        with startup.profiler.phase("web_server"):
+            from websocket_server import WebSocketServer
+            self.ws_server = WebSocketServer(
+                get_game_state_callback=self.get_game_state,
+                update_score_callback=self.handle_web_score_update,
+                increment_cp_callback=self.handle_web_increment_cp,
+                end_turn_callback=self.handle_web_end_turn,
+                concede_game_callback=self.handle_web_concede_game,
+                update_game_phase_callback=self.handle_web_game_phase_update,
+                update_round_callback=self.handle_web_round_update,
+                update_timer_callback=self.handle_web_timer_update,
+                observer_broadcast_hz=self.OBSERVER_BROADCAST_HZ,
+            )
+            self.ws_server.start()
+
+    def _register_fonts(self):
+        if os.path.exists(self.INTER_BLACK_FONT_PATH):
+            LabelBase.register(name='InterBlack', fn_regular=self.INTER_BLACK_FONT_PATH)
+            print(f"Registered font: InterBlack from {self.INTER_BLACK_FONT_PATH}")
+        else:
+            print(f"Warning: Font file not found at {self.INTER_BLACK_FONT_PATH}. InterBlack will not be available.")
+
+    def load_kv(self, filename=None):
+        # Fonts are registered before the rules that name them are loaded
+        with startup.profiler.phase("fonts"):
+            self._register_fonts()
+        with startup.profiler.phase("load_kv"):
+            return super().load_kv(filename)
 
     def _get_default_game_state(self):
-        """Returns a new, clean game state dictionary."""
-        return {
-            "player1": {"name": "Player 1", "primary_score": 0, "secondary_score": 0, "total_score": 0, "cp": 1, "deployment_roll": 0, "first_turn_roll": 0, "player_elapsed_time_seconds": 0.0, "player_time_display": "00:00:00"},
-            "player2": {"name": "Player 2", "primary_score": 0, "secondary_score": 0, "total_score": 0, "cp": 1, "deployment_roll": 0, "first_turn_roll": 0, "player_elapsed_time_seconds": 0.0, "player_time_display": "00:00:00"},
-            "current_round": 0,
-            "active_player_id": None,
-            "deployment_initiative_winner_id": None,
-            "deployment_attacker_id": None,
-            "deployment_defender_id": None,
-            "first_turn_choice_winner_id": None,
-            "first_player_of_game_id": None,
-            "last_round_played": 0,
-            "game_phase": "setup", # initial state
-            "game_timer": {"status": "stopped", "start_time": None, "elapsed_display": "00:00:00", "turn_segment_start_time": None}
-        }
+        """Returns a new, clean game state."""
+        return GameState()
 
     def reset_game_state_to_default(self):
         """Resets the current game state to the default."""
         self.game_state = self._get_default_game_state()
 
+    def on_game_state(self, instance, value):
+        # Whatever state the app holds (new, loaded or reset) is the one the engine plays
+        self.engine.state = value
+
     def show_error_popup(self, title, message):
         """Displays an error popup dialog."""
         popup_content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
@@ -126,14 +170,35 @@ class ScorerApp(App):
         ok_button.bind(on_press=popup.dismiss)
         popup.open()
 
+    def show_stall_report(self):
+        """Shows the longest main loop stalls recorded by the watchdog, with their stacks."""
+        report = Label(text=watchdog.watchdog.format_report(limit=5), font_size='12sp',
+                       halign='left', valign='top', size_hint_y=None)
+        report.bind(width=lambda label, width: setattr(label, 'text_size', (width, None)),
+                    texture_size=lambda label, size: setattr(label, 'height', size[1]))
+        scroll = ScrollView()
+        scroll.add_widget(report)
+        popup_content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+        popup_content.add_widget(scroll)
+        close_button = Button(text='Close', size_hint_y=None, height=dp(50))
+        popup_content.add_widget(close_button)
+
+        popup = Popup(title='Main Loop Stalls', content=popup_content, size_hint=(0.95, 0.9))
+        close_button.bind(on_press=popup.dismiss)
+        popup.open()
+
+    def _on_keyboard(self, window, key, scancode, codepoint, modifiers):
+        if key == 293: # F12
+            self.show_stall_report()
+            return True
+        return False
+
     def start_new_game_flow(self):
         """Initiates the sequence for starting a new game."""
-        # Reset the database synchronously
-        reset_db_for_new_game_sync()
-        # Reset the in-memory game state
-        self.reset_game_state_to_default()
-        # Update the game phase and save/broadcast
-        self.game_state['game_phase'] = 'name_entry'
+        # Close out any unfinished game in the history database (queued, does not block)
+        game_history.reset_db_for_new_game_sync()
+        # Reset the in-memory game state, starting at name entry, and save/broadcast it
+        self.game_state = self.engine.new_game()
         self.save_game_state()
         # Switch to the name entry screen
         if self.root:
@@ -141,87 +206,46 @@ class ScorerApp(App):
 
     def start_deployment_phase(self):
         """Resets deployment state and transitions to the screen."""
-        gs = self.game_state
-        gs['deployment_initiative_winner_id'] = None
-        gs['deployment_attacker_id'] = None
-        gs['deployment_defender_id'] = None
-        gs['player1']['deployment_roll'] = 0
-        gs['player2']['deployment_roll'] = 0
-        gs['game_phase'] = 'deployment_setup'
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.engine.start_deployment()
+        self.save_game_state()
         self.switch_screen('deployment_setup')
 
     def start_first_turn_phase(self):
         """Resets first turn state and transitions to the screen."""
-        gs = self.game_state
-        gs['first_turn_initiative_winner_id'] = None
-        gs['first_turn_player_id'] = None
-        gs['player1']['first_turn_roll'] = 0
-        gs['player2']['first_turn_roll'] = 0
-        gs['game_phase'] = 'first_turn_setup'
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.engine.start_first_turn()
+        self.save_game_state()
         self.switch_screen('first_turn_setup')
 
     def handle_first_turn_roll(self, player_id):
         """Handles the logic for a single player's first turn roll."""
-        if self.game_state.get("first_turn_initiative_winner_id") is not None:
+        if self.engine.roll_first_turn(player_id) is None:
             return
 
-        roll = random.randint(1, 6)
-        self.game_state[f'player{player_id}']['first_turn_roll'] = roll
-
-        p1_roll = self.game_state['player1'].get('first_turn_roll', 0)
-        p2_roll = self.game_state['player2'].get('first_turn_roll', 0)
-
-        if p1_roll > 0 and p2_roll > 0:
-            if p1_roll > p2_roll:
-                self.game_state['first_turn_initiative_winner_id'] = 1
-            elif p2_roll > p1_roll:
-                self.game_state['first_turn_initiative_winner_id'] = 2
-            else: # Tie goes to the attacker
-                winner = self.game_state.get('deployment_attacker_id')
-                if winner is None:
-                    # This is a fallback in case the attacker isn't set, which would stall the game.
-                    # Default to Player 1.
-                    print("Warning: deployment_attacker_id not set on first turn tie. Defaulting to Player 1.")
-                    winner = 1
-                self.game_state['first_turn_initiative_winner_id'] = winner
-
-        self._update_current_screen()
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.save_game_state()
 
     def handle_first_turn_choice(self, chooser_id, chose_self):
         """Handles the winner's choice of who takes the first turn."""
-        if chooser_id is None:
+        if not self.engine.choose_first_turn(chooser_id, chose_self):
             return
 
-        if chose_self:
-            self.game_state['first_turn_player_id'] = chooser_id
-        else:
-            self.game_state['first_turn_player_id'] = 2 if chooser_id == 1 else 1
-        
-        self.game_state['first_player_of_game_id'] = self.game_state['first_turn_player_id']
-
-        self._update_current_screen()
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.save_game_state()
 
     def start_game(self):
         """Finalizes state and transitions to the main game screen."""
         gs = self.game_state
-        gs['active_player_id'] = gs.get('first_turn_player_id')
-        if not gs['active_player_id']:
+        # Starts the game clock too; the game screen only schedules its display
+        if not self.engine.start_game():
             self.show_error_popup("Error", "First turn player not set.")
             return
 
-        gs['game_phase'] = 'game_play'
-        gs['current_round'] = 1
+        game_history.record_game_started(gs)
         
         # We save here *before* the transition to ensure the game screen has the latest state
         self.save_game_state() 
 
         # It's better to get the screen and call a method on it
         # than to have the screen listen for a state change.
-        scorer_screen = self.root.get_screen('game')
+        scorer_screen = self.screens.get('game')
         if hasattr(scorer_screen, 'start_timers_and_ui'):
             scorer_screen.start_timers_and_ui()
 
@@ -231,31 +255,79 @@ class ScorerApp(App):
         """Returns the full path to the save file in the user's data directory."""
         return os.path.join(self.user_data_dir, self.SAVE_FILE_NAME)
 
+    def get_journal(self):
+        """Returns the save journal, creating it on first use (user_data_dir is only valid once the app exists)."""
+        if self.journal is None:
+            self.journal = GameJournal(self.get_save_file_path())
+        return self.journal
+
     def save_game_state(self):
-        """Saves the current game state to a JSON file and triggers a broadcast."""
+        """
+        Schedules the game state to be saved and triggers a broadcast.
+        The disk write happens on the save scheduler's thread, merged with any
+        other saves requested within SAVE_COALESCE_WINDOW_SECONDS.
+        While a batch of web commands is being applied, the save (and broadcast)
+        happens once after the whole batch instead.
+        """
+        if self._draining_commands:
+            self._save_requested_in_batch = True
+            if tracing.current_id() is not None:
+                self._batch_trace_ids.append(tracing.current_id())
+            return
+        started = time.perf_counter()
         try:
-            with open(self.get_save_file_path(), 'w') as f:
-                json.dump(self.game_state, f)
-            # After saving, broadcast the new state to all clients
-            if self.ws_server:
-                self.ws_server.broadcast_game_state()
+            with tracing.span("save_game_state"):
+                # Snapshots are read-only, so the scheduler and the web server can share this one
+                with tracing.span("publish_snapshot"):
+                    self.snapshots.publish(self.game_state.to_dict())
+                version, snapshot = self.snapshots.head
+                # The snapshot version doubles as the change check, so saving never re-encodes the state
+                self.save_scheduler.request_save(snapshot, version=version)
+                # After saving, broadcast the new state to all clients
+                if self.ws_server:
+                    self.ws_server.broadcast_game_state()
+                with tracing.span("update_widgets"):
+                    self.store.update(snapshot)
         except Exception as e:
             print(f"Error saving game state: {e}")
+        metrics.SAVE_SECONDS.observe(time.perf_counter() - started)
+
+    def _drain_commands(self, dt):
+        """Applies the web commands queued since the last frame, then saves and broadcasts once."""
+        # Runs every frame, so dt is the frame time
+        metrics.FRAME_SECONDS.observe(dt)
+        watchdog.watchdog.heartbeat()
+        self._draining_commands = True
+        try:
+            self.command_bus.drain()
+        finally:
+            self._draining_commands = False
+        if self._save_requested_in_batch:
+            self._save_requested_in_batch = False
+            trace_ids, self._batch_trace_ids = self._batch_trace_ids, []
+            # The merged save is traced under the batch's first command
+            with tracing.correlation(trace_ids[0] if trace_ids else None), \
+                    tracing.span("batch_save", trace_ids=trace_ids):
+                self.save_game_state()
+
+    def _write_game_state(self, state):
+        """Runs on the save scheduler's thread with a private copy of the state."""
+        self.get_journal().record(state)
 
     def load_game_state(self):
         """
-        Loads the game state from the JSON file.
-        If the file doesn't exist or is invalid, returns a default state.
+        Loads the game state from the last snapshot plus the journal tail.
+        If nothing was saved or the snapshot is invalid, returns a default state.
         This also determines if a splash screen should be shown.
         """
-        save_file = self.get_save_file_path()
-        if os.path.exists(save_file):
+        journal = self.get_journal()
+        if journal.has_saved_state():
             try:
-                with open(save_file, 'r') as f:
-                    loaded_state = json.load(f)
+                loaded_state = journal.load()
                 # Basic validation to see if it's a meaningful game state
                 if loaded_state and 'game_phase' in loaded_state:
-                    self.game_state = loaded_state
+                    self.game_state = GameState.from_dict(loaded_state)
+                    self.store.update(self.snapshots.publish(loaded_state))
                     print("Successfully loaded game state from file.")
                     return True # Indicate that a load happened
             except (json.JSONDecodeError, KeyError) as e:
@@ -271,7 +343,9 @@ class ScorerApp(App):
         Determines the appropriate starting screen based on the game state.
         This allows resuming a game in progress.
         """
-        if self.game_state and self.game_state.get('game_in_progress'):
+        gs = self.game_state
+        in_progress = gs and gs.game_phase in ('deployment_setup', 'first_turn_setup', 'game_play')
+        if in_progress or (gs and gs.extra and gs.extra.get('game_in_progress')):
             # If a game is in progress, go to the resume/new screen
             return 'resume_or_new'
         else:
@@ -279,25 +353,47 @@ class ScorerApp(App):
             return 'name_entry'
 
     def build(self):
-        # Determine the initial screen based on saved state BEFORE building the UI
-        # This tells the splash screen where to go next.
-        self.target_screen_after_splash = self._determine_screen_from_gamestate()
-
-        sm = ScreenManager(transition=FadeTransition(duration=0.5))
-
-        # Pre-load all screens to make transitions instant after startup.
-        # The `name` property is crucial for the ScreenManager to identify screens.
-        sm.add_widget(Screen(name='startup')) # Blank startup screen
-        sm.add_widget(SplashScreen(name='splash'))
-        sm.add_widget(ResumeOrNewScreen(name='resume_or_new'))
-        sm.add_widget(NameEntryScreen(name='name_entry'))
-        sm.add_widget(DeploymentSetupScreen(name='deployment_setup'))
-        sm.add_widget(FirstTurnSetupScreen(name='first_turn_setup'))
-        sm.add_widget(ScorerRootWidget(name='game'))
-        sm.add_widget(GameOverScreen(name='game_over'))
-        sm.add_widget(ScreensaverScreen(name='screensaver'))
-
-        return sm
+        with startup.profiler.phase("build"):
+            # Restore the saved game (snapshot plus journal tail) so it can be resumed, and so
+            # the journal appends to it rather than compacting over it on the first save
+            self.load_game_state()
+            # Determine the initial screen based on saved state BEFORE building the UI
+            # This tells the splash screen where to go next.
+            self.target_screen_after_splash = self._determine_screen_from_gamestate()
+
+            sm = ScreenManager(transition=FadeTransition(duration=0.5))
+            # Only a blank screen is built for the first frame; the others are built when first
+            # shown, the likely next ones ahead of time in idle frames (see screens/screen_registry.py)
+            sm.add_widget(Screen(name='startup'))
+            prewarm = dict(self.SCREEN_PREWARM)
+            prewarm['splash'] = [self.target_screen_after_splash, 'screensaver']
+            self.screens = ScreenRegistry(
+                sm, schedule=Clock.schedule_once, prewarm=prewarm,
+                evict_on_enter=self.SCREEN_EVICTIONS, release=self._release_screen_textures,
+            )
+            self.screens.register('splash', deferred('screens.splash_screen', 'SplashScreen'))
+            self.screens.register('resume_or_new', deferred('screens.resume_or_new_screen', 'ResumeOrNewScreen'))
+            self.screens.register('name_entry', deferred('screens.name_entry_screen', 'NameEntryScreen'))
+            self.screens.register('deployment_setup', deferred('screens.deployment_setup_screen', 'DeploymentSetupScreen'))
+            self.screens.register('first_turn_setup', deferred('screens.first_turn_setup_screen', 'FirstTurnSetupScreen'))
+            self.screens.register('game', deferred('screens.scorer_root_widget', 'ScorerRootWidget'))
+            self.screens.register('game_over', deferred('screens.game_over_screen', 'GameOverScreen'))
+            self.screens.register('screensaver', deferred('screens.screensaver_screen', 'ScreensaverScreen'))
+
+            return sm
+
+    def _release_screen_textures(self, screen):
+        """Drops the image cache entries of a dropped screen that no remaining screen shows."""
+        in_use = {
+            widget.source for other in self.root.screens for widget in other.walk()
+            if isinstance(widget, Image) and widget.source
+        }
+        for widget in screen.walk():
+            if isinstance(widget, Image) and widget.source and widget.source not in in_use:
+                Cache.remove('kv.image', widget.source)
+                # Core images cache their textures as "<filename>|<mipmap>|<frame>"
+                for mipmap in (0, 1):
+                    Cache.remove('kv.texture', f"{widget.source}|{mipmap}|0")
 
     def transition_from_splash(self, target_screen_name, dt):
         """
@@ -305,106 +401,100 @@ class ScorerApp(App):
         """
         if self.root.current == 'splash':
             print(f"ScorerApp: Transitioning from splash to {target_screen_name}")
-            self.root.current = target_screen_name
+            self.switch_screen(target_screen_name)
             # Start the inactivity timer once the main app is visible
             self.reset_inactivity_timer()
 
-    def initialize_game_state(self):
-        self.game_state = self.load_game_state()
-
     def on_stop(self):
         """Called when the app is closing."""
         print("ScorerApp: on_stop called, attempting to save game state.")
         self.save_game_state()
+        self.save_scheduler.stop()
+        print(f"ScorerApp: save stats {self.save_scheduler.stats()}")
+        if self.journal:
+            # Fold the journal into a fresh snapshot so the next start reads a single file
+            self.journal.compact(self.snapshots.current)
+            self.journal.close()
+        game_history.close()
+        tracing.tracer.save()
+        watchdog.watchdog.stop()
+        if watchdog.watchdog.total_stalls:
+            print(watchdog.watchdog.format_report(limit=3))
         if self.ws_server:
             self.ws_server.stop()
         Clock.unschedule(self.start_screensaver)
 
     # --- Game State Update Methods ---
     def update_score(self, player_id, new_score):
-        player_key = f"player{player_id}"
-        if player_key in self.game_state:
-            self.game_state[player_key]['total_score'] = new_score
+        player = self.game_state.players.get(player_id)
+        if player:
+            player.total_score = new_score
             self.save_game_state()
 
     def update_cp(self, player_id, new_cp):
-        player_key = f"player{player_id}"
-        if player_key in self.game_state:
-            self.game_state[player_key]['cp'] = new_cp
+        player = self.game_state.players.get(player_id)
+        if player:
+            player.cp = new_cp
             self.save_game_state()
 
     def update_timer(self, timer_data):
-        self.game_state['game_timer'].update(timer_data)
+        self.game_state.game_timer.update(timer_data)
         self.save_game_state()
 
     def update_round(self, round_number):
-        self.game_state['current_round'] = round_number
+        self.game_state.current_round = round_number
         self.save_game_state()
 
     def update_game_phase(self, phase):
-        self.game_state['game_phase'] = phase
+        self.game_state.game_phase = phase
         self.save_game_state()
 
     def set_player_name(self, player_id, name):
-        player_key = f"player{player_id}"
-        if player_key in self.game_state:
-            self.game_state[player_key]['name'] = name
+        if self.engine.set_player_name(player_id, name):
             self.save_game_state()
 
     def get_game_state(self):
         """
-        Returns a copy of the game state, enriched with live timer data.
-        This prevents other parts of the app from accidentally modifying the state.
+        Returns the latest published snapshot. Safe to call from any thread:
+        the snapshot is immutable. Running clocks are not part of it; web
+        clients compute them from the timer anchors (see web/clock_sync.py).
         """
-        # Return a copy to prevent mutation
-        state_copy = self.game_state.copy()
-        
-        # Enrich with live timer data if the timer is running
-        if state_copy.get('game_timer', {}).get('status') == 'running':
-            time_now = time.time()
-            start_time = state_copy['game_timer'].get('start_time', time_now)
-            state_copy['game_timer']['elapsed_seconds'] = time_now - start_time
-            
-            active_player_id = state_copy.get('active_player_id')
-            if active_player_id:
-                player_key = f'player{active_player_id}'
-                player_data = state_copy.get(player_key, {})
-                segment_start_time = state_copy['game_timer'].get('turn_segment_start_time', time_now)
-                base_elapsed = player_data.get('player_elapsed_time_seconds', 0)
-                
-                # This is the crucial live value for the active player
-                player_data['live_elapsed_seconds'] = base_elapsed + (time_now - segment_start_time)
-                
-        return state_copy
+        return self.snapshots.current
 
     def switch_screen(self, screen_name):
         if self.root:
-            self.root.current = screen_name
+            # Builds the screen if needed, then prewarms and drops screens per SCREEN_PREWARM/SCREEN_EVICTIONS
+            self.screens.switch(screen_name)
 
     def on_start(self):
         """Called after build() and the root widget is created."""
-        # Step 1: Clean up old QR codes
-        for path in [self.p1_qr_path, self.p2_qr_path, self.observer_qr_path]:
-            if os.path.exists(path):
-                os.remove(path)
-
-        self.ws_server.start()
-        Window.bind(on_touch_down=self.reset_inactivity_timer)
-        Window.bind(on_flip=self._on_first_frame)
+        with startup.profiler.phase("on_start"):
+            Clock.schedule_interval(self._drain_commands, 0) # every frame
+            # _drain_commands beats every frame; the watchdog records the stack of any longer gap
+            watchdog.watchdog.start()
+            Window.bind(on_touch_down=self.reset_inactivity_timer)
+            Window.bind(on_keyboard=self._on_keyboard)
+            Window.bind(on_flip=self._on_first_frame)
 
     def _on_first_frame(self, *args):
         """This event is called after the first frame is drawn."""
         print("DIAGNOSTIC: First frame drawn, transitioning to splash screen.")
         # Unbind this method so it doesn't get called on every frame
         Window.unbind(on_flip=self._on_first_frame)
+        startup.profiler.finish()
+        if os.environ.get("SCORER_EXIT_AFTER_FIRST_FRAME") == "1":
+            # Cold start measurement run (benchmarks/startup.py)
+            Clock.schedule_once(lambda dt: self.stop())
+            return True
+        Clock.schedule_once(self._start_web_server)
         # Now it's safe to set the current screen
-        self.root.current = 'splash'
+        self.switch_screen('splash')
         return True # Returning True consumes the event
 
     def reset_inactivity_timer(self, *args):
         if self.root and self.root.current == 'screensaver':
             # If on screensaver, deactivate it and go to the last known screen
-            self.root.current = self.last_active_screen or self._get_screen_for_phase(self.game_state.get('game_phase', 'setup'))
+            self.switch_screen(self.last_active_screen or self._get_screen_for_phase(self.game_state.game_phase))
             # Still restart the timer after this interaction
         
         # Always cancel the pending call and schedule a new one
@@ -414,7 +504,7 @@ class ScorerApp(App):
     def start_screensaver(self, dt):
         if self.root and self.root.current not in ['screensaver', 'splash']:
             self.last_active_screen = self.root.current
-            self.root.current = 'screensaver'
+            self.switch_screen('screensaver')
 
     def _get_screen_for_phase(self, phase):
         phase_to_screen = {
@@ -429,138 +519,163 @@ class ScorerApp(App):
         return phase_to_screen.get(phase, "splash")  # Default to splash
 
     # --- Web Client Callback Handlers ---
+    # These run on the Flask-SocketIO threads. Each one only queues the command
+    # for the Kivy thread and returns its future, which the socket handler turns
+    # into the client's acknowledgement.
     def handle_web_score_update(self, data):
-        """Handles score updates received from a web client."""
+        return self.command_bus.submit(self._apply_web_score_update, data)
+
+    def handle_web_increment_cp(self, data):
+        return self.command_bus.submit(self._apply_web_increment_cp, data)
+
+    def handle_web_end_turn(self, data):
+        return self.command_bus.submit(self._apply_web_end_turn, data)
+
+    def handle_web_concede_game(self, data):
+        return self.command_bus.submit(self._apply_web_concede_game, data)
+
+    def handle_web_game_phase_update(self, data):
+        return self.command_bus.submit(self._apply_web_game_phase_update, data)
+
+    def handle_web_round_update(self, data):
+        return self.command_bus.submit(self._apply_web_round_update, data)
+
+    def handle_web_timer_update(self, data):
+        return self.command_bus.submit(self._apply_web_timer_update, data)
+
+    # The _apply_web_* methods run on the Kivy thread and return whether the command was applied.
+    def _apply_web_score_update(self, data):
+        """Applies a score update received from a web client."""
         player_id = data.get("player_id")
         score_type = data.get("score_type")  # 'primary' or 'secondary'
         value = data.get("value")
 
         if not all([player_id, score_type, value is not None]):
             print(f"Invalid score update data received: {data}")
-            return
-
-        player_key = f"player{player_id}"
-        score_key = f"{score_type}_score"
+            return False
 
-        if player_key in self.game_state and score_key in self.game_state[player_key]:
+        if player_id in self.game_state.players and score_type in ('primary', 'secondary'):
             # This is not a simple gatekeeper. This logic needs to move.
             # The App class should not be making game logic decisions.
             # It should delegate to the active screen.
-            game_screen = self.root.get_screen('game')
+            game_screen = self.screens.get('game')
             game_screen.process_numpad_value(
                 score_value=int(value),
                 player_id=player_id,
                 score_type=score_type
             )
             print(f"Web score update for P{player_id} delegated to ScorerRootWidget.")
+            return True
+        return False
 
-    def handle_web_increment_cp(self, data):
-        """Handles CP increment/decrement requests from a web client by delegating to the game screen."""
+    def _apply_web_increment_cp(self, data):
+        """Applies a CP increment/decrement from a web client by delegating to the game screen."""
         player_id = data.get("player_id")
         action = data.get("action") # "add" or "remove"
 
         if not player_id or not action:
             print(f"Invalid CP update data received: {data}")
-            return
+            return False
         
-        if self.root and self.root.has_screen("game"):
-            game_screen = self.root.get_screen("game")
+        if self.root:
+            game_screen = self.screens.get("game")
             if action == "add":
                 game_screen.add_cp(player_id)
                 print(f"Player {player_id} CP increment delegated via web client.")
+                return True
             elif action == "remove":
                 game_screen.remove_cp(player_id)
                 print(f"Player {player_id} CP decrement delegated via web client.")
+                return True
         else:
             print("Could not update CP: Game screen not found.")
+        return False
 
-    def handle_web_end_turn(self, data):
-        """Handles end turn requests from a web client."""
+    def _apply_web_end_turn(self, data):
+        """Applies an end turn request from a web client."""
         player_id = data.get("player_id")
         if not player_id:
-            return
+            return False
 
         # Ensure it's actually this player's turn before ending it
-        if self.game_state.get("active_player_id") == player_id:
+        if self.game_state.active_player_id == player_id:
             # Find the game screen and call its end_turn method
-            if self.root and self.root.has_screen("game"):
-                game_screen = self.root.get_screen("game")
+            if self.root:
+                game_screen = self.screens.get("game")
                 game_screen.end_turn()  # This will handle state changes and saving
                 print(f"Player {player_id} ended their turn via web client.")
-            else:
-                print("Could not end turn: Game screen not found.")
+                return True
+            print("Could not end turn: Game screen not found.")
         else:
             print(f"Player {player_id} tried to end turn, but it is not their turn.")
+        return False
 
-    def handle_web_concede_game(self, data):
-        """Handles a concession from a web client."""
+    def _apply_web_concede_game(self, data):
+        """Applies a concession from a web client."""
         player_id = data.get("player_id")
         if not player_id:
-            return
+            return False
 
         print(f"Player {player_id} has conceded the game.")
-        # Set the game phase to game_over
-        self.game_state["game_phase"] = "game_over"
+        if self.root:
+            # Same path as the concede button, so the timer is stopped and the history recorded
+            self.screens.get("game").player_concedes(player_id)
+            return True
+        winner_id = self.engine.concede(player_id)
+        if winner_id is None:
+            return False
+        game_history.record_game_finished(self.game_state, "concede", winner_id)
         self.save_game_state()
         self.switch_screen("game_over")
+        return True
+
+    def _apply_web_game_phase_update(self, data):
+        """Applies a game phase change from a web client, if it names a known phase."""
+        if not self.engine.set_game_phase(data.get("phase")):
+            print(f"Invalid game phase update data received: {data}")
+            return False
+        self.save_game_state()
+        return True
+
+    def _apply_web_round_update(self, data):
+        """Applies a round change from a web client, if the round is in the game."""
+        if not self.engine.set_round(data.get("round")):
+            print(f"Invalid round update data received: {data}")
+            return False
+        self.save_game_state()
+        return True
+
+    def _apply_web_timer_update(self, data):
+        """Applies a timer change from a web client, if every field is valid."""
+        # The trace id tags the command, it is not part of the timer
+        if not self.engine.update_timer({key: value for key, value in data.items() if key != "trace_id"}):
+            print(f"Invalid timer update data received: {data}")
+            return False
+        self.save_game_state()
+        return True
 
     def handle_deployment_roll(self, player_id):
         """Handles the logic for a single player's deployment roll."""
-        # Prevent rolling if a winner has already been decided
-        if self.game_state.get("deployment_initiative_winner_id") is not None:
+        # Nothing to do once the initiative has been decided
+        if self.engine.roll_deployment(player_id) is None:
             return
 
-        roll = random.randint(1, 6)
-        player_key = f"player{player_id}"
-        self.game_state[player_key]['deployment_roll'] = roll
-
-        # Check if both players have now rolled
-        p1_roll = self.game_state['player1']['deployment_roll']
-        p2_roll = self.game_state['player2']['deployment_roll']
-
-        if p1_roll > 0 and p2_roll > 0:
-            if p1_roll > p2_roll:
-                self.game_state['deployment_initiative_winner_id'] = 1
-            elif p2_roll > p1_roll:
-                self.game_state['deployment_initiative_winner_id'] = 2
-            else:  # Tie
-                # Reset rolls and let them try again
-                self.game_state['player1']['deployment_roll'] = 0
-                self.game_state['player2']['deployment_roll'] = 0
-        
-        self._update_current_screen()
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.save_game_state()
 
     def handle_deployment_role_choice(self, chooser_id, chose_attacker):
         """Handles the winner's choice of being Attacker or Defender."""
-        if chooser_id is None:
+        if not self.engine.choose_deployment_role(chooser_id, chose_attacker):
             return
 
-        if chose_attacker:
-            attacker_id = chooser_id
-            defender_id = 2 if chooser_id == 1 else 1
-        else:
-            defender_id = chooser_id
-            attacker_id = 2 if chooser_id == 1 else 1
-
-        self.game_state['deployment_attacker_id'] = attacker_id
-        self.game_state['deployment_defender_id'] = defender_id
-        self._update_current_screen()
-        Clock.schedule_once(lambda dt: self.save_game_state(), 0)
+        self.save_game_state()
 
     def proceed_to_first_turn_from_deployment(self):
         """Transitions the game state to the first turn setup phase."""
         self.start_first_turn_phase()
 
-    def _update_current_screen(self):
-        """Safely calls update_view_from_state on the current screen if it exists."""
-        current_screen = self.root.current_screen
-        if current_screen and hasattr(current_screen, 'update_view_from_state'):
-            current_screen.update_view_from_state()
-
     def update_game_phase(self, phase):
         """Updates the game phase and saves the state."""
-        self.game_state['game_phase'] = phase
+        self.game_state.game_phase = phase
         self.save_game_state()
 
 
@@ -89,7 +89,7 @@ def send_events():
 
 if __name__ == '__main__':
     try:
-        sio.connect('http://localhost:6969')
+        sio.connect('http://localhost:6969', auth={'role': f'player{PLAYER_ID}'})
         # Run the input loop in a separate thread so it doesn't block receiving messages
         input_thread = threading.Thread(target=send_events)
         input_thread.daemon = True
@@ -0,0 +1,27 @@
+import os
+
+
+def atomic_write(path, data):
+    """
+    Replaces `path` with `data` (str or bytes) so that readers and a power cut
+    only ever see the old file or the complete new one: the data is written to
+    a temp file, fsynced, renamed over the target and the directory is fsynced
+    to make the rename itself durable.
+    """
+    tmp_path = path + ".tmp"
+    mode = "wb" if isinstance(data, (bytes, bytearray)) else "w"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Directories can't be opened on every platform (e.g. Windows)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,162 @@
+import logging
+import os
+import time
+
+from diagnostics import metrics, tracing
+from persistence.atomic_file import atomic_write
+from state.delta import apply_ops, diff_state
+from state.serialization import get_serializer
+from state.snapshot import freeze
+
+logger = logging.getLogger(__name__)
+
+
+class GameJournal:
+    """
+    Persists the game state as a compacted snapshot plus an append-only journal.
+
+    The snapshot keeps the exact format of the old `game_state.json`, so existing
+    save files load unchanged. Every call to `record` appends one line with the
+    operations that changed since the previous call, which keeps a score tap down
+    to a small append instead of a full rewrite. Once the journal grows past
+    `compact_every` records (or a single change touches most of the state, e.g.
+    a reset for a new game) the snapshot is rewritten and the journal truncated.
+    Both files are JSON, encoded with the fastest available text serializer.
+
+    The snapshot also stores the `seq` of the last record folded into it, so a
+    crash between replacing the snapshot and truncating the journal does not
+    replay the old journal onto the new snapshot when it is loaded.
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+    # Key in the snapshot holding the last folded record's seq; not part of the state
+    SEQ_KEY = "_journal_seq"
+
+    def __init__(self, snapshot_path, compact_every=200, max_ops_per_record=24, fsync=True, serializer=None):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + self.JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self.max_ops_per_record = max_ops_per_record
+        self.fsync = fsync
+        self.serializer = serializer or get_serializer()
+        self._last_state = None
+        self._seq = 0
+        self._records_since_snapshot = 0
+        self._journal_file = None
+
+    def has_saved_state(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def load(self):
+        """
+        Rebuilds the state from the last snapshot plus the journal tail.
+        Returns None if nothing has been saved yet. A torn final journal line
+        (power loss mid-append) is dropped and cut from the file, so records
+        appended after it stay readable; everything before it is kept.
+        """
+        if not self.has_saved_state():
+            return None
+
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                state = self.serializer.loads(f.read())
+        snapshot_seq = state.pop(self.SEQ_KEY, 0)
+        self._seq = max(self._seq, snapshot_seq)
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            good_end = 0 # Bytes up to the end of the last complete record
+            torn = False
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = self.serializer.loads(line.decode("utf-8"))
+                    except ValueError:
+                        torn = True
+                        break
+                    if not line.endswith(b"\n"):
+                        # Complete but its newline was lost; the next append must not run onto it
+                        torn = True
+                    good_end += len(line)
+                    if record["seq"] <= snapshot_seq:
+                        # Already in the snapshot: a crash left the journal untruncated after compacting
+                        continue
+                    apply_ops(state, record["ops"])
+                    self._seq = record["seq"]
+                    replayed += 1
+            if torn:
+                # Otherwise the next record would be appended to the fragment and lost with it
+                logger.warning("Truncating torn record at the end of %s", self.journal_path)
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_end)
+                    if good_end and not self._ends_with_newline(f, good_end):
+                        f.seek(good_end)
+                        f.write(b"\n")
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+
+        self._last_state = freeze(state)
+        self._records_since_snapshot = replayed
+        return state
+
+    def record(self, state):
+        """Journals the changes since the previous call. Returns the number of operations written."""
+        if self._last_state is None:
+            self.compact(state)
+            return 0
+
+        ops = diff_state(self._last_state, state)
+        if not ops:
+            return 0
+
+        if len(ops) > self.max_ops_per_record or self._records_since_snapshot >= self.compact_every:
+            self.compact(state)
+            return len(ops)
+
+        self._seq += 1
+        with tracing.span("journal_encode", ops=len(ops)):
+            line = self.serializer.dumps({"seq": self._seq, "ops": ops}) + "\n"
+        journal = self._open_journal()
+        journal.write(line)
+        journal.flush()
+        if self.fsync:
+            with tracing.span("fsync"):
+                started = time.perf_counter()
+                os.fsync(journal.fileno())
+                metrics.FSYNC_SECONDS.observe(time.perf_counter() - started)
+
+        # Unchanged subtrees are shared, so the next diff only walks what changed
+        self._last_state = freeze(state, self._last_state)
+        self._records_since_snapshot += 1
+        return len(ops)
+
+    def compact(self, state):
+        """Atomically rewrites the snapshot from `state` and truncates the journal."""
+        with tracing.span("journal_compact"):
+            atomic_write(self.snapshot_path, self.serializer.dumps_bytes(dict(state, **{self.SEQ_KEY: self._seq})))
+
+        self._close_journal()
+        open(self.journal_path, "w").close()
+
+        self._last_state = freeze(state)
+        self._records_since_snapshot = 0
+
+    def close(self):
+        self._close_journal()
+
+    @staticmethod
+    def _ends_with_newline(f, end):
+        f.seek(end - 1)
+        return f.read(1) == b"\n"
+
+    def _open_journal(self):
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "a")
+        return self._journal_file
+
+    def _close_journal(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import threading
+
+from diagnostics import metrics, tracing
+from state.serialization import get_serializer
+
+logger = logging.getLogger(__name__)
+
+
+class SaveScheduler:
+    """
+    Coalesces save requests into one background write.
+
+    `request_save` only records the latest state and marks it dirty; it never
+    touches the disk. A worker thread waits `window` seconds after the first
+    dirty request, then hands the newest state to `write_fn` once. Requests that
+    arrive inside the window are merged into that write, and a write whose state
+    hashes the same as the previous one is skipped altogether. Callers that save
+    versioned snapshots pass the version instead, which spares the hash (a full
+    encode of the state) on every save.
+    """
+
+    def __init__(self, write_fn, window=0.25, serializer=None):
+        self.write_fn = write_fn
+        self.window = window
+        self.serializer = serializer or get_serializer()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._pending_version = None
+        self._pending_requests = 0
+        self._pending_trace_ids = []
+        self._last_digest = None
+        self._stopping = False
+        self._thread = None
+        self._stats = {"requested": 0, "written": 0, "merged": 0, "skipped_unchanged": 0, "failed": 0}
+
+    def request_save(self, state, version=None):
+        """
+        Schedules `state` to be written. The caller must not mutate `state`
+        afterwards, so pass a copy (or an immutable snapshot) of the live state.
+        If given, `version` must change whenever the state does.
+        """
+        with self._cond:
+            self._pending = state
+            self._pending_version = version
+            self._pending_requests += 1
+            trace_id = tracing.current_id()
+            if trace_id is not None:
+                self._pending_trace_ids.append(trace_id)
+            self._stats["requested"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SaveScheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Writes any pending state immediately. Returns True if something was written."""
+        with self._write_lock:
+            with self._cond:
+                state, version, requests = self._pending, self._pending_version, self._pending_requests
+                trace_ids = self._pending_trace_ids
+                self._pending, self._pending_version, self._pending_requests = None, None, 0
+                self._pending_trace_ids = []
+            if state is None:
+                return False
+
+            self._stats["merged"] += requests - 1
+            digest = ("version", version) if version is not None else self._digest(state)
+            if digest == self._last_digest:
+                self._stats["skipped_unchanged"] += 1
+                return False
+
+            # One write can carry several merged commands; it is tagged with the first and lists them all
+            first_trace_id = trace_ids[0] if trace_ids else None
+            try:
+                with metrics.SAVE_WRITE_SECONDS.time(), tracing.correlation(first_trace_id), \
+                        tracing.span("save_write", merged=requests, trace_ids=trace_ids):
+                    self.write_fn(state)
+            except Exception:
+                self._stats["failed"] += 1
+                logger.exception("Failed to write game state")
+                return False
+            self._last_digest = digest
+            self._stats["written"] += 1
+            if requests > 1:
+                logger.debug("Saved game state, merged %d save requests into one write", requests)
+            return True
+
+    def stop(self):
+        """Flushes pending work and stops the worker thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        """Returns counters for requested, written, merged, skipped and failed saves."""
+        with self._cond:
+            return dict(self._stats)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                # Let further requests pile up for one window before writing
+                self._cond.wait_for(lambda: self._stopping, timeout=self.window)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def _digest(self, state):
+        encoded = self.serializer.dumps_bytes(state, sort_keys=True)
+        return hashlib.blake2b(encoded, digest_size=16).digest()
@@ -0,0 +1,136 @@
+"""
+Decodes the screensaver's billboards off the Kivy thread, scaled to the window.
+
+The billboards are ~1.5k px PNGs of a few MB each. Setting an `Image.source`
+decodes one on the Kivy thread, right before the screensaver's crossfade,
+which stutters on the Pi. Instead, `prefetch(paths)` queues the next few
+images for a worker thread. It decodes each one and shrinks it to the
+window size with Pillow, then hands the pixels to the Kivy thread through
+`schedule`. The Kivy thread uploads the pixels as a texture (`make_texture`),
+which is the only step left on it. Textures are kept in a small LRU cache,
+and `get(path)` returns None until an image's texture is ready. The screen
+only swaps in ready textures, so a slow decode delays a slide instead of
+stalling a frame.
+
+Decode and upload times and the frames dropped during crossfades
+(`dropped_frames`) are recorded in diagnostics/metrics.py.
+"""
+
+import functools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from diagnostics import metrics
+
+logger = logging.getLogger(__name__)
+
+FRAME_BUDGET = 1 / 60 # Kivy's default maxfps
+
+
+def decode_scaled(path, size):
+    """Decodes `path` to RGB and shrinks it to fit `size` (never enlarges). Returns ((w, h), bytes), top row first."""
+    from PIL import Image # Pillow is only needed once the screensaver is built
+    with Image.open(path) as image:
+        image.draft("RGB", size) # JPEGs decode straight at a reduced scale
+        image = image.convert("RGB")
+    width, height = size
+    if image.width > width or image.height > height:
+        # The screensaver stretches to the window (fit_mode 'fill'), so the aspect ratio need not be kept
+        image = image.resize((min(image.width, width), min(image.height, height)),
+                             Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return image.size, image.tobytes()
+
+
+def make_texture(size, pixels):
+    """Uploads decoded RGB pixels as a texture. Kivy thread only."""
+    from kivy.graphics.texture import Texture
+    texture = Texture.create(size=size, colorfmt="rgb")
+    texture.blit_buffer(pixels, colorfmt="rgb", bufferfmt="ubyte")
+    texture.flip_vertical() # Pillow rows are top down, textures bottom up
+    return texture
+
+
+def dropped_frames(dt, frame_budget=FRAME_BUDGET):
+    """How many frames were missed in a frame that took `dt` seconds (0 when it was on time)."""
+    return max(0, int(dt / frame_budget + 0.5) - 1)
+
+
+class BillboardLoader:
+    def __init__(self, target_size, schedule, decode=decode_scaled, make_texture=make_texture, max_textures=4):
+        """
+        `target_size` is the (width, height) to shrink images to. `schedule(fn)`
+        must call `fn(dt)` on the Kivy thread. `max_textures` should cover the
+        two images on screen plus the ones prefetched ahead.
+        """
+        self.target_size = tuple(target_size)
+        self.schedule = schedule
+        self.decode = decode
+        self.make_texture = make_texture
+        self.max_textures = max_textures
+        self._textures = OrderedDict() # path -> texture, least recently used first
+        self._in_flight = set()
+        self._queue = queue.Queue()
+        self._thread = None
+        self.decoded = 0
+        self.failed = 0
+        self.evicted = 0
+
+    def get(self, path):
+        """The texture for `path` if it is ready, else None."""
+        texture = self._textures.get(path)
+        if texture is not None:
+            self._textures.move_to_end(path)
+        return texture
+
+    def is_ready(self, path):
+        return path in self._textures
+
+    def ready(self):
+        return list(self._textures)
+
+    def prefetch(self, paths):
+        """Queues the images in `paths` that are neither ready nor already being decoded."""
+        for path in paths:
+            if path in self._textures:
+                self._textures.move_to_end(path)
+            elif path not in self._in_flight:
+                self._in_flight.add(path)
+                self._queue.put(path)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="BillboardLoader", daemon=True)
+                    self._thread.start()
+
+    def wait(self):
+        """Blocks until every queued image has been decoded (their textures may not be made yet)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                start = time.perf_counter()
+                size, pixels = self.decode(path, self.target_size)
+                metrics.BILLBOARD_DECODE_SECONDS.observe(time.perf_counter() - start)
+                self.schedule(functools.partial(self._upload, path, size, pixels))
+            except Exception:
+                logger.exception("Could not decode billboard %s", path)
+                self.failed += 1
+                self.schedule(functools.partial(self._discard, path))
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, path, size, pixels, *args):
+        self._in_flight.discard(path)
+        with metrics.BILLBOARD_UPLOAD_SECONDS.time():
+            self._textures[path] = self.make_texture(size, pixels)
+        self.decoded += 1
+        while len(self._textures) > self.max_textures:
+            self._textures.popitem(last=False)
+            self.evicted += 1
+
+    def _discard(self, path, *args):
+        # A failed image may be asked for again by a later prefetch
+        self._in_flight.discard(path)
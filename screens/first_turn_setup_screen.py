@@ -5,6 +5,8 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.metrics import dp
 
+from screens.state_bindings import FIRST_TURN_SCREEN_BINDINGS, ScreenBindings
+
 # Behavior of this screen (mirrors DeploymentSetupScreen):
 # 1. Default visual state:
 #   - Player names displayed.
@@ -42,71 +44,32 @@ class FirstTurnSetupScreen(Screen):
     first_turn_status_label = ObjectProperty(None)
     start_game_button = ObjectProperty(None)
 
-    def on_pre_enter(self, *args):
-        """Called every time the screen is shown. Does an initial draw."""
-        self.update_view_from_state()
-
-    def update_view_from_state(self, *args):
-        """Updates the entire screen based on the central game_state."""
-        app = App.get_running_app()
-        if not app:
-            return
-        gs = app.game_state
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.state_bindings = ScreenBindings(
+            self, FIRST_TURN_SCREEN_BINDINGS,
+            subscribers=[(["first_turn_initiative_winner_id", "first_turn_player_id"], "update_choice_boxes")],
+        )
 
-        self.p1_name_label.text = gs['player1']['name']
-        self.p2_name_label.text = gs['player2']['name']
+    def on_pre_enter(self, *args):
+        """Called every time the screen is shown. Binding to the state does the initial draw."""
+        self.state_bindings.bind(App.get_running_app().store)
 
-        p1_roll = gs['player1'].get('first_turn_roll', 0)
-        p2_roll = gs['player2'].get('first_turn_roll', 0)
-        winner_id = gs.get('first_turn_initiative_winner_id')
-        first_turn_player_id = gs.get('first_turn_player_id')
+    def on_pre_leave(self, *args):
+        self.state_bindings.unbind()
 
-        # Clean state
-        self.p1_ft_roll_button.text = "Roll"
-        self.p2_ft_roll_button.text = "Roll"
+    def update_choice_boxes(self, winner_id, first_turn_player_id):
+        """Rebuilds the choice boxes; only called when the winner or the first turn choice changes."""
         self.p1_ft_choice_box.clear_widgets()
         self.p1_ft_choice_box.opacity = 0
         self.p2_ft_choice_box.clear_widgets()
         self.p2_ft_choice_box.opacity = 0
-        
-        self.p1_ft_roll_display_label.text = str(p1_roll) if p1_roll > 0 else ""
-        self.p2_ft_roll_display_label.text = str(p2_roll) if p2_roll > 0 else ""
-
-        self.p1_ft_roll_button.disabled = p1_roll > 0 or winner_id is not None
-        self.p2_ft_roll_button.disabled = p2_roll > 0 or winner_id is not None
-
-        if winner_id is None:
-            # --- State: Before a winner is decided ---
-            if p1_roll > 0:
-                self.first_turn_status_label.text = f"Waiting for {gs['player2']['name']} to roll..."
-            elif p2_roll > 0:
-                self.first_turn_status_label.text = f"Waiting for {gs['player1']['name']} to roll..."
-            else:
-                self.first_turn_status_label.text = "Roll for First Turn. Winner chooses who goes first."
-        elif first_turn_player_id is None:
-            # --- State: Winner decided, but turn not chosen ---
-            winner_name = gs[f'player{winner_id}']['name']
-            if p1_roll == p2_roll:
-                attacker_name = gs[f"player{gs['deployment_attacker_id']}"]['name']
-                self.first_turn_status_label.text = f"Tie! {attacker_name} (Attacker) chooses who goes first."
-            else:
-                self.first_turn_status_label.text = f"{winner_name} wins! Choose who takes the first turn."
 
+        if winner_id is not None and first_turn_player_id is None:
             # Show choice buttons for the winner
             winner_choice_box = self.p1_ft_choice_box if winner_id == 1 else self.p2_ft_choice_box
             winner_choice_box.opacity = 1
             self._setup_choice_buttons(winner_choice_box, winner_id)
-        else:
-            # --- State: First turn player decided ---
-            p1_turn_text = "First" if first_turn_player_id == 1 else "Second"
-            p2_turn_text = "First" if first_turn_player_id == 2 else "Second"
-            self.p1_ft_roll_display_label.text = p1_turn_text
-            self.p2_ft_roll_display_label.text = p2_turn_text
-
-            starting_player_name = gs[f'player{first_turn_player_id}']["name"]
-            self.first_turn_status_label.text = f"{starting_player_name} will take the first turn! Click 'Start Game' below."
-        
-        self.start_game_button.disabled = first_turn_player_id is None
 
     def _setup_choice_buttons(self, choice_box, winner_id):
         """Helper to create and add first turn choice buttons."""
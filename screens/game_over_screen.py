@@ -22,25 +22,24 @@ class GameOverScreen(Screen):
     def on_pre_enter(self, *args):
         gs = App.get_running_app().game_state
         
-        # Use .get() for safe access to potentially missing keys
-        p1_stats = gs.get('player1', {})
-        p2_stats = gs.get('player2', {})
-        timer_stats = gs.get('game_timer', {})
+        p1_stats = gs.players[1]
+        p2_stats = gs.players[2]
+        timer_stats = gs.game_timer
 
         winner_text = ""
-        raw_status_message = gs.get("status_message", "Game Over")
+        raw_status_message = gs.status_message or "Game Over"
         status_message_lower = raw_status_message.lower()
         print(f"GameOverScreen.on_pre_enter: Raw status_message from game_state: '{raw_status_message}'")
 
-        p1_score = p1_stats.get('total_score', 0)
-        p2_score = p2_stats.get('total_score', 0)
+        p1_score = p1_stats.total_score
+        p2_score = p2_stats.total_score
 
         if "concedes." in status_message_lower and "wins!" in status_message_lower:
             winner_text = raw_status_message
             print(f"GameOverScreen: Detected concession. Winner text set to: '{winner_text}'")
         else:
-            p1_name = p1_stats.get('name', 'Player 1')
-            p2_name = p2_stats.get('name', 'Player 2')
+            p1_name = p1_stats.name
+            p2_name = p2_stats.name
             if p1_score > p2_score:
                 winner_text = f"{p1_name} Wins by Score!"
             elif p2_score > p1_score:
@@ -52,22 +51,22 @@ class GameOverScreen(Screen):
         if self.result_status_label: self.result_status_label.text = winner_text
         
         # Populate Player 1 Stats safely
-        if self.p1_final_name_label: self.p1_final_name_label.text = f"{p1_stats.get('name', 'P1')}"
+        if self.p1_final_name_label: self.p1_final_name_label.text = f"{p1_stats.name}"
         if self.p1_final_score_label: self.p1_final_score_label.text = f"{p1_score}"
-        if self.p1_final_cp_label: self.p1_final_cp_label.text = f"CP: {p1_stats.get('cp', 0)}"
-        if self.p1_final_time_label: self.p1_final_time_label.text = f"{p1_stats.get('player_time_display', '00:00:00')}"
+        if self.p1_final_cp_label: self.p1_final_cp_label.text = f"CP: {p1_stats.cp}"
+        if self.p1_final_time_label: self.p1_final_time_label.text = f"{p1_stats.player_time_display}"
 
         # Populate Player 2 Stats safely
-        if self.p2_final_name_label: self.p2_final_name_label.text = f"{p2_stats.get('name', 'P2')}"
+        if self.p2_final_name_label: self.p2_final_name_label.text = f"{p2_stats.name}"
         if self.p2_final_score_label: self.p2_final_score_label.text = f"{p2_score}"
-        if self.p2_final_cp_label: self.p2_final_cp_label.text = f"CP: {p2_stats.get('cp', 0)}"
-        if self.p2_final_time_label: self.p2_final_time_label.text = f"{p2_stats.get('player_time_display', '00:00:00')}"
+        if self.p2_final_cp_label: self.p2_final_cp_label.text = f"CP: {p2_stats.cp}"
+        if self.p2_final_time_label: self.p2_final_time_label.text = f"{p2_stats.player_time_display}"
 
         # Populate Game Stats safely
-        if self.total_game_time_label: self.total_game_time_label.text = f"Total Game Time: {timer_stats.get('elapsed_display', '00:00:00')}"
-        if self.rounds_played_label: self.rounds_played_label.text = f"Rounds Played: {gs.get('last_round_played', 5)}"
+        if self.total_game_time_label: self.total_game_time_label.text = f"Total Game Time: {timer_stats.elapsed_display}"
+        if self.rounds_played_label: self.rounds_played_label.text = f"Rounds Played: {gs.last_round_played}"
 
-        attacker_id = gs.get('deployment_attacker_id')
+        attacker_id = gs.deployment_attacker_id
         p1_role = "Attacker" if attacker_id == 1 else "Defender"
         p2_role = "Attacker" if attacker_id == 2 else "Defender"
 
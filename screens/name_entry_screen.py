@@ -45,8 +45,8 @@ class NameEntryScreen(Screen):
         Populates fields and sets up bindings.
         """
         app = App.get_running_app()
-        p1_name = app.game_state.get('player_1', {}).get('name', 'Player 1')
-        p2_name = app.game_state.get('player_2', {}).get('name', 'Player 2')
+        p1_name = app.game_state.players[1].name
+        p2_name = app.game_state.players[2].name
 
         self.player1_name_input.text = p1_name
         self.player2_name_input.text = p2_name
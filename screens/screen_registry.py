@@ -0,0 +1,103 @@
+"""
+Builds the app's screens when they are first needed instead of all in `build()`.
+
+Each screen is registered with a factory. `get(name)` builds and adds it to
+the `ScreenManager` on first use; `switch(name)` does that and shows it. After
+a switch, the screens likely to come next are built ahead of time, one per
+idle frame, and screens the app will not go back to are dropped (widget tree
+removed, then `release(screen)` frees what it cached, e.g. textures), so
+neither the first frame nor the running game carries screens it does not
+need. A dropped screen is simply built again if it is ever asked for.
+
+Kivy is only reached through the manager and the `schedule` callable
+(`Clock.schedule_once` in the app), so the policy can be tested without it.
+Factories made with `deferred()` also put off importing the screen's module
+(and whatever it imports) until the screen is built.
+"""
+
+import importlib
+
+
+def deferred(module, class_name):
+    """A screen factory that imports `module` the first time the screen is built."""
+    def factory(**kwargs):
+        return getattr(importlib.import_module(module), class_name)(**kwargs)
+    return factory
+
+
+class ScreenRegistry:
+    def __init__(self, manager, schedule, prewarm=None, evict_on_enter=None, release=None):
+        """
+        `prewarm` maps a screen name to the screens to build ahead once it is
+        shown; `evict_on_enter` maps it to the screens to drop. `schedule(fn)`
+        must call `fn(dt)` on a later frame.
+        """
+        self.manager = manager
+        self.schedule = schedule
+        self.prewarm_after = dict(prewarm or {})
+        self.evict_on_enter = dict(evict_on_enter or {})
+        self.release = release
+        self._factories = {}
+        self._pending = [] # ("build" | "evict", name), worked off one per idle frame
+        self._scheduled = False
+        self.builds = 0
+        self.evictions = 0
+
+    def register(self, name, factory):
+        """`factory(name=name)` must return the screen; it is only called when the screen is needed."""
+        self._factories[name] = factory
+
+    def is_built(self, name):
+        return self.manager.has_screen(name)
+
+    def get(self, name):
+        """Returns the screen, building it now if it has not been built (or was dropped)."""
+        if not self.manager.has_screen(name):
+            if name not in self._factories:
+                raise KeyError(f"No screen registered as '{name}'")
+            self.manager.add_widget(self._factories[name](name=name))
+            self.builds += 1
+        return self.manager.get_screen(name)
+
+    def switch(self, name):
+        self.get(name)
+        self.manager.current = name
+        for other in self.evict_on_enter.get(name, ()):
+            self._queue("evict", other)
+        for other in self.prewarm_after.get(name, ()):
+            self._queue("build", other)
+
+    def evict(self, name):
+        """Drops a built screen. Returns False (and keeps it) if it is the visible one or not built."""
+        if not self.manager.has_screen(name) or name == self.manager.current:
+            return False
+        screen = self.manager.get_screen(name)
+        self.manager.remove_widget(screen)
+        self.evictions += 1
+        if self.release is not None:
+            self.release(screen)
+        return True
+
+    def _queue(self, action, name):
+        # A later request for the same screen wins (e.g. built again after being queued for eviction)
+        self._pending = [item for item in self._pending if item[1] != name]
+        self._pending.append((action, name))
+        if not self._scheduled:
+            self._scheduled = True
+            self.schedule(self._work)
+
+    def _work(self, dt):
+        self._scheduled = False
+        if not self._pending:
+            return
+        # Removing a screen mid-fade would cut the transition short; wait for it to finish
+        transition = getattr(self.manager, "transition", None)
+        if not getattr(transition, "is_active", False):
+            action, name = self._pending.pop(0)
+            if action == "build":
+                self.get(name)
+            else:
+                self.evict(name)
+        if self._pending:
+            self._scheduled = True
+            self.schedule(self._work)
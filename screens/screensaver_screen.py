@@ -4,10 +4,16 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.image import Image
 from kivy.uix.label import Label
 from kivy.clock import Clock
+from kivy.core.window import Window
 from kivy.uix.floatlayout import FloatLayout
 from kivy.animation import Animation
 from kivy.app import App
 
+from diagnostics import metrics
+from screens.billboard_loader import BillboardLoader, dropped_frames
+
+PREFETCH_AHEAD = 2 # Images decoded ahead of the one on screen
+
 
 class ScreensaverScreen(Screen):
     def __init__(self, **kwargs):
@@ -18,6 +24,10 @@ class ScreensaverScreen(Screen):
         self.slideshow_event = None
         self.images_shown = 0
         self.max_images_to_show = 0
+        self.loader = None
+        self._fading = False
+        self._frame_event = None
+        self._retry_slide = Clock.create_trigger(self.next_slide, 0.5)
 
         layout = FloatLayout()
         self.image_widget_front = Image(fit_mode='fill', opacity=1)
@@ -35,27 +45,65 @@ class ScreensaverScreen(Screen):
             self.remove_widget(layout)
             self.add_widget(Label(text="No billboard images found in assets/billboards", font_size='20sp'))
         else:
-            self.image_widget_front.source = self.image_files[0]
+            # Decoded and scaled to the window in the background, before the screensaver is first shown
+            self.loader = BillboardLoader(Window.size, schedule=Clock.schedule_once, max_textures=PREFETCH_AHEAD + 2)
+            self.loader.prefetch(self.image_files[:PREFETCH_AHEAD + 1])
+
+    def _upcoming(self):
+        """The image due on the back widget and the ones after it."""
+        count = min(PREFETCH_AHEAD, len(self.image_files))
+        return [self.image_files[(self.current_image_index + offset) % len(self.image_files)] for offset in range(count)]
+
+    def _show(self, widget, path):
+        """Puts the texture for `path` on `widget`. Returns False if it has not been decoded yet."""
+        texture = self.loader.get(path)
+        if texture is None:
+            return False
+        if widget.source:
+            widget.source = ''
+        widget.texture = texture
+        return True
 
     def start_slideshow(self):
         self.stop_slideshow() # Ensure no old events are running
         if len(self.image_files) > 1:
-            # Set the initial image for the back widget to avoid a black screen on first transition
+            # The back widget gets its texture in next_slide, once the loader has it ready
             self.current_image_index = (self.current_image_index + 1) % len(self.image_files)
-            self.image_widget_back.source = self.image_files[self.current_image_index]
+            self.loader.prefetch(self._upcoming())
             self.slideshow_event = Clock.schedule_interval(self.next_slide, 15)
 
     def stop_slideshow(self):
         if self.slideshow_event:
             self.slideshow_event.cancel()
             self.slideshow_event = None
+        self._retry_slide.cancel()
+        self._stop_frame_count()
         # Also cancel any running animations to prevent them from finishing on leave
         Animation.cancel_all(self.image_widget_front)
         Animation.cancel_all(self.image_widget_back)
+        self._fading = False
+
+    def _count_frame(self, dt):
+        dropped = dropped_frames(dt)
+        if dropped:
+            metrics.BILLBOARD_TRANSITION_DROPPED_FRAMES.inc(dropped)
 
+    def _stop_frame_count(self):
+        if self._frame_event:
+            self._frame_event.cancel()
+            self._frame_event = None
 
     def next_slide(self, dt):
-        # The back image is already loaded from the previous call or start_slideshow
+        if self._fading:
+            return
+        # Only a texture the loader has ready is swapped in; otherwise try again shortly
+        if not self._show(self.image_widget_back, self.image_files[self.current_image_index]):
+            metrics.BILLBOARD_NOT_READY.inc()
+            self.loader.prefetch(self._upcoming())
+            self._retry_slide()
+            return
+        self._fading = True
+        self._frame_event = Clock.schedule_interval(self._count_frame, 0)
         # Animate the front image to transparent and the back image to opaque
         anim_front = Animation(opacity=0, duration=2)
         anim_back = Animation(opacity=1, duration=2)
@@ -65,6 +113,8 @@ class ScreensaverScreen(Screen):
         anim_back.start(self.image_widget_back)
 
     def _on_animation_complete(self, animation, widget):
+        self._fading = False
+        self._stop_frame_count()
         self.images_shown += 1
         if self.max_images_to_show > 0 and self.images_shown >= self.max_images_to_show:
             self._finish_slideshow()
@@ -73,7 +123,7 @@ class ScreensaverScreen(Screen):
         # Swap the widgets
         self.image_widget_front, self.image_widget_back = self.image_widget_back, self.image_widget_front
         self.current_image_index = (self.current_image_index + 1) % len(self.image_files)
-        self.image_widget_back.source = self.image_files[self.current_image_index]
+        self.loader.prefetch(self._upcoming())
 
     def _finish_slideshow(self, *args):
         """Safely tells the main app to exit the screensaver."""
@@ -89,10 +139,14 @@ class ScreensaverScreen(Screen):
         self.image_widget_back.opacity = 0
 
         if self.image_files:
-            # Re-shuffle, reset index, and set the first image
+            # Re-shuffle, putting the images already decoded first, reset index, and set the first image
             random.shuffle(self.image_files)
+            ready = set(self.loader.ready())
+            self.image_files.sort(key=lambda path: path not in ready)
             self.current_image_index = 0
-            self.image_widget_front.source = self.image_files[self.current_image_index]
+            if not self._show(self.image_widget_front, self.image_files[0]):
+                # Shown before the loader finished its first image; this one is decoded here, as it used to be
+                self.image_widget_front.source = self.image_files[0]
             
             # Set the counter and limit for this run
             self.images_shown = 1
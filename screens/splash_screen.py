@@ -2,12 +2,9 @@ from kivy.app import App
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ObjectProperty
 import threading
-import qrcode
 from kivy.clock import Clock
-import os
 from network_utils import is_raspberry_pi, get_local_ip, check_network_connection
-from kivy.core.image import Image as CoreImage
-from widgets.network import ConnectPopup
+from widgets.qr_cache import client_urls
 
 class SplashScreen(Screen):
     loading_indicator = ObjectProperty(None)
@@ -42,6 +39,8 @@ class SplashScreen(Screen):
             Clock.schedule_once(self._open_connect_popup)
 
     def _open_connect_popup(self, dt):
+        # Only needed when the Pi is offline, so the RecycleView-based popups are imported here
+        from widgets.network import ConnectPopup
         popup = ConnectPopup()
         popup.bind(on_dismiss=self._on_connect_popup_dismiss)
         popup.open()
@@ -53,55 +52,32 @@ class SplashScreen(Screen):
     def _generate_qr_codes_task(self, ip_address=None):
         """
         This runs in a background thread to avoid blocking the UI.
+        The codes come from the on-disk QR cache; they are only rendered (with qrcode) when the IP has changed.
         """
         app = App.get_running_app()
-        
-        # Ensure the .cache directory exists
-        cache_dir = os.path.dirname(app.p1_qr_path)
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-
-        ip = ip_address or get_local_ip()
-        port = 6969
-        
-        # Observer
-        observer_url = f"http://{ip}:{port}/"
-        observer_qr_img = qrcode.make(observer_url)
-        observer_qr_img.save(app.observer_qr_path)
+        urls = client_urls(ip_address or get_local_ip())
+        for url in urls.values():
+            app.qr_cache.pixels(url)
 
-        # Player 1
-        p1_url = f"http://{ip}:{port}/player/1"
-        p1_qr_img = qrcode.make(p1_url)
-        p1_qr_img.save(app.p1_qr_path)
-
-        # Player 2
-        p2_url = f"http://{ip}:{port}/player/2"
-        p2_qr_img = qrcode.make(p2_url)
-        p2_qr_img.save(app.p2_qr_path)
-        
         # Once done, schedule the UI update on the main thread
-        Clock.schedule_once(self._on_qr_codes_generated)
+        Clock.schedule_once(lambda dt: self._on_qr_codes_generated(urls))
 
-    def _on_qr_codes_generated(self, dt):
+    def _on_qr_codes_generated(self, urls):
         """
         This runs on the main Kivy thread to safely update the UI.
-        It pre-loads the QR code images and updates the widgets on the next screen.
+        It turns the cached QR codes into textures and sets them on the next screen.
         """
         app = App.get_running_app()
 
-        # Step 1: Pre-load the images into Kivy's cache to ensure they are ready.
-        CoreImage(app.p1_qr_path).texture
-        CoreImage(app.p2_qr_path).texture
-        CoreImage(app.observer_qr_path).texture
+        # Step 1: Make the textures; the network popup reuses them from app.qr_textures
+        app.qr_textures = {role: app.qr_cache.texture(url) for role, url in urls.items()}
 
         # Step 2: Get the NameEntryScreen and update its Image widgets directly.
-        name_entry_screen = app.root.get_screen('name_entry')
+        name_entry_screen = app.screens.get('name_entry') # built now if the registry has not prewarmed it yet
         if name_entry_screen.p1_qr_code:
-            name_entry_screen.p1_qr_code.source = app.p1_qr_path
-            name_entry_screen.p1_qr_code.reload()
+            name_entry_screen.p1_qr_code.texture = app.qr_textures['player1']
         if name_entry_screen.p2_qr_code:
-            name_entry_screen.p2_qr_code.source = app.p2_qr_path
-            name_entry_screen.p2_qr_code.reload()
+            name_entry_screen.p2_qr_code.texture = app.qr_textures['player2']
         
         # Step 3: Now that everything is loaded, show the start button.
         self.loading_indicator.opacity = 0
@@ -0,0 +1,208 @@
+"""
+Which state paths each screen's widget properties show, and how.
+
+Each binding is (widget attribute on the screen, property, state paths,
+compute), applied with `StateStore.bind_property`, so a CP change only
+rewrites the CP label. Widgets that are rebuilt rather than set (the choice
+buttons of the setup screens) subscribe a screen method to their paths
+instead. This module does not import Kivy, so the UI update benchmark
+(benchmarks/ui_updates.py) drives the same tables the screens use.
+"""
+
+ROLL_PATHS = ["player1.deployment_roll", "player2.deployment_roll"]
+FIRST_TURN_ROLL_PATHS = ["player1.first_turn_roll", "player2.first_turn_roll"]
+NAME_PATHS = ["player1.name", "player2.name"]
+
+
+def _name_text(player_id):
+    def compute(name, game_phase, active_player_id):
+        if game_phase == "game_play" and active_player_id == player_id:
+            return f"{name} - Active"
+        return name
+    return compute
+
+
+def _end_turn_visible(player_id):
+    def compute(game_phase, active_player_id):
+        return game_phase == "game_play" and active_player_id == player_id
+    return compute
+
+
+def _round_text(game_phase, current_round, last_round_played):
+    if game_phase == "game_play":
+        return f"Round {current_round}"
+    if game_phase == "game_over":
+        return f"Round {last_round_played} (Game Over)"
+    return "Round: -"
+
+
+def _player_bindings(player_id):
+    player = f"player{player_id}"
+    p = f"p{player_id}"
+    end_turn_visible = _end_turn_visible(player_id)
+    return [
+        (f"{p}_name_label", "text", [f"{player}.name", "game_phase", "active_player_id"], _name_text(player_id)),
+        (f"{p}_score_label", "text", [f"{player}.total_score"], str),
+        (f"{p}_cp_label", "text", [f"{player}.cp"], lambda cp: f"Command Points: {cp}"),
+        (f"{p}_role_label", "text", ["deployment_attacker_id"],
+         lambda attacker_id: "Attacker" if attacker_id == player_id else "Defender"),
+        (f"{p}_end_turn_button", "opacity", ["game_phase", "active_player_id"],
+         lambda *values: 1 if end_turn_visible(*values) else 0),
+        (f"{p}_end_turn_button", "disabled", ["game_phase", "active_player_id"],
+         lambda *values: not end_turn_visible(*values)),
+        (f"{p}_concede_button", "opacity", ["game_phase"], lambda phase: 1 if phase == "game_play" else 0),
+        (f"{p}_concede_button", "disabled", ["game_phase"], lambda phase: phase != "game_play"),
+    ]
+
+
+GAME_SCREEN_BINDINGS = (
+    [("header_round_label", "text", ["game_phase", "current_round", "last_round_played"], _round_text)]
+    + _player_bindings(1)
+    + _player_bindings(2)
+)
+
+
+
+def _roll_text(roll):
+    return str(roll) if roll > 0 else ""
+
+
+def _roll_disabled(roll, winner_id):
+    return roll > 0 or winner_id is not None
+
+
+def _deployment_roll_button_text(player_id):
+    def compute(p1_roll, p2_roll, winner_id):
+        if winner_id is None:
+            if p1_roll > 0 and p2_roll > 0:
+                return f"Tie ({p1_roll if player_id == 1 else p2_roll})"
+            return "Roll"
+        # Equal rolls count as a player 2 win, as the screen always showed it
+        return "Win" if (p1_roll > p2_roll) == (player_id == 1) else "Lose"
+    return compute
+
+
+def _deployment_status(p1_name, p2_name, p1_roll, p2_roll, winner_id, attacker_id):
+    if attacker_id:
+        return "Deploy your units and click 'Continue' below."
+    if winner_id is not None:
+        return f"{p1_name if winner_id == 1 else p2_name} wins! Choose Attacker or Defender."
+    if p1_roll > 0 and p2_roll > 0:
+        return "Tie! Both players re-roll for deployment."
+    if p1_roll > 0:
+        return f"Waiting for {p2_name} to roll..."
+    if p2_roll > 0:
+        return f"Waiting for {p1_name} to roll..."
+    return "Roll for who deploys first. Winner chooses Attacker/Defender."
+
+
+def _deployment_player_bindings(player_id):
+    player = f"player{player_id}"
+    p = f"p{player_id}"
+    return [
+        (f"{p}_name_label", "text", [f"{player}.name"], None),
+        (f"{p}_roll_display_label", "text", [f"{player}.deployment_roll"], _roll_text),
+        (f"{p}_roll_button", "text", ROLL_PATHS + ["deployment_initiative_winner_id"],
+         _deployment_roll_button_text(player_id)),
+        (f"{p}_roll_button", "disabled", [f"{player}.deployment_roll", "deployment_initiative_winner_id"],
+         _roll_disabled),
+    ]
+
+
+DEPLOYMENT_SCREEN_BINDINGS = (
+    _deployment_player_bindings(1)
+    + _deployment_player_bindings(2)
+    + [
+        ("deployment_status_label", "text",
+         NAME_PATHS + ROLL_PATHS + ["deployment_initiative_winner_id", "deployment_attacker_id"],
+         _deployment_status),
+        ("continue_to_first_turn_button", "disabled", ["deployment_attacker_id"], lambda attacker_id: not attacker_id),
+    ]
+)
+
+
+def _first_turn_roll_text(player_id):
+    def compute(roll, first_turn_player_id):
+        if first_turn_player_id is not None:
+            return "First" if first_turn_player_id == player_id else "Second"
+        return _roll_text(roll)
+    return compute
+
+
+def _first_turn_status(p1_name, p2_name, p1_roll, p2_roll, winner_id, first_turn_player_id, attacker_id):
+    names = {1: p1_name, 2: p2_name}
+    if winner_id is None:
+        if p1_roll > 0:
+            return f"Waiting for {p2_name} to roll..."
+        if p2_roll > 0:
+            return f"Waiting for {p1_name} to roll..."
+        return "Roll for First Turn. Winner chooses who goes first."
+    if first_turn_player_id is None:
+        if p1_roll == p2_roll:
+            return f"Tie! {names.get(attacker_id)} (Attacker) chooses who goes first."
+        return f"{names[winner_id]} wins! Choose who takes the first turn."
+    return f"{names[first_turn_player_id]} will take the first turn! Click 'Start Game' below."
+
+
+def _first_turn_player_bindings(player_id):
+    player = f"player{player_id}"
+    p = f"p{player_id}"
+    return [
+        (f"{p}_name_label", "text", [f"{player}.name"], None),
+        (f"{p}_ft_roll_display_label", "text", [f"{player}.first_turn_roll", "first_turn_player_id"],
+         _first_turn_roll_text(player_id)),
+        (f"{p}_ft_roll_button", "disabled", [f"{player}.first_turn_roll", "first_turn_initiative_winner_id"],
+         _roll_disabled),
+    ]
+
+
+FIRST_TURN_SCREEN_BINDINGS = (
+    _first_turn_player_bindings(1)
+    + _first_turn_player_bindings(2)
+    + [
+        ("first_turn_status_label", "text",
+         NAME_PATHS + FIRST_TURN_ROLL_PATHS
+         + ["first_turn_initiative_winner_id", "first_turn_player_id", "deployment_attacker_id"],
+         _first_turn_status),
+        ("start_game_button", "disabled", ["first_turn_player_id"], lambda player_id: player_id is None),
+    ]
+)
+
+
+def bind_widgets(store, screen, bindings):
+    """Binds each widget property in `bindings` to the store. Returns the subscriptions."""
+    return [
+        store.bind_property(getattr(screen, widget), prop, paths, compute)
+        for widget, prop, paths, compute in bindings
+    ]
+
+
+class ScreenBindings:
+    """
+    A screen's subscriptions: bound when it is entered (which also draws it
+    from the current state) and cancelled when it is left, so hidden screens
+    do no work. `subscribers` are (paths, method name) pairs for widgets the
+    screen rebuilds itself.
+    """
+
+    def __init__(self, screen, bindings, subscribers=()):
+        self.screen = screen
+        self.bindings = bindings
+        self.subscribers = subscribers
+        self._subscriptions = []
+
+    @property
+    def bound(self):
+        return bool(self._subscriptions)
+
+    def bind(self, store):
+        if self._subscriptions:
+            return
+        self._subscriptions = bind_widgets(store, self.screen, self.bindings)
+        for paths, method in self.subscribers:
+            self._subscriptions.append(store.subscribe(paths, getattr(self.screen, method)))
+
+    def unbind(self):
+        for subscription in self._subscriptions:
+            subscription.cancel()
+        self._subscriptions = []
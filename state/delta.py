@@ -0,0 +1,67 @@
+"""
+Structural diffs between game state dictionaries.
+
+A change set is a flat list of operations so it can be appended to the save
+journal as-is:
+
+    ["set", ["player1", "cp"], 3]
+    ["del", ["status_message"]]
+"""
+
+
+def clone_state(value):
+    """Returns a deep copy of a JSON-like structure (dicts, lists and scalars)."""
+    if isinstance(value, dict):
+        return {key: clone_state(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone_state(item) for item in value]
+    return value
+
+
+def diff_state(old, new):
+    """Returns the list of operations that turns `old` into `new`."""
+    ops = []
+    _diff_into(old, new, [], ops)
+    return ops
+
+
+def _diff_into(old, new, path, ops):
+    if old is new:
+        return
+    for key, value in new.items():
+        if key in old:
+            old_value = old[key]
+            if old_value is value:
+                continue
+            if isinstance(value, dict) and isinstance(old_value, dict):
+                _diff_into(old_value, value, path + [key], ops)
+                continue
+            # type() check keeps 1 -> 1.0 and 0 -> False visible as changes
+            if type(old_value) is type(value) and old_value == value:
+                continue
+        ops.append(["set", path + [key], value])
+    for key in old:
+        if key not in new:
+            ops.append(["del", path + [key]])
+
+
+def apply_ops(state, ops, copy_values=False):
+    """
+    Applies operations produced by diff_state to `state` in place.
+    Missing intermediate dictionaries are created on the way down.
+    """
+    for op in ops:
+        kind, path = op[0], op[1]
+        target = state
+        for key in path[:-1]:
+            child = target.get(key)
+            if not isinstance(child, dict):
+                child = target[key] = {}
+            target = child
+        if kind == "set":
+            target[path[-1]] = clone_state(op[2]) if copy_values else op[2]
+        elif kind == "del":
+            target.pop(path[-1], None)
+        else:
+            raise ValueError(f"Unknown state operation: {kind}")
+    return state
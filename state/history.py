@@ -0,0 +1,35 @@
+from collections import deque
+
+
+class VersionHistory:
+    """
+    Ring buffer of the operations that produced each recent state version.
+
+    Entry `(v, ops)` holds the operations that turn version v - 1 into v, so a
+    client holding any version still covered by the buffer can be caught up
+    by replaying the entries after it in order.
+    """
+
+    def __init__(self, capacity=256):
+        self._entries = deque(maxlen=capacity)
+
+    def append(self, version, ops):
+        self._entries.append((version, ops))
+
+    def clear(self):
+        self._entries.clear()
+
+    def ops_since(self, version, current_version):
+        """
+        Returns the operations that bring `version` up to `current_version`,
+        or None if `version` has left the buffer (or never existed).
+        """
+        if version == current_version:
+            return []
+        if not self._entries or version > current_version or version < self._entries[0][0] - 1:
+            return None
+        ops = []
+        for entry_version, entry_ops in self._entries:
+            if entry_version > version:
+                ops.extend(entry_ops)
+        return ops
@@ -0,0 +1,233 @@
+"""
+Typed, slotted game state model.
+
+`GameState` replaces the nested dict that used to live in `ScorerApp.game_state`.
+Players are indexed by number (`gs.players[1]`), so hot paths no longer build
+`f"player{player_id}"` keys. `to_dict` / `from_dict` convert to and from the
+original dict layout, which is what save files, snapshots and web clients see.
+Keys the model does not know about are kept in `extra` and written back out,
+so older (or newer) save files round-trip unchanged.
+"""
+
+PLAYER_IDS = (1, 2)
+
+
+def other_player_id(player_id):
+    return 2 if player_id == 1 else 1
+
+
+def format_hms(total_seconds):
+    total_seconds = int(total_seconds)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}"
+
+
+class PlayerState:
+    __slots__ = (
+        "name", "primary_score", "secondary_score", "total_score", "cp",
+        "deployment_roll", "first_turn_roll", "player_elapsed_time_seconds",
+        "player_time_display", "extra",
+    )
+
+    def __init__(self, name="Player"):
+        self.name = name
+        self.primary_score = 0
+        self.secondary_score = 0
+        self.total_score = 0
+        self.cp = 1
+        self.deployment_roll = 0
+        self.first_turn_roll = 0
+        self.player_elapsed_time_seconds = 0.0
+        self.player_time_display = "00:00:00"
+        self.extra = None
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "primary_score": self.primary_score,
+            "secondary_score": self.secondary_score,
+            "total_score": self.total_score,
+            "cp": self.cp,
+            "deployment_roll": self.deployment_roll,
+            "first_turn_roll": self.first_turn_roll,
+            "player_elapsed_time_seconds": self.player_elapsed_time_seconds,
+            "player_time_display": self.player_time_display,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data, default_name="Player"):
+        player = cls(data.get("name", default_name))
+        player.primary_score = data.get("primary_score", 0)
+        player.secondary_score = data.get("secondary_score", 0)
+        player.total_score = data.get("total_score", 0)
+        player.cp = data.get("cp", 1)
+        player.deployment_roll = data.get("deployment_roll", 0)
+        player.first_turn_roll = data.get("first_turn_roll", 0)
+        player.player_elapsed_time_seconds = data.get("player_elapsed_time_seconds", 0.0)
+        player.player_time_display = data.get("player_time_display", "00:00:00")
+        player.extra = _extra_keys(data, cls.__slots__)
+        return player
+
+
+class GameTimer:
+    __slots__ = ("status", "start_time", "elapsed_display", "turn_segment_start_time", "extra")
+
+    def __init__(self):
+        self.status = "stopped"
+        self.start_time = None
+        self.elapsed_display = "00:00:00"
+        self.turn_segment_start_time = None
+        self.extra = None
+
+    @property
+    def is_running(self):
+        return self.status == "running"
+
+    def update(self, data):
+        """Applies a partial timer dict, as sent by `update_timer`."""
+        for key, value in data.items():
+            if key in self.__slots__ and key != "extra":
+                setattr(self, key, value)
+            else:
+                self.extra = dict(self.extra or {}, **{key: value})
+
+    def to_dict(self):
+        data = {
+            "status": self.status,
+            "start_time": self.start_time,
+            "elapsed_display": self.elapsed_display,
+            "turn_segment_start_time": self.turn_segment_start_time,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        timer = cls()
+        timer.status = data.get("status", "stopped")
+        timer.start_time = data.get("start_time")
+        timer.elapsed_display = data.get("elapsed_display", "00:00:00")
+        timer.turn_segment_start_time = data.get("turn_segment_start_time")
+        timer.extra = _extra_keys(data, cls.__slots__)
+        return timer
+
+
+class GameState:
+    __slots__ = (
+        "game_id", "players", "current_round", "active_player_id",
+        "deployment_initiative_winner_id", "deployment_attacker_id", "deployment_defender_id",
+        "first_turn_initiative_winner_id", "first_turn_player_id", "first_turn_choice_winner_id",
+        "first_player_of_game_id", "last_round_played", "game_phase", "status_message",
+        "game_timer", "extra",
+    )
+
+    def __init__(self):
+        self.game_id = None # key of this game in the history database
+        self.players = {player_id: PlayerState(f"Player {player_id}") for player_id in PLAYER_IDS}
+        self.current_round = 0
+        self.active_player_id = None
+        self.deployment_initiative_winner_id = None
+        self.deployment_attacker_id = None
+        self.deployment_defender_id = None
+        self.first_turn_initiative_winner_id = None
+        self.first_turn_player_id = None
+        self.first_turn_choice_winner_id = None
+        self.first_player_of_game_id = None
+        self.last_round_played = 0
+        self.game_phase = "setup" # initial state
+        self.status_message = None
+        self.game_timer = GameTimer()
+        self.extra = None
+
+    @property
+    def active_player(self):
+        return self.players.get(self.active_player_id)
+
+    def timer_seconds(self, now):
+        """
+        Returns (total_seconds, {player_id: seconds}) for the clocks at `now`.
+        Only meaningful while the timer is running; the active player's current
+        turn is included in their time.
+        """
+        timer = self.game_timer
+        total = now - timer.start_time if timer.is_running and timer.start_time else None
+        segment = 0
+        if timer.is_running and self.game_phase == "game_play" and timer.turn_segment_start_time:
+            segment = now - timer.turn_segment_start_time
+        players = {
+            player_id: player.player_elapsed_time_seconds + (segment if player_id == self.active_player_id else 0)
+            for player_id, player in self.players.items()
+        }
+        return total, players
+
+    def store_timer_displays(self, now):
+        """
+        Writes the clocks at `now` into the display strings kept in the state
+        (shown on the game over screens once the timer has stopped). Timers are
+        not written every second; screens compute running clocks themselves.
+        """
+        total, players = self.timer_seconds(now)
+        if total is not None:
+            self.game_timer.elapsed_display = format_hms(total)
+        for player_id, seconds in players.items():
+            self.players[player_id].player_time_display = format_hms(seconds)
+
+    def to_dict(self):
+        data = {
+            "player1": self.players[1].to_dict(),
+            "player2": self.players[2].to_dict(),
+            "current_round": self.current_round,
+            "active_player_id": self.active_player_id,
+            "deployment_initiative_winner_id": self.deployment_initiative_winner_id,
+            "deployment_attacker_id": self.deployment_attacker_id,
+            "deployment_defender_id": self.deployment_defender_id,
+            "first_turn_initiative_winner_id": self.first_turn_initiative_winner_id,
+            "first_turn_player_id": self.first_turn_player_id,
+            "first_turn_choice_winner_id": self.first_turn_choice_winner_id,
+            "first_player_of_game_id": self.first_player_of_game_id,
+            "last_round_played": self.last_round_played,
+            "game_phase": self.game_phase,
+            "game_timer": self.game_timer.to_dict(),
+        }
+        if self.game_id is not None:
+            data["game_id"] = self.game_id
+        # Older clients and save files only carry a status message once one was set
+        if self.status_message is not None:
+            data["status_message"] = self.status_message
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        gs = cls()
+        gs.game_id = data.get("game_id")
+        gs.players = {
+            player_id: PlayerState.from_dict(data.get(f"player{player_id}", {}), f"Player {player_id}")
+            for player_id in PLAYER_IDS
+        }
+        gs.current_round = data.get("current_round", 0)
+        gs.active_player_id = data.get("active_player_id")
+        gs.deployment_initiative_winner_id = data.get("deployment_initiative_winner_id")
+        gs.deployment_attacker_id = data.get("deployment_attacker_id")
+        gs.deployment_defender_id = data.get("deployment_defender_id")
+        gs.first_turn_initiative_winner_id = data.get("first_turn_initiative_winner_id")
+        gs.first_turn_player_id = data.get("first_turn_player_id")
+        gs.first_turn_choice_winner_id = data.get("first_turn_choice_winner_id")
+        gs.first_player_of_game_id = data.get("first_player_of_game_id")
+        gs.last_round_played = data.get("last_round_played", 0)
+        gs.game_phase = data.get("game_phase", "setup")
+        gs.status_message = data.get("status_message")
+        gs.game_timer = GameTimer.from_dict(data.get("game_timer", {}))
+        gs.extra = _extra_keys(data, cls.__slots__ + ("player1", "player2"))
+        return gs
+
+
+def _extra_keys(data, known):
+    extra = {key: value for key, value in data.items() if key not in known}
+    return extra or None
@@ -0,0 +1,153 @@
+"""
+Pluggable encoders for the game state.
+
+Saves and Socket.IO payloads are the two places the state gets serialized. Both
+go through a serializer from `get_serializer()`, which prefers orjson when it is
+installed and falls back to the standard library `json` module otherwise.
+MessagePack is available as a binary backend for web clients that ask for it;
+save files always stay JSON so they remain readable and backwards compatible.
+
+Set `SCORER_SERIALIZER=json` (or `orjson`) to force a text backend.
+"""
+
+import json
+import logging
+import os
+
+try:
+    import orjson
+except ImportError: # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError: # optional dependency
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_ENV_VAR = "SCORER_SERIALIZER"
+
+
+class JsonSerializer:
+    """Standard library json. Always available."""
+
+    name = "json"
+    binary = False
+
+    def dumps(self, obj, sort_keys=False):
+        """Returns `obj` encoded as compact JSON text."""
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"))
+
+    def dumps_bytes(self, obj, sort_keys=False):
+        return self.dumps(obj, sort_keys=sort_keys).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson: same JSON output as JsonSerializer, several times faster."""
+
+    name = "orjson"
+    binary = False
+
+    def dumps(self, obj, sort_keys=False):
+        return self.dumps_bytes(obj, sort_keys=sort_keys).decode("utf-8")
+
+    def dumps_bytes(self, obj, sort_keys=False):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """MessagePack: smaller binary frames for clients that can decode them."""
+
+    name = "msgpack"
+    binary = True
+
+    def dumps(self, obj, sort_keys=False):
+        # msgpack has no key sorting; game state dicts keep insertion order
+        return msgpack.packb(obj, use_bin_type=True)
+
+    dumps_bytes = dumps
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+_BACKENDS = {
+    "json": (JsonSerializer, lambda: True),
+    "orjson": (OrjsonSerializer, lambda: orjson is not None),
+    "msgpack": (MsgpackSerializer, lambda: msgpack is not None),
+}
+
+# Preference order for JSON text, used for saves and default Socket.IO frames
+_TEXT_PREFERENCE = ("orjson", "json")
+
+
+def available_serializers():
+    """Returns the names of the backends that can be used in this environment."""
+    return [name for name, (_, is_available) in _BACKENDS.items() if is_available()]
+
+
+def get_serializer(name=None, binary=False):
+    """
+    Returns a serializer instance.
+
+    With no `name`, the `SCORER_SERIALIZER` environment variable is used, then
+    the fastest available text backend. An unknown or unavailable backend (or a
+    binary one when `binary` is False) falls back to that default with a warning.
+    """
+    name = name or os.environ.get(SERIALIZER_ENV_VAR)
+    if name:
+        backend = _BACKENDS.get(name)
+        if backend is None or not backend[1]():
+            logger.warning(f"Serializer '{name}' is not available, falling back to JSON.")
+        elif backend[0].binary and not binary:
+            logger.warning(f"Serializer '{name}' is binary and cannot be used here, falling back to JSON.")
+        else:
+            return backend[0]()
+    for fallback in _TEXT_PREFERENCE:
+        serializer_class, is_available = _BACKENDS[fallback]
+        if is_available():
+            return serializer_class()
+    return JsonSerializer()
+
+
+class PreEncoded:
+    """
+    JSON text that has already been encoded. Emitting one through Socket.IO
+    splices the text into the packet as-is instead of encoding the value again.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class SocketIOJson:
+    """
+    Adapts a text serializer to the `json` module interface that
+    python-socketio expects (`SocketIO(app, json=SocketIOJson(...))`).
+    Extra keyword arguments such as `separators` are ignored; every backend
+    already produces compact output.
+    """
+
+    def __init__(self, serializer=None):
+        self.serializer = serializer or get_serializer()
+
+    def dumps(self, obj, *args, **kwargs):
+        # Event packets are encoded as [event_name, *args]
+        if isinstance(obj, list) and any(isinstance(item, PreEncoded) for item in obj):
+            return "[" + ",".join(
+                item.text if isinstance(item, PreEncoded) else self.serializer.dumps(item)
+                for item in obj
+            ) + "]"
+        return self.serializer.dumps(obj)
+
+    def loads(self, data, *args, **kwargs):
+        return self.serializer.loads(data)
@@ -0,0 +1,104 @@
+"""
+Immutable, structurally shared snapshots of the game state.
+
+The Kivy thread keeps mutating its live `game_state` dict; at each commit point
+(`ScorerApp.save_game_state`) it publishes a frozen snapshot. Subtrees that did
+not change are reused from the previous snapshot, so publishing is cheap and
+`old[key] is new[key]` tells readers (the journal, the web server's differ)
+that a whole subtree can be skipped. Readers on other threads only ever see a
+complete, read-only version and need no lock.
+"""
+
+import threading
+
+_MISSING = object()
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict. It is still a real dict subclass, so json, orjson and
+    Socket.IO encode it exactly like the plain dict it replaces.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Game state snapshots are read-only; mutate the live game_state instead")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value, previous=_MISSING):
+    """
+    Returns an immutable copy of `value`, reusing every part of `previous`
+    (an earlier frozen snapshot) that is unchanged. If nothing changed,
+    `previous` itself is returned.
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        prev_dict = previous if isinstance(previous, FrozenDict) else None
+        changed = prev_dict is None or len(prev_dict) != len(value)
+        items = {}
+        for key, item in value.items():
+            prev_item = prev_dict.get(key, _MISSING) if prev_dict is not None else _MISSING
+            frozen_item = freeze(item, prev_item)
+            if frozen_item is not prev_item:
+                changed = True
+            items[key] = frozen_item
+        return FrozenDict(items) if changed else prev_dict
+    if isinstance(value, (list, tuple)):
+        prev_seq = previous if isinstance(previous, tuple) else None
+        changed = prev_seq is None or len(prev_seq) != len(value)
+        items = []
+        for index, item in enumerate(value):
+            prev_item = prev_seq[index] if prev_seq is not None and index < len(prev_seq) else _MISSING
+            frozen_item = freeze(item, prev_item)
+            if frozen_item is not prev_item:
+                changed = True
+            items.append(frozen_item)
+        return tuple(items) if changed else prev_seq
+    if previous is not _MISSING and type(previous) is type(value) and previous == value:
+        return previous
+    return value
+
+
+class SnapshotStore:
+    """Holds the latest published snapshot together with its version number."""
+
+    def __init__(self, initial_state=None):
+        # (version, snapshot) are swapped as one tuple so readers never see a torn pair
+        self._head = (0, freeze(initial_state if initial_state is not None else {}))
+        # Only writers take this lock; readers just read self._head
+        self._publish_lock = threading.Lock()
+
+    @property
+    def head(self):
+        """Returns (version, snapshot) for the latest published state."""
+        return self._head
+
+    @property
+    def current(self):
+        return self._head[1]
+
+    def publish(self, live_state):
+        """
+        Freezes `live_state` against the current snapshot. A new version is only
+        created if something changed. Returns the (possibly unchanged) snapshot.
+        """
+        with self._publish_lock:
+            version, snapshot = self._head
+            frozen = freeze(live_state, snapshot)
+            if frozen is not snapshot:
+                self._head = (version + 1, frozen)
+            return frozen
@@ -0,0 +1,139 @@
+"""
+Observable game state for the Kivy screens, with subscriptions by path.
+
+Screens used to redraw everything after every change. Instead, each widget
+property now subscribes to the state paths it shows (`"player1.cp"`,
+`"active_player_id"`) and is only recomputed when one of them changes:
+
+    store.bind_property(self.p1_cp_label, "text", "player1.cp", lambda cp: f"Command Points: {cp}")
+
+`ScorerApp.save_game_state` hands every published snapshot to `update`.
+Snapshots share unchanged subtrees (see state/snapshot.py), so finding what
+changed is an identity check per top-level key plus a lookup per subscribed
+path under those keys. A subscriber is called at most once per update, with
+the current values of all its paths, even if several of them changed.
+"""
+
+from state.snapshot import freeze
+
+_MISSING = object()
+
+
+def split_path(path):
+    """`"player1.cp"` -> `("player1", "cp")`. Tuples are returned unchanged."""
+    return tuple(path.split(".")) if isinstance(path, str) else tuple(path)
+
+
+def lookup(state, path, default=None):
+    """The value at `path` (a tuple of keys), or `default` if any key along it is missing."""
+    value = state
+    for key in path:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+    return value
+
+
+class Subscription:
+    __slots__ = ("store", "paths", "callback")
+
+    def __init__(self, store, paths, callback):
+        self.store = store
+        self.paths = paths
+        self.callback = callback
+
+    def values(self, state):
+        return tuple(lookup(state, path) for path in self.paths)
+
+    def changed(self, old, new):
+        for path in self.paths:
+            old_value, new_value = lookup(old, path, _MISSING), lookup(new, path, _MISSING)
+            # type() check keeps 1 -> True visible as a change, as in state/delta.py
+            if old_value is not new_value and (type(old_value) is not type(new_value) or old_value != new_value):
+                return True
+        return False
+
+    def cancel(self):
+        self.store.unsubscribe(self)
+
+
+class StateStore:
+    def __init__(self, state=None):
+        self._state = freeze(state if state is not None else {})
+        self._by_key = {} # top-level key -> subscriptions with a path under it
+        self.notifications = 0 # subscriber calls made by update(), for benchmarks and tests
+
+    @property
+    def state(self):
+        return self._state
+
+    def get(self, path, default=None):
+        return lookup(self._state, split_path(path), default)
+
+    def subscribe(self, paths, callback, immediate=True):
+        """
+        Calls `callback(*values)` whenever the value at any of `paths` (one path
+        or a list of them) changes. With `immediate`, it is also called once now.
+        Returns a `Subscription`; call its `cancel()` to stop.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        subscription = Subscription(self, tuple(split_path(path) for path in paths), callback)
+        for key in {path[0] for path in subscription.paths}:
+            self._by_key.setdefault(key, []).append(subscription)
+        if immediate:
+            callback(*subscription.values(self._state))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for key in {path[0] for path in subscription.paths}:
+            subscriptions = self._by_key.get(key, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+    def bind_property(self, target, name, paths, compute=None):
+        """
+        Keeps `target.<name>` equal to `compute(*values)` (or the single value
+        if no `compute`). The property is only written when that result differs
+        from what it holds, so an unrelated change never dispatches it.
+        """
+        def apply(*values):
+            value = compute(*values) if compute is not None else values[0]
+            if getattr(target, name) != value:
+                setattr(target, name, value)
+
+        return self.subscribe(paths, apply)
+
+    def update(self, state):
+        """Makes `state` current and notifies the subscribers whose paths changed. Returns how many were called."""
+        old = self._state
+        new = freeze(state, old)
+        if new is old:
+            return 0
+        self._state = new
+
+        candidates = []
+        for key in _changed_keys(old, new):
+            for subscription in self._by_key.get(key, ()):
+                if subscription not in candidates:
+                    candidates.append(subscription)
+
+        called = 0
+        for subscription in candidates:
+            # A callback may cancel others (e.g. a screen leaving); skip those
+            if subscription in self._by_key.get(subscription.paths[0][0], ()) and subscription.changed(old, new):
+                subscription.callback(*subscription.values(new))
+                called += 1
+        self.notifications += called
+        return called
+
+
+def _changed_keys(old, new):
+    for key, value in new.items():
+        if old.get(key, _MISSING) is not value:
+            yield key
+    for key in old:
+        if key not in new:
+            yield key
@@ -0,0 +1,102 @@
+// Keeps this page's clock in step with the server so timers can be computed locally.
+// Loaded as a plain script so both the observer modules and player.js can use it.
+//
+// The server sends timers as anchors in its wall-clock time (game_timer.started_at,
+// game_timer.turn_started_at, in seconds). On every connect we take a few
+// clock_sync samples, keep the one with the shortest round trip (the least
+// queueing delay) and use it to map performance.now() onto server time. The
+// periodic resync also picks up the server's clock being set (NTP after boot).
+(function (global) {
+  const SAMPLES = 5;
+  const RESYNC_MS = 60 * 1000;
+
+  let offset = null; // server time minus local time, in seconds
+  let rtt = null;
+  let resyncTimer = null;
+
+  function localNow() {
+    return performance.now() / 1000;
+  }
+
+  function sample(socket) {
+    return new Promise((resolve) => {
+      const t0 = localNow();
+      socket.emit("clock_sync", { t0 }, (reply) => {
+        const t1 = localNow();
+        const roundTrip = t1 - t0;
+        resolve({ rtt: roundTrip, offset: reply.server + roundTrip / 2 - t1 });
+      });
+    });
+  }
+
+  async function sync(socket) {
+    let best = null;
+    for (let i = 0; i < SAMPLES; i++) {
+      const result = await sample(socket);
+      if (best === null || result.rtt < best.rtt) best = result;
+    }
+    offset = best.offset;
+    rtt = best.rtt;
+    document.dispatchEvent(new CustomEvent("clockSynced", { detail: { offset, rtt } }));
+  }
+
+  function attach(socket) {
+    socket.on("connect", () => {
+      sync(socket);
+      clearInterval(resyncTimer);
+      // Local clocks drift a little; a periodic resync keeps screens within a few ms
+      resyncTimer = setInterval(() => socket.connected && sync(socket), RESYNC_MS);
+    });
+  }
+
+  function serverNow() {
+    return offset === null ? null : localNow() + offset;
+  }
+
+  function formatTime(totalSeconds) {
+    totalSeconds = Math.max(0, Math.floor(totalSeconds));
+    const hours = Math.floor(totalSeconds / 3600).toString().padStart(2, "0");
+    const minutes = Math.floor((totalSeconds % 3600) / 60).toString().padStart(2, "0");
+    const seconds = (totalSeconds % 60).toString().padStart(2, "0");
+    return `${hours}:${minutes}:${seconds}`;
+  }
+
+  // Returns the display strings for the total and each player's clock.
+  // While the timer runs they are counted from the anchors; otherwise the
+  // final displays stored by the server are used.
+  function timerDisplays(state) {
+    const timer = state.game_timer || {};
+    const now = serverNow();
+    const running = timer.status === "running" && now !== null;
+    const displays = {
+      total: timer.elapsed_display || "00:00:00",
+      player1: (state.player1 && state.player1.player_time_display) || "00:00:00",
+      player2: (state.player2 && state.player2.player_time_display) || "00:00:00",
+    };
+    if (!running) return displays;
+
+    if (timer.started_at) displays.total = formatTime(now - timer.started_at);
+    [1, 2].forEach((playerId) => {
+      const player = state[`player${playerId}`];
+      if (!player) return;
+      let seconds = player.player_elapsed_time_seconds || 0;
+      if (
+        state.active_player_id === playerId &&
+        state.game_phase === "game_play" &&
+        timer.turn_started_at
+      ) {
+        seconds += now - timer.turn_started_at;
+      }
+      displays[`player${playerId}`] = formatTime(seconds);
+    });
+    return displays;
+  }
+
+  global.ClockSync = {
+    attach,
+    serverNow,
+    timerDisplays,
+    formatTime,
+    stats: () => ({ offset, rtt }),
+  };
+})(window);
@@ -1,5 +1,23 @@
 document.addEventListener("DOMContentLoaded", () => {
-  const socket = io();
+  // Which hosted game this page belongs to (/table/<id>/player/<n>)
+  const TABLE_ID = document.body.dataset.tableId || "default";
+  // Sessions are per table, so two tabs at different tables do not share a token
+  const SESSION_KEY = `scorer_session_token:${TABLE_ID}`;
+  // The server sends this page only the fields player pages render (see web/projections.py)
+  const ROLE = `player${document.body.dataset.playerId}`;
+  let currentState = null;
+  let stateVersion = null;
+
+  // Resume our session on reconnect so the server only sends what we missed
+  const socket = io({
+    auth: (cb) =>
+      cb({
+        table: TABLE_ID,
+        role: ROLE,
+        session: sessionStorage.getItem(SESSION_KEY),
+        version: stateVersion,
+      }),
+  });
 
   // --- DOM Elements ---
   const elements = {
@@ -42,7 +60,8 @@ document.addEventListener("DOMContentLoaded", () => {
   // --- State ---
   let currentPlayerId = null;
   let activeNumpadTarget = null; // 'primary' or 'secondary'
-  let totalTimerInterval, playerTimerInterval;
+  // Redraws the clocks from the synced server time; no timer traffic is needed
+  const TIMER_REDRAW_MS = 250;
 
   // --- Functions ---
   function getPlayerIdFromUrl() {
@@ -58,56 +77,33 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
-  function formatTime(totalSeconds) {
-    const hours = Math.floor(totalSeconds / 3600)
-      .toString()
-      .padStart(2, "0");
-    const minutes = Math.floor((totalSeconds % 3600) / 60)
-      .toString()
-      .padStart(2, "0");
-    const seconds = Math.floor(totalSeconds % 60)
-      .toString()
-      .padStart(2, "0");
-    return `${hours}:${minutes}:${seconds}`;
+  function renderTimers() {
+    if (!currentState) return;
+    const displays = window.ClockSync.timerDisplays(currentState);
+    elements.totalTime.textContent = displays.total;
+    elements.p1.time.textContent = displays.player1;
+    elements.p2.time.textContent = displays.player2;
   }
 
   function updateUI(state) {
     if (!state) return;
 
-    // Stop any existing timers before updating the UI
-    clearInterval(totalTimerInterval);
-    clearInterval(playerTimerInterval);
-
     const {
       player1,
       player2,
       active_player_id,
       deployment_attacker_id,
       current_round,
-      game_timer,
     } = state;
 
     elements.round.textContent = `Round ${current_round}`;
 
-    // --- Live Total Timer ---
-    if (game_timer && game_timer.status === "running") {
-      let totalSeconds = game_timer.elapsed_seconds;
-      elements.totalTime.textContent = formatTime(totalSeconds);
-      totalTimerInterval = setInterval(() => {
-        totalSeconds++;
-        elements.totalTime.textContent = formatTime(totalSeconds);
-      }, 1000);
-    } else {
-      elements.totalTime.textContent = game_timer.elapsed_display || "00:00:00";
-    }
-
     // Update P1
     elements.p1.name.textContent = player1.name;
     elements.p1.role.textContent =
       deployment_attacker_id === 1 ? "Attacker" : "Defender";
     elements.p1.score.textContent = player1.total_score;
     elements.p1.cp.textContent = `CP: ${player1.cp}`;
-    elements.p1.time.textContent = player1.player_time_display || "00:00:00";
 
     // Update P2
     elements.p2.name.textContent = player2.name;
@@ -115,23 +111,8 @@ document.addEventListener("DOMContentLoaded", () => {
       deployment_attacker_id === 2 ? "Attacker" : "Defender";
     elements.p2.score.textContent = player2.total_score;
     elements.p2.cp.textContent = `CP: ${player2.cp}`;
-    elements.p2.time.textContent = player2.player_time_display || "00:00:00";
-
-    // --- Live Player Timer ---
-    if (game_timer && game_timer.status === "running" && active_player_id) {
-      const activePlayer = active_player_id === 1 ? player1 : player2;
-      const activePlayerElement =
-        active_player_id === 1 ? elements.p1 : elements.p2;
-
-      if (activePlayer && activePlayer.live_elapsed_seconds !== undefined) {
-        let playerSeconds = activePlayer.live_elapsed_seconds;
-        activePlayerElement.time.textContent = formatTime(playerSeconds);
-        playerTimerInterval = setInterval(() => {
-          playerSeconds++;
-          activePlayerElement.time.textContent = formatTime(playerSeconds);
-        }, 1000);
-      }
-    }
+
+    renderTimers();
 
     // Update player-specific controls
     if (currentPlayerId === 1) {
@@ -147,6 +128,20 @@ document.addEventListener("DOMContentLoaded", () => {
     elements.p2.panel.classList.toggle("active", active_player_id === 2);
   }
 
+  // --- Commands ---
+  // Every command carries a trace id so the server can follow it through
+  // save and broadcast (see /trace); the ack round trip is logged against it.
+  let commandCounter = 0;
+
+  function sendCommand(event, data) {
+    const traceId = `p${currentPlayerId}-${Date.now().toString(36)}-${++commandCounter}`;
+    const sentAt = performance.now();
+    socket.emit(event, Object.assign({ trace_id: traceId }, data), (ack) => {
+      const rtt = (performance.now() - sentAt).toFixed(1);
+      console.debug(`${event} ${traceId} acknowledged in ${rtt} ms`, ack);
+    });
+  }
+
   // --- Numpad Functions ---
   function showNumpad(target) {
     activeNumpadTarget = target;
@@ -169,7 +164,7 @@ document.addEventListener("DOMContentLoaded", () => {
   function handleNumpadConfirm() {
     const value = parseInt(elements.numpad.display.textContent, 10);
     if (!isNaN(value) && activeNumpadTarget) {
-      socket.emit("update_score", {
+      sendCommand("update_score", {
         player_id: currentPlayerId,
         score_type: activeNumpadTarget,
         value: value,
@@ -180,16 +175,16 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // --- Socket Emitters ---
   function incrementCp() {
-    socket.emit("increment_cp", { player_id: currentPlayerId });
+    sendCommand("increment_cp", { player_id: currentPlayerId });
   }
 
   function endTurn() {
-    socket.emit("end_turn", { player_id: currentPlayerId });
+    sendCommand("end_turn", { player_id: currentPlayerId });
   }
 
   function concede() {
     if (confirm("Are you sure you want to concede the game?")) {
-      socket.emit("concede_game", { player_id: currentPlayerId });
+      sendCommand("concede_game", { player_id: currentPlayerId });
     }
   }
 
@@ -228,6 +223,10 @@ document.addEventListener("DOMContentLoaded", () => {
     console.log("Player client disconnected");
   });
 
+  socket.on("session", ({ token }) => {
+    sessionStorage.setItem(SESSION_KEY, token);
+  });
+
   socket.on("game_start", (state) => {
     console.log("Game start event received:", state);
     updateUI(state);
@@ -235,10 +234,26 @@ document.addEventListener("DOMContentLoaded", () => {
 
   socket.on("game_state_update", (state) => {
     console.log("Game state update received:", state);
+    currentState = state;
+    stateVersion = state.state_version ?? null;
     updateUI(state);
   });
 
+  socket.on("game_state_patch", (patch) => {
+    if (stateVersion === null || patch.base !== stateVersion) {
+      // Missed a version; a fresh snapshot brings us back in sync
+      socket.emit("request_game_state", { version: stateVersion });
+      return;
+    }
+    currentState = window.StatePatch.applyPatch(currentState, patch.ops);
+    currentState.state_version = patch.version;
+    stateVersion = patch.version;
+    updateUI(currentState);
+  });
+
   // --- Initialization ---
   getPlayerIdFromUrl();
+  window.ClockSync.attach(socket);
+  setInterval(renderTimers, TIMER_REDRAW_MS);
   console.log("Initialized player client");
 });
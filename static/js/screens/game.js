@@ -1,3 +1,7 @@
+import { getGameState } from "../gameState.js";
+
+const TIMER_REDRAW_MS = 250;
+
 const elements = {
   screen: null,
   round: null,
@@ -32,6 +36,11 @@ function init() {
   elements.p2.score = document.getElementById("player2_score");
   elements.p2.cp = document.getElementById("player2_cp");
   elements.p2.time = document.getElementById("player2_time");
+  setInterval(() => {
+    if (elements.screen && elements.screen.style.display !== "none") {
+      renderTimers(getGameState());
+    }
+  }, TIMER_REDRAW_MS);
   console.log("Game screen initialized");
 }
 
@@ -47,6 +56,15 @@ function hide() {
   }
 }
 
+// Clocks are counted locally from the timer anchors, so redraw them between state updates
+function renderTimers(state) {
+  if (!state || !state.player1 || !state.player2) return;
+  const displays = window.ClockSync.timerDisplays(state);
+  elements.p1.time.textContent = displays.player1;
+  elements.p2.time.textContent = displays.player2;
+  elements.totalTime.textContent = `Total Time: ${displays.total}`;
+}
+
 function update(state) {
   const {
     player1,
@@ -54,7 +72,6 @@ function update(state) {
     active_player_id,
     deployment_attacker_id,
     current_round,
-    game_timer,
   } = state;
 
   // Update player names and active state
@@ -77,12 +94,7 @@ function update(state) {
   elements.p1.cp.textContent = `Command Points: ${player1.cp}`;
   elements.p2.cp.textContent = `Command Points: ${player2.cp}`;
 
-  // Update timers
-  elements.p1.time.textContent = player1.player_time_display || "00:00:00";
-  elements.p2.time.textContent = player2.player_time_display || "00:00:00";
-  elements.totalTime.textContent = `Total Time: ${
-    game_timer.elapsed_display || "00:00:00"
-  }`;
+  renderTimers(state);
 
   // Update round
   elements.round.textContent = `Round ${current_round}`;
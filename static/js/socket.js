@@ -1,12 +1,32 @@
 // WebSocket connection and event handlers
-import { setGameState } from "./gameState.js";
+import { getGameState, setGameState } from "./gameState.js";
 import { setInitialState } from "./main.js";
 
 let connectionState = "disconnected";
 let isFirstUpdate = true;
+// Version of the state we hold; patches only apply on top of this exact version
+let stateVersion = null;
 
-// Connect to WebSocket server
-const socket = io("http://localhost:6969");
+// Observer pages for hosted tables live under /table/<id>/; everything else is the default table
+const tableMatch = window.location.pathname.match(/^\/table\/([^/]+)/);
+const TABLE_ID = tableMatch ? decodeURIComponent(tableMatch[1]) : "default";
+// Sessions are per table, so two tabs at different tables do not share a token
+const SESSION_KEY = `scorer_session_token:${TABLE_ID}`;
+
+// Connect to WebSocket server. On every (re)connect we present our session
+// token and state version so the server can send just the changes we missed.
+const socket = io("http://localhost:6969", {
+  auth: (cb) =>
+    cb({
+      table: TABLE_ID,
+      role: "observers",
+      session: sessionStorage.getItem(SESSION_KEY),
+      version: stateVersion,
+    }),
+});
+
+// Measure our offset from the server clock so timers are computed locally
+window.ClockSync.attach(socket);
 
 function dispatchConnectionStatusEvent() {
   const event = new CustomEvent("connectionStatusChanged", {
@@ -20,8 +40,11 @@ socket.on("connect", () => {
   console.log("Connected to server");
   connectionState = "connected";
   dispatchConnectionStatusEvent();
-  // Request initial game state when connected
-  socket.emit("request_game_state");
+  // The server pushes a snapshot or catch-up patch on connect, no need to ask
+});
+
+socket.on("session", ({ token }) => {
+  sessionStorage.setItem(SESSION_KEY, token);
 });
 
 socket.on("disconnect", () => {
@@ -38,6 +61,7 @@ socket.on("game_state_update", (gameState) => {
     JSON.stringify(gameState, null, 2)
   );
 
+  stateVersion = gameState.state_version ?? null;
   // Set the state first, so that the initial render has data
   setGameState(gameState);
 
@@ -48,6 +72,22 @@ socket.on("game_state_update", (gameState) => {
   }
 });
 
+// Incremental updates: only the fields that changed since the previous version
+socket.on("game_state_patch", (patch) => {
+  if (stateVersion === null || patch.base !== stateVersion) {
+    // We missed a version (or have no state yet); ask for a fresh snapshot
+    console.log(
+      `Patch ${patch.base}->${patch.version} does not apply to version ${stateVersion}, requesting snapshot`
+    );
+    socket.emit("request_game_state", { version: stateVersion });
+    return;
+  }
+  const nextState = window.StatePatch.applyPatch(getGameState(), patch.ops);
+  nextState.state_version = patch.version;
+  stateVersion = patch.version;
+  setGameState(nextState);
+});
+
 // The 'game_phase_update' is also redundant if 'game_state_update' is comprehensive.
 // A full state update is better than a partial one.
 socket.on("game_phase_update", (data) => {
@@ -0,0 +1,29 @@
+// Applies game_state_patch operations sent by the server.
+// Loaded as a plain script so both the observer modules and player.js can use it.
+//
+// A patch looks like { base: 4, version: 5, ops: [["set", ["player1", "cp"], 3], ["del", ["status_message"]]] }
+// and is only valid on top of the state with state_version === base.
+(function (global) {
+  function applyPatch(state, ops) {
+    // Copy every object along a changed path so the previous state is left untouched
+    const next = Object.assign({}, state);
+    ops.forEach(([kind, path, value]) => {
+      let target = next;
+      for (let i = 0; i < path.length - 1; i++) {
+        const child = target[path[i]];
+        target[path[i]] =
+          child && typeof child === "object" ? Object.assign({}, child) : {};
+        target = target[path[i]];
+      }
+      const key = path[path.length - 1];
+      if (kind === "set") {
+        target[key] = value;
+      } else if (kind === "del") {
+        delete target[key];
+      }
+    });
+    return next;
+  }
+
+  global.StatePatch = { applyPatch };
+})(window);
@@ -0,0 +1,368 @@
+"""
+Load generator for the Socket.IO server: many clients at once, with latency percentiles.
+
+    python swarm_client.py --url http://localhost:6969 --clients 302 --rate 5 --duration 60
+    python swarm_client.py --tables 1,2 --clients 100 --json   # machine-readable output
+
+Each table gets two player clients (one per seat, `player1` / `player2`) and
+the remaining clients join the tables as observers, so `--clients 302` on one
+table is two players and 300 observers. The players replay a mix of score, CP
+and end turn commands at `--rate` commands per second per table (Poisson
+arrivals), and every client keeps its copy of the state current from
+`game_state_update` snapshots and `game_state_patch` patches, as the browser
+pages do.
+
+A command's latency is the time from its emit to the first state a client
+receives that reflects it: the sending player measures `command` latency and
+every observer measures `observer` latency (which includes the observer
+throttle). Score and CP commands only ever increase values, so "reflects it"
+is a simple comparison even when throttled observers skip intermediate
+states. End turn commands are only timed by their sender.
+
+Run against `python table_server.py` for the hosted tables, or against the
+Kivy app's `default` table with a game in progress. Needs the asyncio client
+extras: `pip install "python-socketio[asyncio_client]"`.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import socketio
+
+from state.delta import apply_ops
+
+DEFAULT_MIX = {"score": 6, "cp": 3, "end_turn": 1}
+# Upper bounds (ms) of the histogram buckets in the report
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Latency samples in milliseconds, reported as percentiles and bucket counts."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = buckets
+        self.samples = []
+
+    def record(self, seconds):
+        self.samples.append(seconds * 1000)
+
+    def percentile(self, pct):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return round(ordered[index], 2)
+
+    def counts(self):
+        """Samples per bucket, keyed by the bucket's upper bound ("inf" for the rest)."""
+        counts = {str(bound): 0 for bound in self.buckets}
+        counts["inf"] = 0
+        for sample in self.samples:
+            for bound in self.buckets:
+                if sample <= bound:
+                    counts[str(bound)] += 1
+                    break
+            else:
+                counts["inf"] += 1
+        return counts
+
+    def summary(self):
+        return {
+            "count": len(self.samples),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max(self.samples), 2) if self.samples else None,
+            "histogram": self.counts(),
+        }
+
+
+def parse_mix(text):
+    """Parses "score=6,cp=3,end_turn=1" into a weight dict."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown command {name!r} (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Stats:
+    def __init__(self):
+        self.command = LatencyHistogram()
+        self.observer = LatencyHistogram()
+        self.counts = {"sent": 0, "matched": 0, "state_events": 0, "resyncs": 0}
+        self.errors = {"connect": 0, "rejected": 0, "timeout": 0}
+
+
+class SwarmClient:
+    """One Socket.IO client that keeps the state of its role current."""
+
+    def __init__(self, url, table, role, stats):
+        self.url = url
+        self.table = table
+        self.role = role
+        self.stats = stats
+        self.state = None
+        self.version = None
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("game_state_update", self._on_snapshot)
+        self.sio.on("game_state_patch", self._on_patch)
+
+    async def connect(self):
+        auth = {"table": self.table, "role": self.role}
+        try:
+            await self.sio.connect(self.url, auth=auth, transports=["websocket"], wait_timeout=10)
+        except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+            self.stats.errors["connect"] += 1
+            return False
+        return True
+
+    async def disconnect(self):
+        if self.sio.connected:
+            await self.sio.disconnect()
+
+    async def _on_snapshot(self, data):
+        self.version = data.get("state_version")
+        self.state = data
+        self._received()
+
+    async def _on_patch(self, patch):
+        if self.state is None or patch.get("base") != self.version:
+            # Same recovery as the browser pages: ask for a fresh snapshot
+            self.stats.counts["resyncs"] += 1
+            await self.sio.emit("request_game_state", {"version": self.version})
+            return
+        apply_ops(self.state, patch["ops"])
+        self.version = patch["version"]
+        self._received()
+
+    def _received(self):
+        self.stats.counts["state_events"] += 1
+        self.on_state(time.perf_counter())
+
+    def on_state(self, now):
+        pass
+
+
+class PlayerClient(SwarmClient):
+    """Sends commands for one seat and times them until its own state reflects them."""
+
+    def __init__(self, url, table, player_id, stats, log, rng, timeout=5.0):
+        super().__init__(url, table, f"player{player_id}", stats)
+        self.player_id = player_id
+        self.log = log
+        self.rng = rng
+        self.timeout = timeout
+        self.pending = [] # (emit time, predicate)
+        self.expected = None
+
+    @property
+    def me(self):
+        return self.state.get(f"player{self.player_id}", {})
+
+    def on_state(self, now):
+        if self.expected is None or not self.pending:
+            # Nothing in flight, so the server's values are the ones to build on
+            self.expected = {key: self.me.get(key, 0) for key in ("primary_score", "secondary_score", "cp")}
+        still_pending = []
+        for emitted_at, predicate in self.pending:
+            if predicate(self.state):
+                self.stats.command.record(now - emitted_at)
+                self.stats.counts["matched"] += 1
+            else:
+                still_pending.append((emitted_at, predicate))
+        self.pending = still_pending
+
+    def expire(self, now):
+        before = len(self.pending)
+        self.pending = [(t, predicate) for t, predicate in self.pending if now - t < self.timeout]
+        self.stats.errors["timeout"] += before - len(self.pending)
+
+    async def send(self, command):
+        if self.state is None:
+            return
+        key = f"player{self.player_id}"
+        playing = self.state.get("game_phase") == "game_play"
+        if command == "end_turn" and not (playing and self.state.get("active_player_id") == self.player_id):
+            command = "score"
+        if command == "cp" and not playing:
+            command = "score" # CP only changes during play
+
+        if command == "score":
+            field = self.rng.choice(("primary_score", "secondary_score"))
+            self.expected[field] += self.rng.randint(1, 5)
+            value = self.expected[field]
+            event, data = "update_score", {"player_id": self.player_id, "score_type": field.split("_")[0], "value": value}
+            total = self.expected["primary_score"] + self.expected["secondary_score"]
+            predicate = lambda state: state.get(key, {}).get(field, 0) >= value
+            observed = ("total_score", total)
+        elif command == "cp":
+            self.expected["cp"] += 1
+            value = self.expected["cp"]
+            event, data = "increment_cp", {"player_id": self.player_id, "action": "add"}
+            predicate = lambda state: state.get(key, {}).get("cp", 0) >= value
+            observed = ("cp", value)
+        else:
+            event, data = "end_turn", {"player_id": self.player_id}
+            predicate = lambda state: state.get("active_player_id") != self.player_id or state.get("game_phase") != "game_play"
+            observed = None
+
+        emitted_at = time.perf_counter()
+        self.pending.append((emitted_at, predicate))
+        if observed:
+            self.log.append((emitted_at, key, observed[0], observed[1]))
+        self.stats.counts["sent"] += 1
+        await self.sio.emit(event, data, callback=self._on_ack)
+
+    def _on_ack(self, reply=None):
+        # The Kivy app acknowledges a command it did not apply with result False
+        if not isinstance(reply, dict) or not reply.get("ok") or reply.get("result") is False:
+            self.stats.errors["rejected"] += 1
+
+
+class ObserverClient(SwarmClient):
+    """Watches a table and times how long each command takes to reach it."""
+
+    def __init__(self, url, table, stats, log):
+        super().__init__(url, table, "observers", stats)
+        self.log = log
+        self.cursor = len(log) # commands sent before this observer joined are not timed
+        self.seen_ahead = set()
+
+    def on_state(self, now):
+        log, state = self.log, self.state
+        for index in range(self.cursor, len(log)):
+            if index in self.seen_ahead:
+                continue
+            emitted_at, key, field, target = log[index]
+            if state.get(key, {}).get(field, 0) >= target:
+                self.stats.observer.record(now - emitted_at)
+                self.seen_ahead.add(index)
+        while self.cursor in self.seen_ahead:
+            self.seen_ahead.discard(self.cursor)
+            self.cursor += 1
+
+
+class Swarm:
+    def __init__(self, url, tables, clients, rate, duration, mix=None, seed=None, connect_concurrency=50):
+        self.url = url
+        self.tables = tables
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.rng = random.Random(seed)
+        self.connect_concurrency = connect_concurrency
+        self.stats = Stats()
+
+        self.logs = {table: [] for table in tables}
+        self.players = [
+            PlayerClient(url, table, player_id, self.stats, self.logs[table], self.rng)
+            for table in tables for player_id in (1, 2)
+        ]
+        observer_count = max(0, clients - len(self.players))
+        self.observers = [
+            ObserverClient(url, tables[i % len(tables)], self.stats, self.logs[tables[i % len(tables)]])
+            for i in range(observer_count)
+        ]
+
+    async def _connect_all(self):
+        limit = asyncio.Semaphore(self.connect_concurrency)
+
+        async def connect(client):
+            async with limit:
+                return await client.connect()
+
+        clients = self.players + self.observers
+        connected = await asyncio.gather(*(connect(client) for client in clients))
+        return [client for client, ok in zip(clients, connected) if ok]
+
+    async def _drive(self, player, deadline):
+        names, weights = list(self.mix), list(self.mix.values())
+        # Each seat sends half of its table's commands
+        per_client_rate = self.rate / 2
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.rng.expovariate(per_client_rate))
+            if not player.sio.connected:
+                return
+            player.expire(time.perf_counter())
+            await player.send(self.rng.choices(names, weights)[0])
+
+    async def run(self):
+        connected = await self._connect_all()
+        started = time.perf_counter()
+        deadline = started + self.duration
+        drivers = [self._drive(player, deadline) for player in self.players if player in connected]
+        await asyncio.gather(*drivers)
+        sending = time.perf_counter() - started
+        # Give the last commands time to arrive before counting them as lost
+        await asyncio.sleep(min(2.0, self.duration))
+        for player in self.players:
+            player.expire(float("inf"))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(client.disconnect() for client in connected))
+        return self.report(len(connected), sending, elapsed)
+
+    def report(self, connected, sending, elapsed):
+        stats = self.stats
+        return {
+            "url": self.url,
+            "tables": self.tables,
+            "players": len(self.players),
+            "observers": len(self.observers),
+            "connected": connected,
+            "seconds": round(elapsed, 2),
+            "commands_sent": stats.counts["sent"],
+            "commands_per_second": round(stats.counts["sent"] / sending, 2) if sending else None,
+            "commands_matched": stats.counts["matched"],
+            "state_events_per_second": round(stats.counts["state_events"] / elapsed, 2) if elapsed else None,
+            "resyncs": stats.counts["resyncs"],
+            "errors": dict(stats.errors),
+            "command_latency": stats.command.summary(),
+            "observer_latency": stats.observer.summary(),
+        }
+
+
+def _print_report(report):
+    print(f"{report['connected']}/{report['players'] + report['observers']} clients connected "
+          f"({report['players']} players, {report['observers']} observers) for {report['seconds']}s")
+    print(f"commands: {report['commands_sent']} sent ({report['commands_per_second']}/s), "
+          f"state events received: {report['state_events_per_second']}/s, resyncs: {report['resyncs']}")
+    print(f"errors: {report['errors']}")
+    header = f"{'latency':<10} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name in ("command", "observer"):
+        s = report[f"{name}_latency"]
+        print(f"{name:<10} {s['count']:>8} {str(s['p50_ms']):>9} {str(s['p95_ms']):>9} "
+              f"{str(s['p99_ms']):>9} {str(s['max_ms']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:6969")
+    parser.add_argument("--tables", default="default", help="comma-separated table ids (table_server.py numbers them from 1)")
+    parser.add_argument("--clients", type=int, default=52, help="total clients; two per table are players, the rest observe")
+    parser.add_argument("--rate", type=float, default=2.0, help="commands per second per table")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send commands for")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="command weights, e.g. score=6,cp=3,end_turn=1")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible command sequences")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    tables = [table.strip() for table in args.tables.split(",") if table.strip()]
+    swarm = Swarm(args.url, tables, args.clients, args.rate, args.duration, mix=args.mix, seed=args.seed)
+    report = asyncio.run(swarm.run())
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Hosts several independent games from one process, without the Kivy app.
+
+    python table_server.py --tables 4 --port 6969 --data-dir ./tables
+
+Table N is scored from /table/N/player/1 and /table/N/player/2 and watched
+from /table/N/. Each table's game is saved under <data-dir>/table_N/ and
+resumed when the server restarts.
+"""
+
+import argparse
+import logging
+import os
+
+from web.hosted_game import HostedGame
+from websocket_server import WebSocketServer
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=2, help="number of tables to host")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=6969)
+    parser.add_argument("--observer-hz", type=float, default=2.0, help="state updates per second sent to observers")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables"))
+    args = parser.parse_args()
+
+    server = WebSocketServer(host=args.host, port=args.port, observer_broadcast_hz=args.observer_hz or None)
+    games = []
+    for number in range(1, args.tables + 1):
+        game = HostedGame(str(number), args.data_dir, server)
+        if game.game_state.game_phase != 'game_play':
+            game.start_game()
+        games.append(game)
+        print(f"Table {number}: http://{args.host}:{args.port}/table/{number}/")
+
+    try:
+        # All tables share this server's event loop
+        server.socketio.run(server.app, host=args.host, port=args.port, allow_unsafe_werkzeug=True)
+    finally:
+        for game in games:
+            game.close()
+
+
+if __name__ == "__main__":
+    main()
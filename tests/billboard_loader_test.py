@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+from screens.billboard_loader import BillboardLoader, dropped_frames
+
+
+class FakeDecoder:
+    """Stands in for Pillow: records the calls and returns the target size with the path as pixels."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def __call__(self, path, size):
+        self.calls.append((path, size, threading.current_thread().name))
+        if path in self.fail:
+            raise OSError(f"cannot identify image file {path!r}")
+        return size, path.encode()
+
+
+class TestBillboardLoader(unittest.TestCase):
+    def setUp(self):
+        self.frames = []
+        self.decoder = FakeDecoder(fail={"broken.png"})
+        self.loader = BillboardLoader(
+            (800, 480), schedule=self.frames.append, decode=self.decoder,
+            make_texture=lambda size, pixels: ("texture", size, pixels), max_textures=3,
+        )
+
+    def run_frames(self):
+        self.loader.wait()
+        while self.frames:
+            self.frames.pop(0)(0)
+
+    def test_decodes_off_thread_and_only_serves_ready_textures(self):
+        self.loader.prefetch(["a.png", "b.png"])
+        self.assertIsNone(self.loader.get("a.png"))
+
+        self.loader.wait()
+        # Decoded, but the texture is only made on the next frame of the Kivy thread
+        self.assertFalse(self.loader.is_ready("a.png"))
+        self.run_frames()
+
+        self.assertEqual(self.loader.get("a.png"), ("texture", (800, 480), b"a.png"))
+        self.assertEqual([(path, size) for path, size, _ in self.decoder.calls],
+                         [("a.png", (800, 480)), ("b.png", (800, 480))])
+        self.assertEqual({thread for _, _, thread in self.decoder.calls}, {"BillboardLoader"})
+
+    def test_images_ready_or_in_flight_are_not_decoded_again(self):
+        self.loader.prefetch(["a.png"])
+        self.loader.prefetch(["a.png"])
+        self.run_frames()
+        self.loader.prefetch(["a.png"])
+        self.run_frames()
+
+        self.assertEqual(len(self.decoder.calls), 1)
+
+    def test_least_recently_used_textures_are_dropped(self):
+        self.loader.prefetch(["a.png", "b.png", "c.png"])
+        self.run_frames()
+        self.loader.get("a.png")
+        self.loader.prefetch(["d.png"])
+        self.run_frames()
+
+        self.assertEqual(self.loader.ready(), ["c.png", "a.png", "d.png"])
+        self.assertEqual(self.loader.evicted, 1)
+
+    def test_failed_image_can_be_retried(self):
+        with self.assertLogs("screens.billboard_loader", level="ERROR"):
+            self.loader.prefetch(["broken.png"])
+            self.run_frames()
+        self.assertEqual(self.loader.failed, 1)
+        self.assertIsNone(self.loader.get("broken.png"))
+
+        with self.assertLogs("screens.billboard_loader", level="ERROR"):
+            self.loader.prefetch(["broken.png"])
+            self.run_frames()
+        self.assertEqual(len(self.decoder.calls), 2)
+
+
+class TestDroppedFrames(unittest.TestCase):
+    def test_counts_frames_missed_against_the_budget(self):
+        self.assertEqual(dropped_frames(1 / 60), 0)
+        self.assertEqual(dropped_frames(0.02), 0)
+        self.assertEqual(dropped_frames(1 / 30), 1)
+        self.assertEqual(dropped_frames(0.25), 14)
+
+
+if __name__ == "__main__":
+    unittest.main()
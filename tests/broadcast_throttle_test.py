@@ -0,0 +1,84 @@
+import time
+import unittest
+
+from state.model import GameState
+from websocket_server import WebSocketServer
+
+
+class TestObserverThrottle(unittest.TestCase):
+    def setUp(self):
+        gs = GameState()
+        gs.game_phase = 'game_play'
+        self.state = gs.to_dict()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state, observer_broadcast_hz=20)
+        self.table = self.server.get_table()
+        self.player = self.server.socketio.test_client(self.server.app, auth={'role': 'player1'})
+        self.observer = self.server.socketio.test_client(self.server.app)
+        self.player.get_received()
+        self.observer.get_received()
+
+    def tearDown(self):
+        for client in (self.player, self.observer):
+            if client.is_connected():
+                client.disconnect()
+
+    def _patches(self, client):
+        return [p['args'][0] for p in client.get_received() if p['name'] == 'game_state_patch']
+
+    def _burst(self, count):
+        for cp in range(2, 2 + count):
+            self.state = dict(self.state, player1=dict(self.state['player1'], cp=cp))
+            self.server.broadcast_game_state()
+
+    def test_players_get_every_state_observers_only_the_latest(self):
+        self._burst(5)
+        self.assertEqual(len(self._patches(self.player)), 5)
+        # The first broadcast goes straight out; the rest wait for the observer tick
+        self.assertEqual(len(self._patches(self.observer)), 1)
+
+        self.table.flush_pending()
+        patches = self._patches(self.observer)
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(patches[0]['ops'], [['set', ['player1', 'cp'], 6]])
+        # Four requests were left pending; three of them were replaced by a newer one
+        self.assertEqual(self.server.stats()['default']['observers']['dropped'], 3)
+
+    def test_pending_broadcast_is_flushed_in_the_background(self):
+        self._burst(3)
+        self._patches(self.observer)
+        time.sleep(0.2)
+        patches = self._patches(self.observer)
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(patches[0]['ops'], [['set', ['player1', 'cp'], 4]])
+        self.assertFalse(self.table.channels['observers'].pending)
+
+    def test_resync_only_reaches_the_requesting_observer(self):
+        late = self.server.socketio.test_client(self.server.app)
+        try:
+            late.get_received()
+            self._burst(3)
+            self._patches(self.observer)
+            channel = self.table.channels['observers']
+            version = channel.version
+
+            late.emit('request_game_state', {'version': 0})
+
+            self.assertEqual(self._patches(self.observer), [])
+            received = late.get_received()
+            snapshots = [event['args'][0] for event in received if event['name'] == 'game_state_update']
+            self.assertEqual([snapshot['state_version'] for snapshot in snapshots], [version])
+            self.assertEqual(snapshots[0]['player1']['cp'], 2)
+            self.assertEqual((channel.version, channel.pending, channel.dropped), (version, True, 1))
+
+            # The held back change reaches both observers with the next flush
+            self.table.flush_pending()
+            for client in (self.observer, late):
+                patches = self._patches(client)
+                self.assertEqual([(patch['base'], patch['ops']) for patch in patches],
+                                 [(version, [['set', ['player1', 'cp'], 4]])])
+        finally:
+            late.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from state.model import GameState
+from web.clock_sync import ServerClock
+from web.projections import OBSERVER_ROLE, project
+from websocket_server import WebSocketServer
+
+
+class FakeTime:
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+
+class TestServerClock(unittest.TestCase):
+    def test_anchors_are_the_wall_times_of_the_state(self):
+        clock = ServerClock(FakeTime(1_700_000_000.0))
+        self.assertEqual(clock.from_wall(1_700_000_010.0004), 1_700_000_010.0)
+        self.assertIsNone(clock.from_wall(None))
+
+    def test_wall_clock_jump_keeps_client_elapsed_time(self):
+        # A timer started 60 s ago, then the clock is set a day ahead (NTP after boot)
+        wall = FakeTime(1_700_000_060.0)
+        clock = ServerClock(wall)
+        started_at = clock.from_wall(1_700_000_000.0)
+        wall.value += 86_400
+        started_at += 86_400 # the server's own timer arithmetic moves its anchors with the wall clock
+        self.assertEqual(clock.sync_reply({'t0': 0})['server'] - started_at, 60.0)
+
+    def test_sync_reply_echoes_client_time(self):
+        clock = ServerClock(FakeTime(42.5))
+        self.assertEqual(clock.sync_reply({'t0': 7.25}), {'t0': 7.25, 'server': 42.5})
+
+
+class TestTimerAnchors(unittest.TestCase):
+    def setUp(self):
+        gs = GameState()
+        gs.game_phase = 'game_play'
+        gs.active_player_id = 1
+        gs.game_timer.status = 'running'
+        gs.game_timer.start_time = 1_700_000_000.0
+        gs.game_timer.turn_segment_start_time = 1_700_000_100.0
+        gs.players[2].player_elapsed_time_seconds = 60.0
+        self.state = gs.to_dict()
+        self.clock = ServerClock(FakeTime(1_700_000_010.0))
+
+    def test_running_timer_is_sent_as_anchors(self):
+        timer = project(self.state, OBSERVER_ROLE, self.clock)['game_timer']
+        self.assertEqual(timer['started_at'], 1_700_000_000.0)
+        self.assertEqual(timer['turn_started_at'], 1_700_000_100.0)
+        self.assertNotIn('start_time', timer)
+        self.assertEqual(project(self.state, 'player1', self.clock)['player2']['player_elapsed_time_seconds'], 60.0)
+
+    def test_running_timer_does_not_cause_broadcasts(self):
+        server = WebSocketServer(get_game_state_callback=lambda: self.state)
+        client = server.socketio.test_client(server.app)
+        try:
+            client.get_received()
+            for _ in range(3):
+                server.broadcast_game_state()
+            self.assertEqual([p for p in client.get_received() if p['name'] == 'game_state_patch'], [])
+        finally:
+            client.disconnect()
+
+    def test_handshake_is_answered_through_the_ack(self):
+        server = WebSocketServer(get_game_state_callback=lambda: self.state)
+        client = server.socketio.test_client(server.app)
+        try:
+            reply = client.emit('clock_sync', {'t0': 1.5}, callback=True)
+            self.assertEqual(reply['t0'], 1.5)
+            self.assertIsInstance(reply['server'], float)
+        finally:
+            client.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
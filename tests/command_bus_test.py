@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from web.command_bus import CommandBus, ack_for
+from websocket_server import WebSocketServer
+
+
+class TestCommandBus(unittest.TestCase):
+    def test_drain_runs_commands_in_order_on_the_draining_thread(self):
+        bus = CommandBus()
+        applied = []
+        futures = [bus.submit(lambda n=n: applied.append((n, threading.get_ident())) or n) for n in range(5)]
+        self.assertEqual(applied, [])
+
+        self.assertEqual(bus.drain(), 5)
+        self.assertEqual([n for n, _ in applied], list(range(5)))
+        self.assertTrue(all(ident == threading.get_ident() for _, ident in applied))
+        self.assertEqual([f.result(0) for f in futures], list(range(5)))
+        self.assertEqual(bus.stats()['batches'], 1)
+
+    def test_failed_command_resolves_its_future_and_the_rest_still_run(self):
+        bus = CommandBus()
+        failing = bus.submit(lambda: 1 / 0)
+        ok = bus.submit(lambda: 'done')
+        bus.drain()
+        with self.assertRaises(ZeroDivisionError):
+            failing.result(0)
+        self.assertEqual(ok.result(0), 'done')
+        self.assertEqual(ack_for(failing)['ok'], False)
+
+    def test_commands_submitted_while_draining_wait_for_the_next_drain(self):
+        bus = CommandBus()
+        follow_up = []
+        bus.submit(lambda: follow_up.append(bus.submit(lambda: 'later')))
+        self.assertEqual(bus.drain(), 1)
+        self.assertFalse(follow_up[0].done())
+        self.assertEqual(bus.drain(), 1)
+        self.assertEqual(follow_up[0].result(0), 'later')
+
+    def test_ack_times_out_if_nothing_drains(self):
+        self.assertEqual(ack_for(CommandBus().submit(lambda: None), timeout=0.01), {'ok': False, 'error': 'timeout'})
+        self.assertEqual(ack_for(None), {'ok': True, 'result': None})
+
+
+class TestSocketAcks(unittest.TestCase):
+    def test_socket_handler_acks_with_the_command_result(self):
+        bus = CommandBus()
+        applied = []
+        server = WebSocketServer(
+            get_game_state_callback=lambda: {},
+            update_score_callback=lambda data: bus.submit(lambda: applied.append(data) or True),
+        )
+        stop = threading.Event()
+
+        def main_loop():
+            while not stop.is_set():
+                bus.drain()
+                stop.wait(0.005)
+
+        loop = threading.Thread(target=main_loop)
+        loop.start()
+        client = server.socketio.test_client(server.app, auth={'role': 'player1'})
+        try:
+            ack = client.emit('update_score', {'player_id': 1, 'value': 3}, callback=True)
+        finally:
+            client.disconnect()
+            stop.set()
+            loop.join()
+        self.assertEqual(ack, {'ok': True, 'result': True})
+        self.assertEqual(applied, [{'player_id': 1, 'value': 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import random
+import unittest
+
+from game.engine import MAX_ROUNDS, GameEngine
+from game.simulation import SimulatedClock, run, simulate_game
+
+
+class FixedRolls:
+    """Stands in for random.Random, returning the given dice in order."""
+
+    def __init__(self, *rolls):
+        self.rolls = list(rolls)
+
+    def randint(self, low, high):
+        return self.rolls.pop(0)
+
+
+class TestGameEngine(unittest.TestCase):
+    def setUp(self):
+        self.clock = SimulatedClock(1000.0)
+
+    def _engine(self, *rolls):
+        engine = GameEngine(clock=self.clock, rng=FixedRolls(*rolls))
+        engine.new_game()
+        return engine
+
+    def _playing(self, first_player_id=1):
+        engine = self._engine()
+        engine.choose_first_turn(first_player_id, chose_self=True)
+        engine.start_game()
+        return engine
+
+    def test_deployment_tie_rerolls_then_higher_roll_wins(self):
+        engine = self._engine(3, 3, 2, 5)
+        engine.start_deployment()
+        engine.roll_deployment(1)
+        engine.roll_deployment(2)
+        self.assertIsNone(engine.state.deployment_initiative_winner_id)
+        self.assertEqual(engine.state.players[1].deployment_roll, 0)
+
+        engine.roll_deployment(1)
+        engine.roll_deployment(2)
+        self.assertEqual(engine.state.deployment_initiative_winner_id, 2)
+        self.assertIsNone(engine.roll_deployment(1)) # already decided
+
+        engine.choose_deployment_role(2, chose_attacker=False)
+        self.assertEqual(engine.state.deployment_attacker_id, 1)
+        self.assertEqual(engine.state.deployment_defender_id, 2)
+
+    def test_first_turn_tie_goes_to_attacker(self):
+        engine = self._engine(4, 4)
+        engine.choose_deployment_role(2, chose_attacker=True)
+        engine.start_first_turn()
+        engine.roll_first_turn(1)
+        engine.roll_first_turn(2)
+        self.assertEqual(engine.state.first_turn_initiative_winner_id, 2)
+
+        engine.choose_first_turn(2, chose_self=False)
+        self.assertEqual(engine.state.first_turn_player_id, 1)
+        self.assertEqual(engine.state.first_player_of_game_id, 1)
+
+    def test_start_game_needs_a_first_player(self):
+        engine = self._engine()
+        self.assertFalse(engine.start_game())
+        engine.choose_first_turn(2, chose_self=True)
+        self.assertTrue(engine.start_game())
+
+        gs = engine.state
+        self.assertEqual((gs.game_phase, gs.current_round, gs.active_player_id), ('game_play', 1, 2))
+        self.assertTrue(gs.game_timer.is_running)
+        self.assertEqual(gs.game_timer.turn_segment_start_time, 1000.0)
+
+    def test_end_turn_banks_time_and_advances_rounds(self):
+        engine = self._playing()
+        self.assertIsNone(engine.end_turn(2)) # not their turn
+
+        self.clock.advance(90)
+        result = engine.end_turn(1)
+        self.assertEqual((result.player_id, result.duration, result.game_over), (1, 90, False))
+        self.assertEqual(engine.state.current_round, 1)
+
+        self.clock.advance(30)
+        engine.end_turn()
+        gs = engine.state
+        self.assertEqual((gs.current_round, gs.active_player_id), (2, 1))
+        self.assertEqual(gs.players[2].player_elapsed_time_seconds, 30)
+        self.assertEqual(gs.status_message, "Round 2 - Player 1's Turn")
+
+    def test_game_ends_after_last_round(self):
+        engine = self._playing()
+        for _ in range(MAX_ROUNDS - 1):
+            engine.end_turn(1)
+            engine.end_turn(2)
+        engine.end_turn(1)
+        self.clock.advance(3600)
+        result = engine.end_turn(2)
+
+        gs = engine.state
+        self.assertTrue(result.game_over)
+        self.assertEqual((gs.game_phase, gs.last_round_played), ('game_over', MAX_ROUNDS))
+        self.assertFalse(gs.game_timer.is_running)
+        self.assertEqual(gs.game_timer.elapsed_display, "01:00:00")
+        self.assertIsNone(engine.end_turn(1))
+
+    def test_scores_and_cp(self):
+        engine = self._playing()
+        engine.set_score(1, 10, 'primary')
+        engine.set_score(1, 4, 'secondary')
+        self.assertEqual(engine.state.players[1].total_score, 14)
+
+        self.assertTrue(engine.remove_cp(2))
+        self.assertFalse(engine.remove_cp(2))
+        self.assertEqual(engine.state.status_message, "Player 2 CP is 0")
+        engine.add_cp(2, 3)
+        self.assertEqual(engine.state.players[2].cp, 3)
+
+    def test_concede(self):
+        engine = self._playing()
+        engine.end_turn(1)
+        self.assertEqual(engine.concede(2), 1)
+        gs = engine.state
+        self.assertEqual(gs.game_phase, 'game_over')
+        self.assertEqual(gs.status_message, "Player 2 concedes. Player 1 wins!")
+        self.assertFalse(gs.game_timer.is_running)
+        self.assertIsNone(engine.concede(1))
+        self.assertFalse(engine.add_cp(1))
+
+    def test_direct_edits_reject_invalid_values(self):
+        engine = self._playing()
+        before = engine.state.to_dict()
+
+        self.assertFalse(engine.set_game_phase('playing'))
+        self.assertFalse(engine.set_round(0))
+        self.assertFalse(engine.set_round(MAX_ROUNDS + 1))
+        self.assertFalse(engine.set_round('2'))
+        self.assertFalse(engine.update_timer({'status': 'running', 'start_time': 'soon'}))
+        self.assertFalse(engine.update_timer({'status': 'paused'}))
+        self.assertFalse(engine.update_timer({'turn_segment_start_time': float('nan')}))
+        self.assertFalse(engine.update_timer({'status': 'stopped', 'colour': 'red'}))
+        self.assertEqual(engine.state.to_dict(), before)
+        # The clocks still work after the rejected updates
+        self.clock.advance(30)
+        self.assertEqual(engine.end_turn(1).duration, 30)
+
+    def test_direct_edits_apply_valid_values(self):
+        engine = self._playing()
+        self.assertTrue(engine.set_game_phase('game_over'))
+        self.assertTrue(engine.set_round(MAX_ROUNDS))
+        self.assertTrue(engine.update_timer({'status': 'stopped', 'start_time': 1000, 'elapsed_display': '00:01:00'}))
+        gs = engine.state
+        self.assertEqual((gs.game_phase, gs.current_round), ('game_over', MAX_ROUNDS))
+        self.assertEqual(gs.game_timer.to_dict()['elapsed_display'], '00:01:00')
+
+    def test_seeded_simulations_are_reproducible(self):
+        self.assertEqual(run(200, seed=7)["wins"], run(200, seed=7)["wins"])
+
+    def test_simulated_games_are_fast(self):
+        # Headless rules should run thousands of games a second; this only guards against gross regressions
+        clock = SimulatedClock()
+        engine = GameEngine(clock=clock, rng=random.Random(1))
+        for _ in range(500):
+            simulate_game(engine, clock)
+            self.assertEqual(engine.state.game_phase, 'game_over')
+        self.assertGreater(run(500, seed=1)["games_per_second"], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from db import integration
+from db.store import GameHistoryStore
+from game.engine import MAX_ROUNDS, GameEngine, TurnEnded
+from state.model import GameState
+
+
+class TestGameHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'scorer.db')
+        self.store = GameHistoryStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_records_a_complete_game(self):
+        self.store.start_game('g1', 100.0, {1: 'Alice', 2: 'Bob'}, attacker_player_number=2)
+        self.store.record_turn('g1', 1, 1, 90.5, 5, 2, 190.5)
+        self.store.record_turn('g1', 1, 2, 80.0, 3, 1, 270.5)
+        self.store.finish_game('g1', 300.0, 'rounds', 1, 5, {1: (40, 0, 900.0), 2: (35, 1, 800.0)})
+        self.assertTrue(self.store.flush())
+
+        games = self.store.recent_games()
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0]['winner_player_number'], 1)
+        self.assertEqual(games[0]['attacker_player_number'], 2)
+        self.assertEqual([t['duration_seconds'] for t in self.store.turns_for_game('g1')], [90.5, 80.0])
+        self.assertEqual(
+            [(p['name'], p['final_score']) for p in self.store.game_players('g1')],
+            [('Alice', 40), ('Bob', 35)],
+        )
+
+    def test_player_history_across_games(self):
+        for index, opponent in enumerate(['Bob', 'Carol']):
+            key = f'g{index}'
+            self.store.start_game(key, 100.0 + index, {1: 'Alice', 2: opponent})
+            self.store.finish_game(key, 200.0 + index, 'concede', 1, 2, {1: (10, 1, 0.0), 2: (5, 1, 0.0)})
+        self.store.flush()
+
+        games = self.store.games_for_player('alice')
+        self.assertEqual([g['game_key'] for g in games], ['g1', 'g0'])
+        self.assertEqual(self.store.games_for_player('Dave'), [])
+
+    def test_unfinished_games_are_abandoned_not_deleted(self):
+        self.store.start_game('g1', 100.0, {1: 'Alice', 2: 'Bob'})
+        self.store.abandon_unfinished(150.0)
+        self.store.flush()
+
+        conn = sqlite3.connect(self.path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT status FROM games").fetchall(), [('abandoned',)])
+        self.assertEqual(self.store.recent_games(), [])
+
+    def test_lookups_use_indexes(self):
+        self.store.flush()
+        self.store.recent_games()
+        conn = sqlite3.connect(self.path)
+        self.addCleanup(conn.close)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM players WHERE name = ?", ('Alice',)).fetchall()
+        self.assertIn('USING COVERING INDEX', str(plan))
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM games ORDER BY finished_at DESC LIMIT 5").fetchall()
+        self.assertIn('idx_games_finished_at', str(plan))
+
+
+class TestIntegration(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = integration.configure(os.path.join(self.tmpdir, 'scorer.db'))
+
+    def tearDown(self):
+        integration.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_game_flow_is_recorded(self):
+        gs = GameState()
+        gs.players[1].name = 'Alice'
+        gs.current_round = 1
+        integration.record_game_started(gs)
+        self.assertIsNotNone(gs.game_id)
+
+        gs.players[1].total_score = 12
+        integration.record_turn_ended(gs, TurnEnded(1, 60.0, False, 1))
+        gs.last_round_played = 5
+        integration.record_game_finished(gs, 'rounds')
+        self.store.flush()
+
+        game = self.store.recent_games()[0]
+        self.assertEqual(game['game_key'], gs.game_id)
+        self.assertEqual(game['winner_player_number'], 1)
+        self.assertEqual(game['rounds_played'], 5)
+        self.assertEqual(self.store.turns_for_game(gs.game_id)[0]['total_score'], 12)
+
+    def test_turns_are_recorded_under_the_round_they_were_played_in(self):
+        engine = GameEngine()
+        engine.new_game()
+        engine.choose_first_turn(1, chose_self=True)
+        engine.start_game()
+        integration.record_game_started(engine.state)
+        while engine.state.game_phase == 'game_play':
+            integration.record_turn_ended(engine.state, engine.end_turn())
+        self.store.flush()
+
+        turns = [(t['round_number'], t['player_number']) for t in self.store.turns_for_game(engine.state.game_id)]
+        expected = [(round_number, player) for round_number in range(1, MAX_ROUNDS + 1) for player in (1, 2)]
+        self.assertEqual(turns, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
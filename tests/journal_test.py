@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from persistence.journal import GameJournal
+from state.delta import apply_ops, clone_state, diff_state
+
+
+def _make_state():
+    return {
+        "player1": {"name": "Player 1", "total_score": 0, "cp": 1},
+        "player2": {"name": "Player 2", "total_score": 0, "cp": 1},
+        "current_round": 1,
+        "active_player_id": 1,
+        "game_phase": "game_play",
+        "game_timer": {"status": "running", "start_time": 100.0},
+    }
+
+
+class TestStateDelta(unittest.TestCase):
+    def test_diff_and_apply_round_trip(self):
+        old = _make_state()
+        new = clone_state(old)
+        new["player1"]["cp"] = 3
+        new["status_message"] = "Player 1 CP Updated"
+        del new["active_player_id"]
+
+        ops = diff_state(old, new)
+        self.assertIn(["set", ["player1", "cp"], 3], ops)
+        self.assertIn(["del", ["active_player_id"]], ops)
+        self.assertEqual(apply_ops(clone_state(old), ops), new)
+
+    def test_type_change_is_a_change(self):
+        self.assertEqual(diff_state({"cp": 1}, {"cp": 1.0}), [["set", ["cp"], 1.0]])
+        self.assertEqual(diff_state({"cp": 1}, {"cp": 1}), [])
+
+
+class TestGameJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "game_state.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_tap_appends_one_record(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        snapshot_mtime = os.stat(self.path).st_mtime_ns
+
+        state["player1"]["cp"] = 2
+        self.assertEqual(journal.record(state), 1)
+        self.assertEqual(journal.record(state), 0, "Unchanged state must not append")
+        journal.close()
+
+        with open(journal.journal_path) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["ops"], [["set", ["player1", "cp"], 2]])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, snapshot_mtime)
+
+    def test_load_replays_journal_tail(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        state["player2"]["total_score"] = 15
+        journal.record(state)
+        state["active_player_id"] = 2
+        journal.record(state)
+        journal.close()
+
+        self.assertEqual(GameJournal(self.path).load(), state)
+
+    def test_torn_record_is_ignored(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        state["player1"]["cp"] = 4
+        journal.record(state)
+        journal.close()
+        with open(journal.journal_path, "a") as f:
+            f.write('{"seq": 2, "ops": [["set", ["player1", "c')
+
+        self.assertEqual(GameJournal(self.path).load()["player1"]["cp"], 4)
+
+    def test_records_after_a_torn_tail_survive_a_reload(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        state["player1"]["cp"] = 2
+        journal.record(state)
+        journal.close()
+        with open(journal.journal_path, "a") as f:
+            f.write('{"seq": 2, "ops": [["set", ["player1", "c')
+
+        resumed = GameJournal(self.path)
+        self.assertEqual(resumed.load()["player1"]["cp"], 2)
+        state["player1"]["cp"] = 3
+        resumed.record(state)
+        state["player2"]["total_score"] = 20
+        resumed.record(state)
+        resumed.close()
+
+        self.assertEqual(GameJournal(self.path).load(), state)
+
+    def test_record_missing_its_newline_is_kept_and_terminated(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        state["player1"]["cp"] = 2
+        journal.record(state)
+        journal.close()
+        with open(journal.journal_path, "rb+") as f:
+            f.truncate(os.path.getsize(journal.journal_path) - 1)
+
+        resumed = GameJournal(self.path)
+        self.assertEqual(resumed.load()["player1"]["cp"], 2)
+        state["player1"]["cp"] = 5
+        resumed.record(state)
+        resumed.close()
+
+        self.assertEqual(GameJournal(self.path).load(), state)
+
+    def test_compaction_truncates_journal(self):
+        journal = GameJournal(self.path, compact_every=3)
+        state = _make_state()
+        journal.record(state)
+        for cp in range(2, 7):
+            state["player1"]["cp"] = cp
+            journal.record(state)
+        journal.close()
+
+        with open(self.path) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["player1"]["cp"], 5)
+        self.assertEqual(GameJournal(self.path).load(), state)
+
+    def test_crash_between_snapshot_and_truncate_loads_the_snapshot(self):
+        journal = GameJournal(self.path)
+        state = _make_state()
+        journal.record(state)
+        state["current_round"] = 4
+        state["player1"]["total_score"] = 30
+        journal.record(state)
+        journal.close()
+        with open(journal.journal_path) as f:
+            stale_journal = f.read()
+
+        # A new game is compacted, then the process dies before the journal is truncated
+        fresh = _make_state()
+        journal = GameJournal(self.path)
+        journal.load()
+        journal.compact(fresh)
+        journal.close()
+        with open(journal.journal_path, "w") as f:
+            f.write(stale_journal)
+
+        reloaded = GameJournal(self.path)
+        self.assertEqual(reloaded.load(), fresh)
+        # Records written after the reload are newer than the snapshot and are replayed
+        fresh["player2"]["cp"] = 3
+        reloaded.record(fresh)
+        reloaded.close()
+        self.assertEqual(GameJournal(self.path).load(), fresh)
+
+    def test_loads_legacy_save_file(self):
+        state = _make_state()
+        with open(self.path, "w") as f:
+            json.dump(state, f)
+        self.assertEqual(GameJournal(self.path).load(), state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+from diagnostics import metrics
+from diagnostics.metrics import Counter, Gauge, Histogram, Registry
+from state.model import GameState
+from websocket_server import WebSocketServer
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_adds_up_shards_from_every_thread(self):
+        counter = Counter("test_total", "Test.", registry=self.registry)
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc(5)
+        self.assertEqual(counter.labels().value(), 4005)
+
+    def test_shards_of_exited_threads_are_folded_into_the_totals(self):
+        # Socket.IO handles every event on a new thread
+        counter = Counter("test_events_total", "Test.", registry=self.registry)
+        histogram = Histogram("test_event_seconds", "Test.", buckets=(0.1, 1.0), registry=self.registry)
+
+        def handle_event():
+            counter.inc()
+            histogram.observe(0.5)
+
+        for _ in range(500):
+            thread = threading.Thread(target=handle_event)
+            thread.start()
+            thread.join()
+            self.assertLessEqual(counter.labels()._values.shard_count(), 1)
+        counter.inc()
+
+        self.assertEqual(counter.labels()._values.shard_count(), 1)
+        self.assertEqual(counter.labels().value(), 501)
+        self.assertLessEqual(histogram.labels()._values.shard_count(), 1)
+        self.assertEqual(histogram.labels().snapshot(), ([0, 500, 500], 500, 250.0))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", ("event",), buckets=(0.1, 1.0), registry=self.registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.labels("end_turn").observe(value)
+        text = self.registry.render()
+        self.assertIn('test_seconds_bucket{event="end_turn",le="0.1"} 2', text)
+        self.assertIn('test_seconds_bucket{event="end_turn",le="1.0"} 3', text)
+        self.assertIn('test_seconds_bucket{event="end_turn",le="+Inf"} 4', text)
+        self.assertIn('test_seconds_count{event="end_turn"} 4', text)
+        self.assertIn('test_seconds_sum{event="end_turn"} 3.65', text)
+
+    def test_gauge_function_and_duplicate_names(self):
+        gauge = Gauge("test_clients", "Test.", ("role",), registry=self.registry)
+        gauge.labels("observers").set_function(lambda: 3)
+        self.assertIn('test_clients{role="observers"} 3', self.registry.render())
+        with self.assertRaises(ValueError):
+            Counter("test_clients", "Again.", registry=self.registry)
+
+    def test_metrics_endpoint(self):
+        state = GameState().to_dict()
+        server = WebSocketServer(get_game_state_callback=lambda: state, end_turn_callback=lambda data: None)
+        received = metrics.EVENTS_RECEIVED.labels("end_turn")
+        before = received.value()
+        client = server.socketio.test_client(server.app, auth={'role': 'player1'})
+        try:
+            client.emit('end_turn', {'player_id': 1})
+            self.assertEqual(received.value(), before + 1)
+
+            response = server.app.test_client().get('/metrics')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+            text = response.get_data(as_text=True)
+            self.assertIn('scorer_connected_clients{table="default",role="player1"} 1', text)
+            self.assertIn('scorer_socket_handler_seconds_count{event="end_turn"}', text)
+            self.assertIn('scorer_payload_bytes_count{event="game_state_update",encoding="json"}', text)
+        finally:
+            client.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
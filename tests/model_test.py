@@ -0,0 +1,85 @@
+import json
+import unittest
+
+from state.model import GameState, format_hms, other_player_id
+
+# The dict main.py used to build in _get_default_game_state
+LEGACY_DEFAULT_STATE = {
+    "player1": {"name": "Player 1", "primary_score": 0, "secondary_score": 0, "total_score": 0, "cp": 1, "deployment_roll": 0, "first_turn_roll": 0, "player_elapsed_time_seconds": 0.0, "player_time_display": "00:00:00"},
+    "player2": {"name": "Player 2", "primary_score": 0, "secondary_score": 0, "total_score": 0, "cp": 1, "deployment_roll": 0, "first_turn_roll": 0, "player_elapsed_time_seconds": 0.0, "player_time_display": "00:00:00"},
+    "current_round": 0,
+    "active_player_id": None,
+    "deployment_initiative_winner_id": None,
+    "deployment_attacker_id": None,
+    "deployment_defender_id": None,
+    "first_turn_choice_winner_id": None,
+    "first_player_of_game_id": None,
+    "last_round_played": 0,
+    "game_phase": "setup",
+    "game_timer": {"status": "stopped", "start_time": None, "elapsed_display": "00:00:00", "turn_segment_start_time": None},
+}
+
+
+class TestGameStateModel(unittest.TestCase):
+    def test_default_matches_legacy_layout(self):
+        data = GameState().to_dict()
+        for key, value in LEGACY_DEFAULT_STATE.items():
+            self.assertEqual(data[key], value, key)
+        # Fields the screens set later now always exist
+        self.assertIsNone(data["first_turn_player_id"])
+        self.assertNotIn("status_message", data)
+
+    def test_legacy_save_round_trips(self):
+        saved = json.loads(json.dumps(LEGACY_DEFAULT_STATE))
+        saved["player1"]["cp"] = 4
+        saved["player2"]["army"] = "Necrons"
+        saved["game_timer"]["paused_at"] = 12.5
+        saved["status_message"] = "Round 2 - Player 2's Turn"
+        saved["game_in_progress"] = True
+
+        gs = GameState.from_dict(saved)
+        self.assertEqual(gs.players[1].cp, 4)
+        self.assertEqual(gs.status_message, "Round 2 - Player 2's Turn")
+        self.assertEqual(gs.extra, {"game_in_progress": True})
+
+        data = gs.to_dict()
+        for key, value in saved.items():
+            self.assertEqual(data[key], value, key)
+
+    def test_attribute_updates_show_up_in_dict(self):
+        gs = GameState()
+        gs.active_player_id = 2
+        gs.active_player.total_score = 15
+        gs.game_timer.update({"status": "running", "start_time": 100.0, "paused": False})
+
+        data = gs.to_dict()
+        self.assertEqual(data["player2"]["total_score"], 15)
+        self.assertEqual(data["game_timer"]["status"], "running")
+        self.assertEqual(data["game_timer"]["paused"], False)
+        self.assertTrue(gs.game_timer.is_running)
+
+    def test_unknown_attribute_is_rejected(self):
+        gs = GameState()
+        with self.assertRaises(AttributeError):
+            gs.players[1].command_points = 3
+
+    def test_other_player_id(self):
+        self.assertEqual(other_player_id(1), 2)
+        self.assertEqual(other_player_id(2), 1)
+
+    def test_timer_displays_count_the_active_turn(self):
+        gs = GameState()
+        gs.game_phase = 'game_play'
+        gs.active_player_id = 2
+        gs.game_timer.status = 'running'
+        gs.game_timer.start_time = 1000.0
+        gs.game_timer.turn_segment_start_time = 3500.0
+        gs.players[1].player_elapsed_time_seconds = 2500.0
+        gs.store_timer_displays(3600.0)
+        self.assertEqual(gs.game_timer.elapsed_display, format_hms(2600))
+        self.assertEqual(gs.players[1].player_time_display, "00:41:40")
+        self.assertEqual(gs.players[2].player_time_display, "00:01:40")
+
+
+if __name__ == '__main__':
+    unittest.main()
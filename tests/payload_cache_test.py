@@ -0,0 +1,90 @@
+import unittest
+
+from state.model import GameState
+from state.serialization import JsonSerializer
+from web.payload_cache import PayloadCache
+from websocket_server import WebSocketServer
+
+
+class CountingSerializer(JsonSerializer):
+    def __init__(self):
+        self.encoded = []
+
+    def dumps(self, obj, sort_keys=False):
+        self.encoded.append(obj)
+        return super().dumps(obj, sort_keys=sort_keys)
+
+
+class TestPayloadCache(unittest.TestCase):
+    def test_encodes_once_per_key_and_evicts_oldest(self):
+        cache = PayloadCache(capacity=2)
+        calls = []
+
+        def encode(value):
+            return lambda: calls.append(value) or value
+
+        self.assertEqual(cache.get(('snapshot', 1), encode('a')), 'a')
+        self.assertEqual(cache.get(('snapshot', 1), encode('ignored')), 'a')
+        cache.get(('snapshot', 2), encode('b'))
+        cache.get(('snapshot', 3), encode('c'))
+        cache.get(('snapshot', 1), encode('a again'))
+
+        self.assertEqual(calls, ['a', 'b', 'c', 'a again'])
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 4, 'entries': 2})
+
+
+class TestSerializeOnce(unittest.TestCase):
+    def setUp(self):
+        self.state = GameState().to_dict()
+        self.serializer = CountingSerializer()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state, serializer=self.serializer)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            if client.is_connected():
+                client.disconnect()
+
+    def _connect(self):
+        client = self.server.socketio.test_client(self.server.app)
+        self.clients.append(client)
+        return client
+
+    def _snapshot_encodes(self):
+        return [obj for obj in self.serializer.encoded if isinstance(obj, dict) and 'state_version' in obj]
+
+    def test_observers_share_one_snapshot_encode_per_version(self):
+        for _ in range(5):
+            self._connect()
+        self.clients[0].emit('request_game_state', {'version': 1})
+        self.assertEqual(len(self._snapshot_encodes()), 1)
+
+        snapshots = [
+            p['args'][0] for client in self.clients for p in client.get_received()
+            if p['name'] == 'game_state_update'
+        ]
+        self.assertEqual(len(snapshots), 6)
+        self.assertTrue(all(snapshot == snapshots[0] for snapshot in snapshots))
+
+        self.state = dict(self.state, current_round=3)
+        self.server.broadcast_game_state()
+        self._connect()
+        self.assertEqual(len(self._snapshot_encodes()), 2)
+
+    def test_broadcast_encodes_patch_once(self):
+        for _ in range(3):
+            self._connect()
+        self.serializer.encoded.clear()
+
+        self.state = dict(self.state, current_round=2)
+        self.server.broadcast_game_state()
+
+        patches = [obj for obj in self.serializer.encoded if isinstance(obj, dict) and 'ops' in obj]
+        self.assertEqual(len(patches), 1)
+        for client in self.clients:
+            received = [p['args'][0] for p in client.get_received() if p['name'] == 'game_state_patch']
+            self.assertEqual(received[0]['ops'], [['set', ['current_round'], 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from widgets.qr_cache import QRCache, client_urls, scale_matrix
+
+
+class FakeRenderer:
+    """Stands in for qrcode: a 2x2 checkerboard scaled to the requested size."""
+
+    def __init__(self):
+        self.urls = []
+
+    def __call__(self, url, size):
+        self.urls.append(url)
+        return scale_matrix([[True, False], [False, True]], size)
+
+
+class TestScaleMatrix(unittest.TestCase):
+    def test_scales_by_a_whole_factor_bottom_row_first(self):
+        side, pixels = scale_matrix([[True, False], [False, False]], 5)
+
+        self.assertEqual(side, 4)
+        self.assertEqual(len(pixels), 16)
+        # The dark module is top left, so it ends up in the last two rows
+        self.assertEqual(pixels[:8], b"\xff" * 8)
+        self.assertEqual(pixels[8:], b"\x00\x00\xff\xff" * 2)
+
+
+class TestQRCache(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.renderer = FakeRenderer()
+        self.cache = QRCache(os.path.join(self.data_dir, "qr"), renderer=self.renderer)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_renders_once_then_serves_from_memory(self):
+        first = self.cache.pixels("http://10.0.0.2:6969/", 8)
+        second = self.cache.pixels("http://10.0.0.2:6969/", 8)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.renderer.urls, ["http://10.0.0.2:6969/"])
+        self.assertEqual((self.cache.renders, self.cache.memory_hits), (1, 1))
+
+    def test_survives_a_restart(self):
+        rendered = self.cache.pixels("http://10.0.0.2:6969/player/1", 8)
+
+        restarted = QRCache(self.cache.cache_dir, renderer=self.renderer)
+        self.assertEqual(restarted.pixels("http://10.0.0.2:6969/player/1", 8), rendered)
+        self.assertEqual(len(self.renderer.urls), 1)
+        self.assertEqual(restarted.disk_hits, 1)
+
+    def test_key_covers_url_and_size(self):
+        self.cache.pixels("http://10.0.0.2:6969/", 8)
+        self.cache.pixels("http://10.0.0.2:6969/", 16)
+        self.cache.pixels("http://10.0.0.3:6969/", 8)
+
+        self.assertEqual(self.cache.renders, 3)
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 3)
+
+    def test_corrupt_file_is_rendered_again(self):
+        url = "http://10.0.0.2:6969/"
+        path = self.cache.path(url, 8)
+        os.makedirs(self.cache.cache_dir)
+        with open(path, "wb") as f:
+            f.write(b"\x00" * 7)
+
+        side, pixels = self.cache.pixels(url, 8)
+
+        self.assertEqual(self.cache.renders, 1)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), pixels)
+
+    def test_prunes_least_recently_used_files(self):
+        self.cache.max_files = 3
+        for index, url in enumerate(client_urls("10.0.0.2").values()):
+            self.cache.pixels(url, 8)
+            os.utime(self.cache.path(url, 8), (index, index))
+
+        self.cache.pixels(client_urls("10.0.0.9")["observer"], 8)
+
+        remaining = sorted(os.listdir(self.cache.cache_dir))
+        self.assertEqual(len(remaining), 3)
+        self.assertNotIn(os.path.basename(self.cache.path(client_urls("10.0.0.2")["observer"], 8)), remaining)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from state.model import GameState
+from web.projections import OBSERVER_ROLE, project
+from websocket_server import WebSocketServer
+
+
+def _make_state():
+    gs = GameState()
+    gs.game_phase = 'game_play'
+    gs.current_round = 1
+    gs.active_player_id = 1
+    return gs.to_dict()
+
+
+class TestProjections(unittest.TestCase):
+    def test_observers_do_not_get_score_breakdown(self):
+        view = project(_make_state(), OBSERVER_ROLE)
+        self.assertNotIn('primary_score', view['player1'])
+        self.assertNotIn('deployment_roll', view['player2'])
+        self.assertIn('total_score', view['player1'])
+
+    def test_player_gets_own_breakdown_only(self):
+        view = project(_make_state(), 'player2')
+        self.assertIn('primary_score', view['player2'])
+        self.assertNotIn('primary_score', view['player1'])
+        self.assertIn('cp', view['player1'])
+
+    def test_projection_is_smaller_than_state(self):
+        state = _make_state()
+        for role in ('player1', 'player2', OBSERVER_ROLE):
+            self.assertLess(len(str(project(state, role))), len(str(state)))
+
+
+class TestRoleRooms(unittest.TestCase):
+    def setUp(self):
+        self.state = _make_state()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state)
+        self.clients = {
+            role: self.server.socketio.test_client(self.server.app, auth=auth)
+            for role, auth in (
+                ('player1', {'role': 'player1'}),
+                ('player2', {'role': 'player2'}),
+                ('observers', None),
+            )
+        }
+
+    def tearDown(self):
+        for client in self.clients.values():
+            if client.is_connected():
+                client.disconnect()
+
+    def _events(self, role, name):
+        return [p['args'][0] for p in self.clients[role].get_received() if p['name'] == name]
+
+    def test_each_role_gets_its_projection_on_connect(self):
+        observer = self._events('observers', 'game_state_update')[0]
+        player1 = self._events('player1', 'game_state_update')[0]
+        self.assertNotIn('primary_score', observer['player1'])
+        self.assertIn('primary_score', player1['player1'])
+        self.assertNotIn('primary_score', player1['player2'])
+
+    def test_private_change_only_reaches_that_player(self):
+        for client in self.clients.values():
+            client.get_received()
+        player1 = dict(self.state['player1'], primary_score=5, total_score=5)
+        self.state = dict(self.state, player1=player1)
+        self.server.broadcast_game_state()
+
+        own = self._events('player1', 'game_state_patch')[0]['ops']
+        self.assertIn(['set', ['player1', 'primary_score'], 5], own)
+        for role in ('player2', 'observers'):
+            ops = self._events(role, 'game_state_patch')[0]['ops']
+            self.assertEqual(ops, [['set', ['player1', 'total_score'], 5]])
+
+    def test_unrendered_change_is_not_broadcast(self):
+        for client in self.clients.values():
+            client.get_received()
+        self.state = dict(self.state, deployment_initiative_winner_id=2)
+        self.server.broadcast_game_state()
+        for role in self.clients:
+            self.assertEqual(self._events(role, 'game_state_patch'), [])
+
+    def test_observer_events_skip_players(self):
+        for client in self.clients.values():
+            client.get_received()
+        self.server.broadcast_game_phase_update('game_over')
+        self.assertEqual(len(self._events('observers', 'game_phase_update')), 1)
+        self.assertEqual(self._events('player1', 'game_phase_update'), [])
+
+    def test_resuming_as_another_role_gets_a_snapshot(self):
+        token = next(p['args'][0]['token'] for p in self.clients['player1'].get_received() if p['name'] == 'session')
+        self.clients['player1'].disconnect()
+        client = self.server.socketio.test_client(
+            self.server.app, auth={'role': 'player2', 'session': token, 'version': 1},
+        )
+        try:
+            snapshots = [p['args'][0] for p in client.get_received() if p['name'] == 'game_state_update']
+            self.assertEqual(len(snapshots), 1)
+            self.assertIn('primary_score', snapshots[0]['player2'])
+        finally:
+            client.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
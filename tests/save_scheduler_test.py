@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from persistence.atomic_file import atomic_write
+from persistence.save_scheduler import SaveScheduler
+
+
+class TestSaveScheduler(unittest.TestCase):
+    def setUp(self):
+        self.writes = []
+        self.written = threading.Event()
+
+        def write(state):
+            self.writes.append(state)
+            self.written.set()
+
+        self.scheduler = SaveScheduler(write, window=0.05)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_burst_is_merged_into_one_write(self):
+        for cp in range(10):
+            self.scheduler.request_save({"player1": {"cp": cp}})
+        self.assertTrue(self.written.wait(2), "Scheduler never wrote")
+
+        self.assertEqual(self.writes, [{"player1": {"cp": 9}}])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["requested"], 10)
+        self.assertEqual(stats["written"], 1)
+        self.assertEqual(stats["merged"], 9)
+
+    def test_unchanged_state_is_not_rewritten(self):
+        self.scheduler.request_save({"cp": 1})
+        self.assertTrue(self.scheduler.flush())
+        self.scheduler.request_save({"cp": 1})
+        self.assertFalse(self.scheduler.flush())
+
+        self.assertEqual(len(self.writes), 1)
+        self.assertEqual(self.scheduler.stats()["skipped_unchanged"], 1)
+
+    def test_versioned_saves_skip_on_version(self):
+        snapshot = {"cp": 1}
+        self.scheduler.request_save(snapshot, version=3)
+        self.assertTrue(self.scheduler.flush())
+        self.scheduler.request_save(snapshot, version=3)
+        self.assertFalse(self.scheduler.flush())
+        self.scheduler.request_save({"cp": 2}, version=4)
+        self.assertTrue(self.scheduler.flush())
+
+        self.assertEqual(self.writes, [{"cp": 1}, {"cp": 2}])
+
+    def test_stop_flushes_pending_state(self):
+        self.scheduler.window = 60
+        self.scheduler.request_save({"cp": 2})
+        self.scheduler.stop()
+        self.assertEqual(self.writes, [{"cp": 2}])
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def test_replaces_file_without_leaving_temp_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "game_state.json")
+            atomic_write(path, "old")
+            atomic_write(path, b"new")
+            with open(path) as f:
+                self.assertEqual(f.read(), "new")
+            self.assertEqual(os.listdir(tmp_dir), ["game_state.json"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from types import SimpleNamespace
+
+from screens.screen_registry import ScreenRegistry
+
+
+class FakeManager:
+    """The parts of Kivy's ScreenManager the registry uses."""
+
+    def __init__(self):
+        self.screens = []
+        self.current = None
+        self.transition = SimpleNamespace(is_active=False)
+
+    def has_screen(self, name):
+        return any(screen.name == name for screen in self.screens)
+
+    def get_screen(self, name):
+        return next(screen for screen in self.screens if screen.name == name)
+
+    def add_widget(self, screen):
+        self.screens.append(screen)
+
+    def remove_widget(self, screen):
+        self.screens.remove(screen)
+
+
+class TestScreenRegistry(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.frames = []
+        self.released = []
+        self.registry = ScreenRegistry(
+            self.manager, schedule=self.frames.append,
+            prewarm={'deployment_setup': ['first_turn_setup', 'game']},
+            evict_on_enter={'game': ['splash', 'deployment_setup']},
+            release=self.released.append,
+        )
+        for name in ('splash', 'deployment_setup', 'first_turn_setup', 'game'):
+            self.registry.register(name, SimpleNamespace)
+
+    def run_idle_frames(self):
+        while self.frames:
+            self.frames.pop(0)(0)
+
+    def test_screens_are_built_on_first_use(self):
+        self.assertEqual(self.manager.screens, [])
+        screen = self.registry.get('splash')
+        self.assertEqual(screen.name, 'splash')
+        self.assertIs(self.registry.get('splash'), screen)
+        self.assertEqual(self.registry.builds, 1)
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+    def test_next_screens_are_prewarmed_one_per_idle_frame(self):
+        self.registry.switch('deployment_setup')
+        self.assertEqual(self.manager.current, 'deployment_setup')
+        self.assertFalse(self.registry.is_built('first_turn_setup'))
+        self.frames.pop(0)(0)
+        self.assertTrue(self.registry.is_built('first_turn_setup'))
+        self.assertFalse(self.registry.is_built('game'))
+        self.run_idle_frames()
+        self.assertTrue(self.registry.is_built('game'))
+
+    def test_screens_left_behind_are_dropped_after_the_transition(self):
+        self.registry.get('splash')
+        self.registry.switch('deployment_setup')
+        self.run_idle_frames()
+        self.manager.transition.is_active = True
+        self.registry.switch('game')
+        self.frames.pop(0)(0)
+        self.assertTrue(self.registry.is_built('deployment_setup'))
+
+        self.manager.transition.is_active = False
+        self.run_idle_frames()
+        self.assertEqual([screen.name for screen in self.manager.screens], ['first_turn_setup', 'game'])
+        self.assertEqual([screen.name for screen in self.released], ['splash', 'deployment_setup'])
+        # A dropped screen is rebuilt if it is needed again
+        self.registry.switch('deployment_setup')
+        self.assertTrue(self.registry.is_built('deployment_setup'))
+
+    def test_visible_screen_is_never_dropped(self):
+        self.registry.switch('splash')
+        self.assertFalse(self.registry.evict('splash'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from persistence.journal import GameJournal
+from state.model import GameState
+from state.serialization import (
+    JsonSerializer, SocketIOJson, available_serializers, get_serializer, msgpack,
+)
+from state.snapshot import freeze
+from websocket_server import WebSocketServer
+
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self):
+        self.state = freeze(GameState().to_dict())
+
+    def test_every_backend_round_trips_a_snapshot(self):
+        for name in available_serializers():
+            serializer = get_serializer(name, binary=True)
+            self.assertEqual(serializer.name, name)
+            self.assertEqual(serializer.loads(serializer.dumps(self.state)), self.state, name)
+
+    def test_text_backends_agree(self):
+        reference = JsonSerializer().dumps(self.state, sort_keys=True)
+        for name in available_serializers():
+            serializer = get_serializer(name)
+            if not serializer.binary:
+                self.assertEqual(serializer.dumps(self.state, sort_keys=True), reference, name)
+
+    def test_unknown_or_binary_backend_falls_back_to_text(self):
+        with self.assertLogs('state.serialization', level='WARNING'):
+            self.assertFalse(get_serializer('yaml').binary)
+        with self.assertLogs('state.serialization', level='WARNING'):
+            self.assertFalse(get_serializer('msgpack').binary)
+
+    def test_socketio_adapter_ignores_json_module_kwargs(self):
+        adapter = SocketIOJson(JsonSerializer())
+        encoded = adapter.dumps({'a': 1}, separators=(',', ':'))
+        self.assertEqual(adapter.loads(encoded), {'a': 1})
+
+    def test_journal_files_are_plain_json(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'game_state.json')
+
+        journal = GameJournal(path, fsync=False)
+        state = GameState().to_dict()
+        journal.record(state)
+        state['player1']['cp'] = 3
+        journal.record(state)
+        journal.close()
+
+        reloaded = GameJournal(path, fsync=False, serializer=JsonSerializer()).load()
+        self.assertEqual(reloaded, state)
+
+
+@unittest.skipIf(msgpack is None, 'msgpack is not installed')
+class TestBinaryNegotiation(unittest.TestCase):
+    def setUp(self):
+        self.state = GameState().to_dict()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state)
+        self.json_client = self.server.socketio.test_client(self.server.app)
+        self.binary_client = self.server.socketio.test_client(self.server.app, auth={'encoding': 'msgpack'})
+
+    def tearDown(self):
+        for client in (self.json_client, self.binary_client):
+            if client.is_connected():
+                client.disconnect()
+
+    def test_clients_receive_state_in_their_encoding(self):
+        received = {p['name']: p['args'][0] for p in self.binary_client.get_received()}
+        self.assertEqual(received['session']['encoding'], 'msgpack')
+        snapshot = msgpack.unpackb(received['game_state_update'], raw=False)
+        self.assertEqual(snapshot['player1']['cp'], 1)
+        self.json_client.get_received()
+
+        self.state = dict(self.state, current_round=2)
+        self.server.broadcast_game_state()
+
+        json_patch = [p['args'][0] for p in self.json_client.get_received() if p['name'] == 'game_state_patch']
+        binary_patch = [p['args'][0] for p in self.binary_client.get_received() if p['name'] == 'game_state_patch']
+        self.assertEqual(len(json_patch), 1)
+        self.assertEqual(len(binary_patch), 1)
+        self.assertEqual(msgpack.unpackb(binary_patch[0], raw=False), json_patch[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
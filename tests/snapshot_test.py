@@ -0,0 +1,86 @@
+import copy
+import json
+import threading
+import unittest
+
+from state.delta import diff_state
+from state.snapshot import FrozenDict, SnapshotStore, freeze
+
+
+def _make_state():
+    return {
+        "player1": {"name": "Player 1", "total_score": 0, "cp": 1},
+        "player2": {"name": "Player 2", "total_score": 0, "cp": 1},
+        "active_player_id": 1,
+        "game_timer": {"status": "running", "start_time": 100.0},
+    }
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_snapshot_is_read_only(self):
+        snapshot = freeze(_make_state())
+        with self.assertRaises(TypeError):
+            snapshot["active_player_id"] = 2
+        with self.assertRaises(TypeError):
+            snapshot["player1"]["cp"] = 3
+        with self.assertRaises(TypeError):
+            snapshot["game_timer"].update(status="stopped")
+
+    def test_unchanged_subtrees_are_shared(self):
+        live = _make_state()
+        store = SnapshotStore(live)
+        first = store.current
+
+        live["player1"]["cp"] = 2
+        second = store.publish(live)
+
+        self.assertIsNot(first, second)
+        self.assertIs(first["player2"], second["player2"])
+        self.assertIs(first["game_timer"], second["game_timer"])
+        self.assertEqual(second["player1"]["cp"], 2)
+        self.assertEqual(first["player1"]["cp"], 1, "Old versions must not change")
+        self.assertEqual(diff_state(first, second), [["set", ["player1", "cp"], 2]])
+
+    def test_publish_without_changes_keeps_version(self):
+        live = _make_state()
+        store = SnapshotStore(live)
+        version, snapshot = store.head
+        self.assertIs(store.publish(live), snapshot)
+        self.assertEqual(store.head[0], version)
+
+        live["active_player_id"] = 2
+        store.publish(live)
+        self.assertEqual(store.head[0], version + 1)
+
+    def test_snapshot_encodes_like_a_dict(self):
+        live = _make_state()
+        snapshot = freeze(live)
+        self.assertIsInstance(snapshot, FrozenDict)
+        self.assertEqual(json.loads(json.dumps(snapshot)), live)
+        self.assertIs(copy.deepcopy(snapshot), snapshot)
+
+    def test_readers_see_consistent_versions(self):
+        live = _make_state()
+        store = SnapshotStore(live)
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                snapshot = store.current
+                if snapshot["player1"]["cp"] != snapshot["player2"]["cp"]:
+                    errors.append(dict(snapshot))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for cp in range(2, 500):
+            live["player1"]["cp"] = cp
+            live["player2"]["cp"] = cp
+            store.publish(live)
+        done.set()
+        thread.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import startup as startup_benchmark
+from diagnostics.startup import StartupProfiler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.profiler = StartupProfiler(os.path.join(self.data_dir, "startup.json"), clock=self.clock)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_marks_and_phases_are_laid_end_to_end(self):
+        self.clock.now += 0.5
+        self.profiler.mark("import:kivy_window")
+        with self.profiler.phase("load_kv"):
+            self.clock.now += 0.25
+        self.clock.now += 0.1
+        path = self.profiler.finish()
+
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report["time_to_first_frame_ms"], 850.0)
+        self.assertEqual(
+            [(phase["name"], phase["start_ms"], phase["duration_ms"]) for phase in report["phases"]],
+            [("import:kivy_window", 0.0, 500.0), ("load_kv", 500.0, 250.0), ("first_frame", 750.0, 100.0)],
+        )
+        # Later flips do not overwrite the first frame
+        self.assertIsNone(self.profiler.finish())
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    def test_summary_and_regression_threshold(self):
+        reports = [
+            {"time_to_first_frame_ms": total, "phases": [{"name": "build", "duration_ms": total / 10}]}
+            for total in (1000, 1200, 1100)
+        ]
+        current = {"results": startup_benchmark.summarize(reports)}
+        self.assertEqual(current["results"]["time_to_first_frame"]["median_ms"], 1100)
+        self.assertEqual(current["results"]["build"]["max_ms"], 120)
+
+        baseline = {"results": {"time_to_first_frame": {"median_ms": 1050}}}
+        self.assertEqual(startup_benchmark.check_regression(baseline, current), (True, 1.048))
+        baseline = {"results": {"time_to_first_frame": {"median_ms": 900}}}
+        self.assertFalse(startup_benchmark.check_regression(baseline, current)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
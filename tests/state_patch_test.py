@@ -0,0 +1,142 @@
+import json
+import unittest
+
+from state.delta import apply_ops, clone_state
+from state.history import VersionHistory
+from web.projections import OBSERVER_ROLE, project
+from websocket_server import WebSocketServer
+
+
+def _make_state():
+    return {
+        'player1': {'name': 'Player 1', 'primary_score': 0, 'secondary_score': 0, 'total_score': 0, 'cp': 1},
+        'player2': {'name': 'Player 2', 'primary_score': 0, 'secondary_score': 0, 'total_score': 0, 'cp': 1},
+        'current_round': 1,
+        'active_player_id': 1,
+        'game_phase': 'game_play',
+        'game_timer': {'status': 'stopped', 'start_time': None, 'elapsed_display': '00:00:00'},
+    }
+
+
+class TestVersionedBroadcasts(unittest.TestCase):
+    def setUp(self):
+        self.state = _make_state()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state.copy())
+        self.client = self.server.socketio.test_client(self.server.app)
+
+    def tearDown(self):
+        if self.client.is_connected():
+            self.client.disconnect()
+
+    def _events(self, name):
+        return [packet['args'][0] for packet in self.client.get_received() if packet['name'] == name]
+
+    def test_connect_sends_versioned_snapshot(self):
+        snapshots = self._events('game_state_update')
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[0]['state_version'], 1)
+        self.assertEqual(snapshots[0]['player1']['cp'], 1)
+
+    def test_broadcast_sends_patch_against_previous_version(self):
+        snapshot = self._events('game_state_update')[0]
+        self.state['player1']['cp'] = 2
+        self.server.broadcast_game_state()
+
+        patches = self._events('game_state_patch')
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(patches[0]['base'], snapshot['state_version'])
+        self.assertEqual(patches[0]['version'], snapshot['state_version'] + 1)
+        self.assertEqual(patches[0]['ops'], [['set', ['player1', 'cp'], 2]])
+
+        rebuilt = apply_ops(clone_state(snapshot), patches[0]['ops'])
+        del rebuilt['state_version']
+        self.assertEqual(rebuilt, project(self.state, OBSERVER_ROLE))
+
+        patch_bytes = len(json.dumps(patches[0]))
+        state_bytes = len(json.dumps(self.state))
+        self.assertLess(patch_bytes * 5, state_bytes)
+
+    def test_unchanged_state_is_not_broadcast(self):
+        self.client.get_received()
+        self.server.broadcast_game_state()
+        self.assertEqual(self._events('game_state_patch'), [])
+
+    def test_gap_report_gets_a_fresh_snapshot(self):
+        self.client.get_received()
+        self.state['player2']['total_score'] = 10
+        self.server.broadcast_game_state()
+        self.client.get_received()
+
+        self.client.emit('request_game_state', {'version': 1})
+        snapshots = self._events('game_state_update')
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[0]['state_version'], 2)
+        self.assertEqual(snapshots[0]['player2']['total_score'], 10)
+
+
+class TestResumableSessions(unittest.TestCase):
+    def setUp(self):
+        self.state = _make_state()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.state.copy(), history_size=4)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            if client.is_connected():
+                client.disconnect()
+
+    def _connect(self, auth=None):
+        client = self.server.socketio.test_client(self.server.app, auth=auth)
+        self.clients.append(client)
+        received = client.get_received()
+        token = next(p['args'][0]['token'] for p in received if p['name'] == 'session')
+        return client, token, received
+
+    def test_reconnect_receives_only_missed_changes(self):
+        client, token, received = self._connect()
+        version = next(p['args'][0]['state_version'] for p in received if p['name'] == 'game_state_update')
+        client.disconnect()
+
+        self.state['player1']['cp'] = 2
+        self.server.broadcast_game_state()
+        self.state['player2']['total_score'] = 5
+        self.server.broadcast_game_state()
+
+        _, resumed_token, received = self._connect({'session': token, 'version': version})
+        self.assertEqual(resumed_token, token)
+        self.assertEqual([p['name'] for p in received], ['session', 'game_state_patch'])
+        patch = received[1]['args'][0]
+        self.assertEqual(patch['base'], version)
+        self.assertEqual(patch['ops'], [['set', ['player1', 'cp'], 2], ['set', ['player2', 'total_score'], 5]])
+
+    def test_version_outside_history_falls_back_to_snapshot(self):
+        client, token, _ = self._connect()
+        client.disconnect()
+        for cp in range(2, 9):
+            self.state['player1']['cp'] = cp
+            self.server.broadcast_game_state()
+
+        _, _, received = self._connect({'session': token, 'version': 1})
+        self.assertIn('game_state_update', [p['name'] for p in received])
+
+    def test_unknown_token_gets_snapshot(self):
+        _, token, received = self._connect({'session': 'from-a-previous-run', 'version': 1})
+        self.assertNotEqual(token, 'from-a-previous-run')
+        self.assertIn('game_state_update', [p['name'] for p in received])
+
+
+class TestVersionHistory(unittest.TestCase):
+    def test_ops_since(self):
+        history = VersionHistory(capacity=2)
+        history.append(2, [['set', ['a'], 1]])
+        history.append(3, [['set', ['b'], 2]])
+        history.append(4, [['set', ['c'], 3]])
+
+        self.assertEqual(history.ops_since(4, 4), [])
+        self.assertEqual(history.ops_since(2, 4), [['set', ['b'], 2], ['set', ['c'], 3]])
+        self.assertIsNone(history.ops_since(1, 4))
+        self.assertIsNone(history.ops_since(5, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
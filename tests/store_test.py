@@ -0,0 +1,67 @@
+import unittest
+from types import SimpleNamespace
+
+from benchmarks import ui_updates
+from screens.state_bindings import GAME_SCREEN_BINDINGS, ScreenBindings
+from state.model import GameState
+from state.store import StateStore
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.store = StateStore({"player1": {"cp": 0, "name": "Ann"}, "game_phase": "setup"})
+        self.calls = []
+
+    def test_subscriber_is_called_now_and_on_change_only(self):
+        self.store.subscribe("player1.cp", lambda cp: self.calls.append(cp))
+        self.store.update({"player1": {"cp": 0, "name": "Bob"}, "game_phase": "setup"})
+        self.store.update({"player1": {"cp": 2, "name": "Bob"}, "game_phase": "setup"})
+        self.assertEqual(self.calls, [0, 2])
+
+    def test_subscriber_with_several_changed_paths_is_called_once(self):
+        self.store.subscribe(["player1.cp", "game_phase"], lambda *values: self.calls.append(values))
+        self.assertEqual(self.store.update({"player1": {"cp": 1, "name": "Ann"}, "game_phase": "game_play"}), 1)
+        self.assertEqual(self.calls, [(0, "setup"), (1, "game_play")])
+
+    def test_cancelled_subscription_is_not_called(self):
+        subscription = self.store.subscribe("game_phase", self.calls.append, immediate=False)
+        subscription.cancel()
+        self.store.update({"game_phase": "game_play"})
+        self.assertEqual(self.calls, [])
+
+    def test_bound_property_is_written_only_when_its_value_changes(self):
+        label = SimpleNamespace(text="")
+        self.store.bind_property(label, "text", "player1.cp", lambda cp: f"Command Points: {cp}")
+        self.assertEqual(label.text, "Command Points: 0")
+        self.store.update({"player1": {"cp": 3, "name": "Ann"}})
+        self.assertEqual(label.text, "Command Points: 3")
+        self.assertEqual(self.store.get("game_phase", "gone"), "gone")
+
+
+class TestGameScreenBindings(unittest.TestCase):
+    def test_cp_change_touches_only_the_cp_label(self):
+        gs = GameState()
+        gs.game_phase, gs.active_player_id, gs.current_round = "game_play", 1, 2
+        store = StateStore(gs.to_dict())
+        screen = SimpleNamespace(**{
+            widget: SimpleNamespace(text="", opacity=0, disabled=True) for widget, *_ in GAME_SCREEN_BINDINGS
+        })
+        ScreenBindings(screen, GAME_SCREEN_BINDINGS).bind(store)
+        self.assertEqual(screen.p1_name_label.text, "Player 1 - Active")
+        self.assertEqual(screen.header_round_label.text, "Round 2")
+        self.assertEqual(screen.p1_end_turn_button.opacity, 1)
+        self.assertTrue(screen.p2_end_turn_button.disabled)
+
+        gs.players[1].cp = 4
+        self.assertEqual(store.update(gs.to_dict()), 1)
+        self.assertEqual(screen.p1_cp_label.text, "Command Points: 4")
+
+    def test_benchmark_store_writes_less_than_a_full_redraw(self):
+        results = ui_updates.run(seed=3)
+        count, writes, dispatches, rebuilds = results["store"]["add_cp"]
+        self.assertEqual((writes, dispatches), (count, count))
+        self.assertEqual(results["redraw"]["add_cp"][1], count * len(GAME_SCREEN_BINDINGS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from swarm_client import LatencyHistogram, ObserverClient, Stats, parse_mix
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_and_buckets(self):
+        histogram = LatencyHistogram(buckets=(10, 100))
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 50)
+        self.assertAlmostEqual(summary["p99_ms"], 99)
+        self.assertEqual(summary["histogram"], {"10": 10, "100": 90, "inf": 0})
+
+    def test_empty(self):
+        self.assertIsNone(LatencyHistogram().summary()["p95_ms"])
+
+
+class TestSwarmHelpers(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("score=2,end_turn=1"), {"score": 2.0, "end_turn": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("concede=1")
+
+    def test_observer_times_each_command_once_even_when_states_are_skipped(self):
+        stats, log = Stats(), []
+        observer = ObserverClient("http://localhost", "1", stats, log)
+        log.extend([
+            (1.0, "player1", "total_score", 5),
+            (1.1, "player2", "cp", 2),
+            (1.2, "player1", "total_score", 9),
+        ])
+        # A throttled update that already includes the last score but not the CP change
+        observer.state = {"player1": {"total_score": 9}, "player2": {"cp": 1}}
+        observer.on_state(1.5)
+        self.assertEqual(len(stats.observer.samples), 2)
+        observer.state["player2"]["cp"] = 2
+        observer.on_state(2.0)
+        observer.on_state(2.5)
+        self.assertEqual(len(stats.observer.samples), 3)
+        self.assertEqual(observer.cursor, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
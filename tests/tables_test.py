@@ -0,0 +1,187 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from state.model import GameState
+from web.hosted_game import HostedGame
+from websocket_server import WebSocketServer
+
+
+class TestMultiTableServer(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.default_state = GameState().to_dict()
+        self.server = WebSocketServer(get_game_state_callback=lambda: self.default_state)
+        self.games = [HostedGame(table_id, self.data_dir, self.server, save_window=0) for table_id in ('1', '2')]
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            if client.is_connected():
+                client.disconnect()
+        for game in self.games:
+            game.close()
+        shutil.rmtree(self.data_dir)
+
+    def _connect(self, table=None):
+        auth = {'table': table} if table else None
+        client = self.server.socketio.test_client(self.server.app, auth=auth)
+        self.clients.append(client)
+        return client
+
+    def _events(self, client, name):
+        return [event['args'][0] for event in client.get_received() if event['name'] == name]
+
+    def test_broadcast_only_reaches_its_table(self):
+        table1, table2, default = self._connect('1'), self._connect('2'), self._connect()
+        for client in (table1, table2, default):
+            client.get_received()
+
+        self.games[0].start_game("Alice", "Bob")
+
+        patches = self._events(table1, 'game_state_patch')
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(self._events(table2, 'game_state_patch'), [])
+        self.assertEqual(self._events(default, 'game_state_patch'), [])
+
+    def test_events_are_handled_by_the_clients_table(self):
+        self.games[0].start_game()
+        self.games[1].start_game()
+        client = self._connect('2')
+        client.emit('update_score', {'player_id': 1, 'score_type': 'primary', 'value': 7})
+
+        self.assertEqual(self.games[1].game_state.players[1].total_score, 7)
+        self.assertEqual(self.games[0].game_state.players[1].total_score, 0)
+
+    def test_phase_round_and_timer_updates_go_to_the_tables_game(self):
+        self.games[0].start_game()
+        client = self._connect('1')
+        client.get_received()
+
+        phase_ack = client.emit('update_game_phase', {'phase': 'game_over'}, callback=True)
+        round_ack = client.emit('update_round', {'round': 3, 'trace_id': 't1'}, callback=True)
+        timer_ack = client.emit('update_timer', {'status': 'running', 'elapsed_display': '00:01:00', 'trace_id': 't2'}, callback=True)
+
+        self.assertEqual([ack['ok'] for ack in (phase_ack, round_ack, timer_ack)], [True, True, True])
+        state = self.games[0].get_game_state()
+        self.assertEqual(state['game_phase'], 'game_over')
+        self.assertEqual(state['current_round'], 3)
+        self.assertEqual(state['game_timer']['status'], 'running')
+        self.assertEqual(state['game_timer']['elapsed_display'], '00:01:00')
+        self.assertNotIn('trace_id', state['game_timer'])
+        self.assertEqual(self.games[1].game_state.current_round, 0)
+        received = client.get_received()
+        self.assertEqual([event['args'][0] for event in received if event['name'] == 'game_phase_update'],
+                         [{'phase': 'game_over'}])
+        self.assertEqual([event['args'][0]['round'] for event in received if event['name'] == 'round_update'], [3])
+        self.assertEqual([event['args'][0]['status'] for event in received if event['name'] == 'timer_update'],
+                         ['running'])
+
+    def test_invalid_updates_are_not_applied_or_broadcast(self):
+        self.games[0].start_game()
+        client = self._connect('1')
+        client.get_received()
+        before = self.games[0].game_state.to_dict()
+
+        acks = [
+            client.emit('update_round', {'round': 'soon'}, callback=True),
+            client.emit('update_round', {'round': 6}, callback=True),
+            client.emit('update_game_phase', {'phase': 'playing'}, callback=True),
+            client.emit('update_timer', {'status': 'running', 'start_time': 'soon'}, callback=True),
+        ]
+
+        self.assertEqual(acks, [{'ok': True, 'result': False}] * 4)
+        self.assertEqual(self.games[0].game_state.to_dict(), before)
+        received = client.get_received()
+        self.assertEqual([event['name'] for event in received
+                          if event['name'] in ('round_update', 'game_phase_update', 'timer_update')], [])
+
+    def test_non_numeric_score_is_rejected(self):
+        self.games[0].start_game()
+        client = self._connect('1')
+        acks = [client.emit('update_score', {'player_id': 1, 'score_type': 'primary', 'value': value}, callback=True)
+                for value in ('ten', None, [3], True)]
+
+        self.assertEqual(acks, [{'ok': True, 'result': False}] * 4)
+        self.assertEqual(self.games[0].game_state.players[1].total_score, 0)
+        client.emit('update_score', {'player_id': 1, 'score_type': 'primary', 'value': '12'})
+        self.assertEqual(self.games[0].game_state.players[1].total_score, 12)
+
+    def test_new_game_restarts_a_finished_table(self):
+        game = self.games[0]
+        game.start_game("Alice", "Bob")
+        game.handle_update_score({'player_id': 1, 'value': 40})
+        game.handle_concede({'player_id': 2})
+        self.assertEqual(game.game_state.game_phase, 'game_over')
+        client = self._connect('1')
+
+        ack = client.emit('new_game', {'first_player_id': 2, 'player2_name': 'Carol'}, callback=True)
+
+        self.assertTrue(ack['ok'])
+        gs = game.game_state
+        self.assertEqual((gs.game_phase, gs.current_round, gs.active_player_id), ('game_play', 1, 2))
+        self.assertEqual((gs.players[1].name, gs.players[2].name), ('Alice', 'Carol'))
+        self.assertEqual(gs.players[1].total_score, 0)
+        self.assertEqual(client.emit('new_game', {'first_player_id': 3}, callback=True), {'ok': True, 'result': False})
+        self.assertEqual(game.game_state.active_player_id, 2)
+
+    def test_unknown_table_is_rejected(self):
+        client = self._connect('nope')
+        self.assertFalse(client.is_connected())
+
+    def test_table_routes(self):
+        http = self.server.app.test_client()
+        response = http.get('/table/1/player/2')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'data-table-id="1"', response.data)
+        self.assertEqual(http.get('/table/9/player/1').status_code, 404)
+        self.assertEqual(http.get('/player/1').status_code, 200)
+
+    def test_duplicate_table_id_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.server.add_table('1')
+
+
+class TestHostedGame(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.server = WebSocketServer()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_each_table_saves_and_resumes_its_own_game(self):
+        game = HostedGame('7', self.data_dir, self.server, save_window=0)
+        game.start_game("Alice", "Bob")
+        game.handle_increment_cp({'player_id': 2})
+        game.handle_end_turn({'player_id': 1})
+        game.close()
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, 'table_7', HostedGame.SAVE_FILE_NAME)))
+
+        resumed = HostedGame('7', self.data_dir, self.server, save_window=0)
+        try:
+            gs = resumed.game_state
+            self.assertEqual(gs.players[1].name, "Alice")
+            self.assertEqual(gs.players[2].cp, 2)
+            self.assertEqual(gs.active_player_id, 2)
+        finally:
+            resumed.close()
+
+    def test_round_advances_and_game_ends_after_last_round(self):
+        game = HostedGame('1', self.data_dir, self.server, save_window=0)
+        try:
+            game.start_game()
+            game.handle_end_turn({'player_id': 2}) # not their turn
+            self.assertEqual(game.game_state.active_player_id, 1)
+            for _ in range(HostedGame.MAX_ROUNDS):
+                game.handle_end_turn({'player_id': 1})
+                game.handle_end_turn({'player_id': 2})
+            self.assertEqual(game.game_state.game_phase, 'game_over')
+            self.assertEqual(game.game_state.last_round_played, HostedGame.MAX_ROUNDS)
+        finally:
+            game.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from diagnostics import tracing
+from diagnostics.tracing import Tracer
+from web.hosted_game import HostedGame
+from websocket_server import WebSocketServer
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(trace_file=None)
+        with tracer.span("work"):
+            pass
+        self.assertEqual(tracer.events(), [])
+
+    def test_buffer_is_bounded_and_spans_carry_the_correlation_id(self):
+        tracer = Tracer(trace_file=None, max_events=3)
+        tracer.start()
+        with tracing.correlation("abc"):
+            for _ in range(5):
+                with tracer.span("work", step=1):
+                    pass
+        spans = [event for event in tracer.events() if event["ph"] == "X"]
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(spans[0]["args"], {"step": 1, "trace_id": "abc"})
+        self.assertIsNone(tracing.current_id())
+
+    def test_names_of_exited_threads_are_pruned(self):
+        tracer = Tracer(trace_file=None, max_events=10)
+        tracer.start()
+        # Names left by handler threads that have exited (no live thread has a negative ident)
+        tracer._thread_names = {-n: f"Thread-{n}" for n in range(1, tracing.MAX_THREAD_NAMES + 1)}
+
+        def handle_event():
+            with tracer.span("socket:end_turn"):
+                pass
+
+        thread = threading.Thread(target=handle_event, name="handler")
+        thread.start()
+        thread.join()
+
+        self.assertEqual(list(tracer._thread_names.values()), ["handler"])
+        # Buffered spans keep their thread's name after the thread has exited
+        names = {event["tid"]: event["args"]["name"] for event in tracer.events() if event["ph"] == "M"}
+        self.assertEqual(names, {thread.ident: "handler"})
+
+
+class TestCommandTrace(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.data_dir, "trace.json")
+        tracing.tracer.trace_file = self.trace_file
+        tracing.tracer.clear()
+        self.server = WebSocketServer()
+        self.game = HostedGame('1', self.data_dir, self.server, save_window=0)
+        self.game.start_game()
+
+    def tearDown(self):
+        tracing.tracer.enabled = False
+        tracing.tracer.clear()
+        shutil.rmtree(self.data_dir)
+
+    def test_end_turn_is_traced_through_save_and_broadcast(self):
+        http = self.server.app.test_client()
+        http.get('/trace?enable=1')
+        client = self.server.socketio.test_client(self.server.app, auth={'table': '1', 'role': 'player1'})
+        client.emit('end_turn', {'player_id': 1, 'trace_id': 'p1-test-1'})
+        client.disconnect()
+        self.game.close() # flushes the pending save write
+        trace = json.loads(http.get('/trace?enable=0').get_data(as_text=True))
+
+        names = {event["name"] for event in trace["traceEvents"] if event.get("args", {}).get("trace_id") == 'p1-test-1'}
+        for name in ("socket:end_turn", "save_game_state", "broadcast", "project:observers", "encode", "save_write"):
+            self.assertIn(name, names)
+        # Merged with the start_game save, so the write may be a compaction rather than a journal record
+        self.assertTrue(names & {"journal_encode", "journal_compact"})
+        self.assertTrue(os.path.exists(self.trace_file))
+
+    def test_trace_cannot_be_switched_from_another_host(self):
+        http = self.server.app.test_client()
+        response = http.get('/trace?enable=1', environ_base={'REMOTE_ADDR': '192.168.1.23'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(tracing.tracer.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
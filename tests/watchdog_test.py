@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+import unittest
+
+from diagnostics import watchdog
+from diagnostics.watchdog import StallWatchdog
+from websocket_server import WebSocketServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def blocking_call(event):
+    event.wait(5)
+
+
+class TestStallWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.watchdog = StallWatchdog(threshold=0.5, max_stalls=2, clock=self.clock)
+        self.watchdog.start()
+        self.watchdog.stop() # checks are driven by hand below
+
+    def stall(self, seconds):
+        self.clock.now += seconds
+        self.watchdog.check()
+        self.watchdog.heartbeat()
+        self.watchdog.check()
+
+    def test_short_gaps_are_not_stalls(self):
+        self.stall(0.2)
+        self.assertEqual(self.watchdog.total_stalls, 0)
+        self.assertEqual(self.watchdog.stalls(), [])
+
+    def test_stall_is_recorded_with_the_watched_threads_stack(self):
+        self.stall(1.5)
+        [stall] = self.watchdog.stalls()
+        self.assertEqual(stall["duration"], 1.5)
+        self.assertEqual(stall["samples"], 1)
+        self.assertIn("test_stall_is_recorded_with_the_watched_threads_stack", "".join(stall["stack"]))
+
+    def test_only_the_longest_stalls_are_kept(self):
+        for seconds in (1, 3, 2, 0.75):
+            self.stall(seconds)
+        self.assertEqual(self.watchdog.total_stalls, 4)
+        self.assertEqual([stall["duration"] for stall in self.watchdog.stalls()], [3, 2])
+        self.assertIn("3.00s", self.watchdog.format_report())
+
+
+class TestWatchdogThread(unittest.TestCase):
+    def test_blocked_thread_is_caught_in_the_blocking_call(self):
+        released = threading.Event()
+        worker = threading.Thread(target=blocking_call, args=(released,))
+        dog = StallWatchdog(threshold=0.05)
+        worker.start()
+        dog.start(target_thread=worker)
+        time.sleep(0.3)
+        dog.heartbeat()
+        time.sleep(0.1)
+        dog.stop()
+        released.set()
+        worker.join()
+        [stall] = dog.stalls()
+        self.assertGreaterEqual(stall["duration"], 0.2)
+        self.assertIn("blocking_call", "".join(stall["stack"]))
+
+
+class TestStallsRoute(unittest.TestCase):
+    def test_route_serves_the_report(self):
+        client = WebSocketServer().app.test_client()
+        report = json.loads(client.get('/stalls').data)
+        self.assertEqual(report["threshold"], watchdog.watchdog.threshold)
+        self.assertIn("stalls over", client.get('/stalls?format=text').get_data(as_text=True))
+
+    def test_route_is_not_served_to_another_host(self):
+        client = WebSocketServer().app.test_client()
+        response = client.get('/stalls', environ_base={'REMOTE_ADDR': '192.168.1.23'})
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+
+
+class ServerClock:
+    """
+    The timebase web clients render timers against.
+
+    Clients run a short handshake (`clock_sync` events, answered by
+    `sync_reply`) to estimate their offset from `now()` and the round-trip
+    time, then compute every timer locally from the anchors in the state:
+    elapsed = server_now - started_at. Anchors only change when a timer starts,
+    stops or a turn changes, so a running clock costs no broadcasts.
+
+    `now()` is wall-clock time, the same clock the game state's anchors are
+    stored in (they have to survive a restart), so anchors are sent unchanged.
+    If the wall clock is set later (a Pi without a real-time clock boots
+    before NTP syncs), the anchors and the server's own timer arithmetic move
+    with it, and clients follow at their next resync instead of being left a
+    fixed offset apart.
+    """
+
+    def __init__(self, wall=time.time):
+        self._wall = wall
+
+    def now(self):
+        return self._wall()
+
+    def from_wall(self, wall_time):
+        """A wall-clock timestamp from the game state as a client anchor (ms precision)."""
+        if not wall_time:
+            return None
+        return round(wall_time, 3)
+
+    def sync_reply(self, data):
+        """
+        Answers one handshake sample. The client sends its send time `t0`; with
+        its receive time t1, rtt = t1 - t0 and offset = server + rtt / 2 - t1.
+        """
+        t0 = data.get("t0") if isinstance(data, dict) else None
+        return {"t0": t0, "server": self.now()}
+
+
+# Shared by every table on this process so all clients sync to the same timebase
+server_clock = ServerClock()
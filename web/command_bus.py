@@ -0,0 +1,89 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+from diagnostics import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class CommandBus:
+    """
+    Carries work from other threads onto the one thread that owns the game state.
+
+    Socket handlers run on the Flask-SocketIO threads, but `game_state` and the
+    screens may only be touched from the Kivy main loop. A handler `submit`s a
+    command and gets a `Future` back; the main loop calls `drain()` once per
+    frame, which runs every queued command in submission order on that thread
+    and resolves its future with the return value (or the exception it raised).
+    The state itself needs no locks: only the draining thread ever writes it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._stats = {"submitted": 0, "executed": 0, "failed": 0, "batches": 0, "largest_batch": 0}
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues `fn(*args, **kwargs)` for the owning thread. Returns a Future for its result."""
+        future = Future()
+        with self._lock:
+            # The submitter's trace id goes with the command to the draining thread
+            self._pending.append((future, fn, args, kwargs, tracing.current_id()))
+            self._stats["submitted"] += 1
+        return future
+
+    def drain(self):
+        """
+        Runs the commands queued so far, in order, on the calling thread.
+        Commands they submit wait for the next drain. Returns how many ran.
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, deque()
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+        for future, fn, args, kwargs, trace_id in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with tracing.correlation(trace_id), tracing.span(f"command:{getattr(fn, '__name__', fn)}", batch=len(batch)):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.exception("Command %s failed", getattr(fn, "__name__", fn))
+                self._count("failed")
+                future.set_exception(e)
+            else:
+                self._count("executed")
+                future.set_result(result)
+        return len(batch)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+
+def ack_for(result, timeout=2.0):
+    """
+    Turns a callback's return value into a Socket.IO acknowledgement. A Future
+    (from `CommandBus.submit`) is waited on for up to `timeout` seconds.
+    """
+    if isinstance(result, Future):
+        try:
+            result = result.result(timeout)
+        except TimeoutError:
+            return {"ok": False, "error": "timeout"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    return {"ok": True, "result": result}
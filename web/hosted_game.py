@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+
+from diagnostics import tracing
+from game.engine import MAX_ROUNDS, GameEngine
+from persistence.journal import GameJournal
+from persistence.save_scheduler import SaveScheduler
+from state.model import PLAYER_IDS, GameState
+from state.snapshot import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+class HostedGame:
+    """
+    A game played entirely through web clients at one table of a `WebSocketServer`.
+
+    The local Kivy app owns the default table; every other table is one of these.
+    Each keeps its own state, snapshot store and save journal under
+    `<data_dir>/table_<id>/`, so tables are saved, resumed and broadcast
+    independently. There are no setup screens for a hosted table: `start_game`
+    takes the player names and the game goes straight into scoring. Clients
+    start the next game with a `new_game` event.
+    """
+
+    SAVE_FILE_NAME = "game_state.json"
+    SAVE_COALESCE_WINDOW_SECONDS = 0.25
+    MAX_ROUNDS = MAX_ROUNDS
+
+    def __init__(self, table_id, data_dir, server, save_window=SAVE_COALESCE_WINDOW_SECONDS):
+        self.table_id = str(table_id)
+        self.server = server
+        self.save_dir = os.path.join(data_dir, f"table_{self.table_id}")
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.journal = GameJournal(os.path.join(self.save_dir, self.SAVE_FILE_NAME))
+        # Web events for one table arrive on several server threads
+        self._lock = threading.RLock()
+        # Same rules as the local app's game screen
+        self.engine = GameEngine(max_rounds=self.MAX_ROUNDS)
+        self.load()
+        self.snapshots = SnapshotStore(self.game_state.to_dict())
+        self.save_scheduler = SaveScheduler(self.journal.record, window=save_window)
+        self.table = server.add_table(
+            self.table_id,
+            get_game_state_callback=self.get_game_state,
+            update_score_callback=self.handle_update_score,
+            increment_cp_callback=self.handle_increment_cp,
+            end_turn_callback=self.handle_end_turn,
+            concede_game_callback=self.handle_concede,
+            new_game_callback=self.handle_new_game,
+            update_game_phase_callback=self.handle_update_game_phase,
+            update_round_callback=self.handle_update_round,
+            update_timer_callback=self.handle_update_timer,
+        )
+
+    def load(self):
+        """Restores this table's last saved game, if any. Returns True if one was loaded."""
+        if not self.journal.has_saved_state():
+            return False
+        try:
+            loaded_state = self.journal.load()
+        except (ValueError, KeyError) as e:
+            logger.error(f"Could not load saved game for table {self.table_id}: {e}. Starting fresh.")
+            return False
+        if not loaded_state or 'game_phase' not in loaded_state:
+            return False
+        self.game_state = GameState.from_dict(loaded_state)
+        return True
+
+    @property
+    def game_state(self):
+        return self.engine.state
+
+    @game_state.setter
+    def game_state(self, state):
+        self.engine.state = state
+
+    def get_game_state(self):
+        return self.snapshots.current
+
+    def save(self):
+        """Publishes the current state, schedules it to be written and broadcasts it to the table."""
+        with tracing.span("save_game_state", table=self.table_id):
+            self.snapshots.publish(self.game_state.to_dict())
+            version, snapshot = self.snapshots.head
+            self.save_scheduler.request_save(snapshot, version=version)
+            self.server.broadcast_game_state(self.table_id)
+
+    def close(self):
+        """Writes any pending save and stops serving this table."""
+        self.save_scheduler.stop()
+        self.journal.close()
+        self.server.remove_table(self.table_id)
+
+    # --- Game flow ---
+
+    def start_game(self, player1_name="Player 1", player2_name="Player 2", first_player_id=1):
+        with self._lock:
+            engine = self.engine
+            engine.new_game()
+            engine.set_player_name(1, player1_name)
+            engine.set_player_name(2, player2_name)
+            # No roll-offs at a hosted table: the host picks who goes first
+            engine.choose_first_turn(first_player_id, chose_self=True)
+            engine.start_game()
+            self.save()
+
+    def handle_update_score(self, data):
+        player_id = data.get("player_id")
+        score_type = data.get("score_type", "primary")
+        value = data.get("value")
+        if player_id not in PLAYER_IDS or score_type not in ('primary', 'secondary') or isinstance(value, bool):
+            logger.warning(f"Table {self.table_id}: invalid score update {data}")
+            return False
+        try:
+            value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            logger.warning(f"Table {self.table_id}: invalid score update {data}")
+            return False
+        with self._lock:
+            self.engine.set_score(player_id, value, score_type)
+            self.save()
+
+    def handle_increment_cp(self, data):
+        player_id = data.get("player_id")
+        if player_id not in PLAYER_IDS:
+            logger.warning(f"Table {self.table_id}: invalid CP update {data}")
+            return
+        with self._lock:
+            if data.get("action") == "remove":
+                changed = self.engine.remove_cp(player_id)
+            else:
+                changed = self.engine.add_cp(player_id)
+            if changed:
+                self.save()
+
+    def handle_end_turn(self, data):
+        player_id = data.get("player_id")
+        with self._lock:
+            if player_id not in PLAYER_IDS or self.engine.end_turn(player_id) is None:
+                logger.info(f"Table {self.table_id}: player {player_id} tried to end turn out of turn.")
+                return
+            self.save()
+
+    def handle_concede(self, data):
+        with self._lock:
+            if self.engine.concede(data.get("player_id")) is not None:
+                self.save()
+
+    def handle_new_game(self, data):
+        """Starts a new game at this table (e.g. after game over), keeping the names unless new ones are sent."""
+        first_player_id = data.get("first_player_id", 1)
+        names = [data.get(f"player{player_id}_name") or self.game_state.players[player_id].name
+                 for player_id in PLAYER_IDS]
+        if first_player_id not in PLAYER_IDS or not all(isinstance(name, str) for name in names):
+            logger.warning(f"Table {self.table_id}: invalid new game request {data}")
+            return False
+        self.start_game(*names, first_player_id=first_player_id)
+
+    def handle_update_game_phase(self, data):
+        with self._lock:
+            if not self.engine.set_game_phase(data.get("phase")):
+                logger.warning(f"Table {self.table_id}: invalid game phase update {data}")
+                return False
+            self.save()
+
+    def handle_update_round(self, data):
+        with self._lock:
+            if not self.engine.set_round(data.get("round")):
+                logger.warning(f"Table {self.table_id}: invalid round update {data}")
+                return False
+            self.save()
+
+    def handle_update_timer(self, data):
+        # The trace id tags the command, it is not part of the timer
+        timer_data = {key: value for key, value in data.items() if key != "trace_id"}
+        with self._lock:
+            if not self.engine.update_timer(timer_data):
+                logger.warning(f"Table {self.table_id}: invalid timer update {data}")
+                return False
+            self.save()
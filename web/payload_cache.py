@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+
+class PayloadCache:
+    """
+    Encoded state payloads, keyed by what they encode (e.g. `("snapshot", 7, "json")`).
+
+    A given state version always encodes to the same bytes, so the first client
+    that needs it pays for the encode and every later request for that version
+    (other observers connecting, gap resyncs, a broadcast) reuses the result.
+    Only the last `capacity` entries are kept; older versions are never asked
+    for again once clients have moved on.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, encode):
+        """Returns the cached payload for `key`, calling `encode()` to build it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+        payload = encode()
+        with self._lock:
+            self._misses += 1
+            self._entries[key] = payload
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "entries": len(self._entries)}
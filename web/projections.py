@@ -0,0 +1,72 @@
+"""
+Per-role views of the game state sent to web clients.
+
+Every client at a table is in one role room: `player1`, `player2` (the phone
+pages at /player/<n>) or `observers` (the big-screen page at /). Each role only
+receives the fields its page renders, so spectators never see a player's
+primary/secondary breakdown and every role gets a smaller payload. A field a
+page starts rendering must be added here too.
+
+Timers go out as anchors on the `ServerClock` timebase (`started_at`,
+`turn_started_at`) rather than as elapsed values, so a running clock does not
+change any projection; clients compute the displays locally.
+"""
+
+from web.clock_sync import server_clock
+
+PLAYER_ROLES = {"player1": 1, "player2": 2}
+OBSERVER_ROLE = "observers"
+ROLES = tuple(PLAYER_ROLES) + (OBSERVER_ROLE,)
+
+_OBSERVER_FIELDS = (
+    "current_round", "active_player_id", "deployment_attacker_id", "last_round_played",
+    "game_phase", "status_message",
+)
+_OBSERVER_PLAYER_FIELDS = ("name", "total_score", "cp", "player_elapsed_time_seconds", "player_time_display")
+
+_PLAYER_FIELDS = ("current_round", "active_player_id", "deployment_attacker_id", "game_phase")
+# The player's own score breakdown is only shown on their own numpad
+_OWN_PLAYER_FIELDS = _OBSERVER_PLAYER_FIELDS + ("primary_score", "secondary_score")
+
+
+def role_from_auth(auth):
+    """Returns the role a client asked for in its connect auth, defaulting to observers."""
+    role = auth.get("role")
+    return role if role in ROLES else OBSERVER_ROLE
+
+
+def project(state, role, clock=server_clock):
+    """Returns the part of `state` that clients in `role` render."""
+    player_id = PLAYER_ROLES.get(role)
+    if player_id is None:
+        view = _pick(state, _OBSERVER_FIELDS)
+        for key in ("player1", "player2"):
+            if key in state:
+                view[key] = _pick(state[key], _OBSERVER_PLAYER_FIELDS)
+    else:
+        view = _pick(state, _PLAYER_FIELDS)
+        for key in ("player1", "player2"):
+            if key in state:
+                view[key] = _pick(state[key], _OWN_PLAYER_FIELDS if key == role else _OBSERVER_PLAYER_FIELDS)
+    if "game_timer" in state:
+        view["game_timer"] = project_timer(state["game_timer"], clock)
+    return view
+
+
+def project_timer(game_timer, clock=server_clock):
+    """
+    The game timer as clients see it: its status and display string, plus the
+    anchors to count from while it runs. Elapsed time is never sent.
+    """
+    view = {
+        "status": game_timer.get("status"),
+        "elapsed_display": game_timer.get("elapsed_display"),
+    }
+    if game_timer.get("status") == "running":
+        view["started_at"] = clock.from_wall(game_timer.get("start_time"))
+        view["turn_started_at"] = clock.from_wall(game_timer.get("turn_segment_start_time"))
+    return view
+
+
+def _pick(data, fields):
+    return {field: data[field] for field in fields if field in data}
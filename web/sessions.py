@@ -0,0 +1,72 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class ClientSession:
+    __slots__ = ("token", "sid", "role", "last_version", "last_seen")
+
+    def __init__(self, token, sid):
+        self.token = token
+        self.sid = sid
+        self.role = None
+        self.last_version = None
+        self.last_seen = time.time()
+
+
+class SessionRegistry:
+    """
+    Maps resumable session tokens to Socket.IO connections.
+
+    A token outlives the socket it was issued on, so a client that reconnects
+    after a Wi-Fi drop can present it together with the last state version it
+    applied. Tokens are only known to this server process: after a restart every
+    client is treated as new and gets a full snapshot, which keeps version
+    numbers from a previous run from being trusted. The least recently used
+    sessions are evicted once `capacity` is reached.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._sid_to_token = {}
+
+    def connect(self, sid, token=None):
+        """
+        Attaches `sid` to the session for `token`, or to a new session if the
+        token is unknown. Returns (session, resumed).
+        """
+        with self._lock:
+            session = self._sessions.get(token) if token else None
+            resumed = session is not None
+            if resumed:
+                self._sessions.move_to_end(token)
+                self._sid_to_token.pop(session.sid, None)
+                session.sid = sid
+            else:
+                session = ClientSession(secrets.token_urlsafe(16), sid)
+                self._sessions[session.token] = session
+                while len(self._sessions) > self.capacity:
+                    _, evicted = self._sessions.popitem(last=False)
+                    self._sid_to_token.pop(evicted.sid, None)
+            session.last_seen = time.time()
+            self._sid_to_token[sid] = session.token
+            return session, resumed
+
+    def disconnect(self, sid):
+        """Detaches the socket but keeps the session so it can be resumed."""
+        with self._lock:
+            token = self._sid_to_token.pop(sid, None)
+            session = self._sessions.get(token)
+            if session is not None:
+                session.sid = None
+                session.last_seen = time.time()
+
+    def get_by_sid(self, sid):
+        with self._lock:
+            return self._sessions.get(self._sid_to_token.get(sid))
+
+    def __len__(self):
+        return len(self._sessions)
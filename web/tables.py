@@ -0,0 +1,358 @@
+import logging
+import threading
+import time
+
+from flask_socketio import join_room
+
+from diagnostics import metrics, tracing
+from state.delta import clone_state, diff_state
+from state.history import VersionHistory
+from state.serialization import PreEncoded
+from state.snapshot import freeze
+from web.payload_cache import PayloadCache
+from web.projections import OBSERVER_ROLE, ROLES, project, role_from_auth
+from web.sessions import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class RoleChannel:
+    """
+    The state stream for one role at a table (see `web/projections.py`).
+
+    Clients in a role share one Socket.IO room and receive that role's
+    projection of the state, with its own version sequence, patch history and
+    payload cache. A role with no clients connected still tracks versions, so
+    a client joining later can be caught up, but nothing is encoded for it.
+
+    With a `min_interval`, broadcasts to the role are throttled: a broadcast
+    requested sooner than that after the last one is left pending, and only the
+    newest state is sent when the interval is up. Each pending request that a
+    newer one replaces is counted in `dropped`.
+    """
+
+    def __init__(self, table, role, history_size=256):
+        self.table = table
+        self.role = role
+        self.room = f"{table.room}:{role}"
+        # Clients that negotiated binary state frames; state events to them carry encoded bytes
+        self.binary_room = f"{self.room}:binary"
+        self.version = 0
+        self._last_sent_state = freeze({})
+        # Recent patches, so reconnecting clients can catch up without a snapshot
+        self.history = VersionHistory(history_size)
+        # Encoded snapshots/patches per state version, shared by every client that needs them
+        self.payload_cache = PayloadCache()
+        self.members = set()
+        self._binary_sids = set()
+        self.min_interval = 0.0
+        self.last_flush = 0.0
+        self.pending = False
+        self.dropped = 0
+
+    def join(self, sid, binary=False):
+        self.members.add(sid)
+        join_room(self.room)
+        if binary:
+            self._binary_sids.add(sid)
+            join_room(self.binary_room)
+
+    def leave(self, sid):
+        self.members.discard(sid)
+        self._binary_sids.discard(sid)
+
+    def flush(self, game_state, now):
+        """Broadcasts `game_state`, clearing any pending request. Returns the version."""
+        self.pending = False
+        self.last_flush = now
+        return self.advance(game_state)[0]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "clients": len(self.members),
+            "pending": self.pending,
+            "dropped": self.dropped,
+            "payload_cache": self.payload_cache.stats(),
+        }
+
+    def advance(self, game_state):
+        """
+        Projects `game_state` for this role and, if the projection differs from
+        the last one sent, assigns it the next version and broadcasts the
+        difference as a patch. Must be called with the table's state lock held
+        so versions go out in order. Returns (version, projected_state).
+        """
+        with tracing.span(f"project:{self.role}"):
+            view = project(game_state, self.role)
+        if self.version == 0:
+            self.version += 1
+        else:
+            ops = diff_state(self._last_sent_state, view)
+            if ops:
+                self.version += 1
+                # Values may be nested dicts still owned by the live state, so store a copy
+                self.history.append(self.version, clone_state(ops))
+                if self.members:
+                    patch = {'base': self.version - 1, 'version': self.version, 'ops': ops}
+                    self._emit_state('game_state_patch', patch, cache_key=('patch', self.version))
+        # Keep a frozen copy; subtrees that did not change are shared with the previous one
+        self._last_sent_state = freeze(view, self._last_sent_state)
+        return self.version, view
+
+    def latest(self, get_game_state):
+        """
+        The version and projection the role's room was last sent, for bringing
+        one client up to date. Emits nothing to the room, so one client's resync
+        never pushes an update to the others past the throttle; changes not yet
+        broadcast reach it with the room's next patch.
+        """
+        if self.version == 0:
+            # Nothing broadcast yet: version 1 is assigned without emitting
+            return self.advance(get_game_state())
+        return self.version, self._last_sent_state
+
+    def send_catch_up(self, sid, version, view, client_version):
+        """
+        Sends a client the changes since `client_version` as one patch, or a
+        full snapshot if that version is no longer in the history.
+        """
+        ops = None
+        if isinstance(client_version, int):
+            ops = self.history.ops_since(client_version, version)
+        if ops is None:
+            self.emit_snapshot(sid, version, view)
+        elif ops:
+            patch = {'base': client_version, 'version': version, 'ops': ops}
+            self._emit_state('game_state_patch', patch, to=sid)
+
+    def emit_snapshot(self, sid, version, view):
+        self._emit_state(
+            'game_state_update', lambda: dict(view, state_version=version),
+            to=sid, cache_key=('snapshot', version),
+        )
+
+    def _encoded(self, payload, binary, cache_key=None):
+        """
+        Returns `payload` encoded for JSON or binary clients. With a `cache_key`
+        the encoding is done once per key and reused by later emits.
+        """
+        def encode():
+            value = payload() if callable(payload) else payload
+            with tracing.span("encode", role=self.role, binary=binary):
+                if binary:
+                    return self.table.binary_serializer.dumps(value)
+                return PreEncoded(self.table.serializer.dumps(value))
+
+        if cache_key is None:
+            return encode()
+        return self.payload_cache.get(cache_key + (('binary' if binary else 'json'),), encode)
+
+    def _observe_size(self, event, encoded):
+        if isinstance(encoded, PreEncoded):
+            metrics.PAYLOAD_BYTES.labels(event, 'json').observe(len(encoded.text))
+        else:
+            metrics.PAYLOAD_BYTES.labels(event, self.table.binary_serializer.name).observe(len(encoded))
+
+    def _emit_state(self, event, payload, to=None, skip_sid=None, cache_key=None):
+        """
+        Emits a state event in each client's negotiated encoding. JSON clients get
+        pre-encoded JSON text; binary clients get a bytes frame. `payload` may be
+        a callable so a cache hit skips building it too.
+        """
+        socketio = self.table.socketio
+        if to is not None:
+            encoded = self._encoded(payload, to in self._binary_sids, cache_key)
+            self._observe_size(event, encoded)
+            socketio.emit(event, encoded, to=to)
+            return
+        json_skip = set(self._binary_sids)
+        if skip_sid is not None:
+            json_skip.add(skip_sid)
+        if len(json_skip) < len(self.members):
+            encoded = self._encoded(payload, False, cache_key)
+            self._observe_size(event, encoded)
+            with tracing.span(f"emit:{event}", role=self.role, clients=len(self.members) - len(json_skip)):
+                socketio.emit(event, encoded, to=self.room, skip_sid=list(json_skip))
+        if self._binary_sids:
+            encoded = self._encoded(payload, True, cache_key)
+            self._observe_size(event, encoded)
+            with tracing.span(f"emit:{event}", role=self.role, clients=len(self._binary_sids)):
+                socketio.emit(event, encoded, to=self.binary_room, skip_sid=skip_sid)
+
+
+class GameTable:
+    """
+    One game hosted by a `WebSocketServer`.
+
+    Each table has its own Socket.IO room, resumable sessions and one
+    `RoleChannel` per role, so tables never see each other's events and each
+    role only receives its own projection of the state. The callbacks connect
+    the table to whatever owns its game state (the Kivy app for the local
+    table, `HostedGame` for headless ones).
+    """
+
+    def __init__(
+        self,
+        table_id,
+        socketio,
+        serializer,
+        binary_serializer=None,
+        get_game_state_callback=None,
+        update_score_callback=None,
+        increment_cp_callback=None,
+        end_turn_callback=None,
+        concede_game_callback=None,
+        new_game_callback=None,
+        update_game_phase_callback=None,
+        update_round_callback=None,
+        update_timer_callback=None,
+        history_size=256,
+        observer_broadcast_hz=None,
+    ):
+        self.table_id = table_id
+        # Everyone at the table, for events that are the same for every role
+        self.room = f"table:{table_id}"
+        self.socketio = socketio
+        self.serializer = serializer
+        self.binary_serializer = binary_serializer
+        self.get_game_state_callback = get_game_state_callback
+        self.update_score_callback = update_score_callback
+        self.increment_cp_callback = increment_cp_callback
+        self.end_turn_callback = end_turn_callback
+        self.concede_game_callback = concede_game_callback
+        self.new_game_callback = new_game_callback
+        self.update_game_phase_callback = update_game_phase_callback
+        self.update_round_callback = update_round_callback
+        self.update_timer_callback = update_timer_callback
+        # Held while reading the state and advancing the channels, so versions go out in order
+        self._state_lock = threading.Lock()
+        self.channels = {role: RoleChannel(self, role, history_size) for role in ROLES}
+        # Players always get every change at once; spectators can be held to a few updates a second
+        if observer_broadcast_hz:
+            self.channels[OBSERVER_ROLE].min_interval = 1.0 / observer_broadcast_hz
+        self._flush_scheduled = False
+        # Trace id of the newest broadcast left pending, so the delayed flush is attributed to it
+        self._pending_trace_id = None
+        self._sid_channels = {}
+        self.sessions = SessionRegistry()
+        for role, channel in self.channels.items():
+            metrics.CONNECTED_CLIENTS.labels(table_id, role).set_function(lambda channel=channel: len(channel.members))
+
+    def connect(self, sid, auth):
+        """Registers a client that just connected (inside its connect handler)."""
+        role = role_from_auth(auth)
+        channel = self.channels[role]
+        session, resumed = self.sessions.connect(sid, auth.get('session'))
+        # A version is only meaningful for the role it was issued to
+        resumed = resumed and session.role == role
+        session.role = role
+        logger.info(
+            f"Client connected to table {self.table_id} as {role}: {sid} ({'resumed' if resumed else 'new'} session)"
+        )
+        join_room(self.room)
+        encoding = 'json'
+        binary = bool(self.binary_serializer) and auth.get('encoding') == self.binary_serializer.name
+        if binary:
+            encoding = self.binary_serializer.name
+        channel.join(sid, binary)
+        self._sid_channels[sid] = channel
+        self.socketio.emit(
+            'session',
+            {'token': session.token, 'encoding': encoding, 'table': self.table_id, 'role': role},
+            to=sid,
+        )
+        # Bring the client up to date: only the missed changes if it is resuming, else a snapshot
+        if self.get_game_state_callback:
+            client_version = auth.get('version') if resumed else None
+            self.send_catch_up(sid, session, client_version)
+        else:
+            logger.warning(f"No game state callback registered for table {self.table_id}, cannot send initial state.")
+
+    def disconnect(self, sid):
+        self.sessions.disconnect(sid)
+        channel = self._sid_channels.pop(sid, None)
+        if channel is not None:
+            channel.leave(sid)
+
+    def send_snapshot(self, sid):
+        """Sends the full, versioned state for the client's role to that client."""
+        channel = self._sid_channels[sid]
+        with self._state_lock:
+            version, view = channel.latest(self.get_game_state_callback)
+            channel.emit_snapshot(sid, version, view)
+
+    def send_catch_up(self, sid, session, client_version):
+        """
+        Sends a reconnecting client the changes since `client_version` as one
+        patch, or a full snapshot if that version is no longer in the history.
+        """
+        channel = self._sid_channels[sid]
+        with self._state_lock:
+            version, view = channel.latest(self.get_game_state_callback)
+            channel.send_catch_up(sid, version, view, client_version)
+            session.last_version = version
+
+    def broadcast(self):
+        """
+        Sends each role the changes to its projection since the last broadcast.
+        Throttled roles that broadcast too recently are left pending and flushed
+        in the background once their interval is up. Returns the new version of
+        each role that was sent to now.
+        """
+        with self._state_lock, metrics.BROADCAST_SECONDS.time(), tracing.span("broadcast", table=self.table_id):
+            now = time.monotonic()
+            game_state = None
+            versions = {}
+            delay = None
+            for role, channel in self.channels.items():
+                wait = channel.last_flush + channel.min_interval - now
+                if wait > 0:
+                    if channel.pending:
+                        channel.dropped += 1
+                    channel.pending = True
+                    self._pending_trace_id = tracing.current_id()
+                    delay = wait if delay is None else min(delay, wait)
+                    continue
+                # Read lazily: a burst that only updates pending roles never reads the state
+                if game_state is None:
+                    game_state = self.get_game_state_callback()
+                versions[role] = channel.flush(game_state, now)
+            if delay is not None and not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.socketio.start_background_task(self._flush_later, delay)
+            return versions
+
+    def flush_pending(self):
+        """Sends every pending throttled broadcast now, with the latest state."""
+        with self._state_lock:
+            self._flush_scheduled = False
+            pending = [channel for channel in self.channels.values() if channel.pending]
+            if pending:
+                started = time.perf_counter()
+                with tracing.correlation(self._pending_trace_id), tracing.span("flush_pending", table=self.table_id):
+                    game_state = self.get_game_state_callback()
+                    now = time.monotonic()
+                    for channel in pending:
+                        channel.flush(game_state, now)
+                metrics.BROADCAST_SECONDS.observe(time.perf_counter() - started)
+
+    def _flush_later(self, delay):
+        self.socketio.sleep(delay)
+        self.flush_pending()
+
+    def stats(self):
+        return {role: channel.stats() for role, channel in self.channels.items()}
+
+    def emit(self, event, data, roles=None):
+        """Emits a plain (non-state) event to everyone at this table, or only to the given roles."""
+        if roles is None:
+            self.socketio.emit(event, data, to=self.room)
+        else:
+            self.socketio.emit(event, data, to=[self.channels[role].room for role in roles])
+
+    def close(self):
+        for room in [self.room] + [room for channel in self.channels.values() for room in (channel.room, channel.binary_room)]:
+            self.socketio.close_room(room)
+        for role in self.channels:
+            metrics.CONNECTED_CLIENTS.remove(self.table_id, role)
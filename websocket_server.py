@@ -1,16 +1,36 @@
-from flask import Flask, send_from_directory, request, render_template
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, send_from_directory, request, render_template
+from flask_socketio import SocketIO
+import functools
 import json
 import threading
 from typing import Dict, Any, Optional
 import logging
-import os
+
+from diagnostics import metrics, tracing, watchdog
+from state.serialization import SocketIOJson, available_serializers, get_serializer
+from web.clock_sync import server_clock
+from web.command_bus import ack_for
+from web.projections import OBSERVER_ROLE
+from web.tables import GameTable
+
+# Player pages render everything from the state events; only the observer page handles these
+OBSERVER_ONLY = (OBSERVER_ROLE,)
+# Clients allowed to use the diagnostics routes that change server behaviour or show its code
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _applied(ack):
+    """Whether a command went through: it did not fail and its callback did not return False."""
+    return ack['ok'] and ack['result'] is not False
+
+
 class WebSocketServer:
+    # Table served at / and /player/<n>; the local Kivy app's game
+    DEFAULT_TABLE_ID = "default"
+
     def __init__(
         self,
         get_game_state_callback=None,
@@ -18,22 +38,73 @@ class WebSocketServer:
         increment_cp_callback=None,
         end_turn_callback=None,
         concede_game_callback=None,
+        new_game_callback=None,
+        update_game_phase_callback=None,
+        update_round_callback=None,
+        update_timer_callback=None,
         host: str = "0.0.0.0",
         port: int = 6969,
+        history_size: int = 256,
+        serializer=None,
+        observer_broadcast_hz: Optional[float] = None,
     ):
         self.app = Flask(__name__, static_folder="static")
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        self.serializer = serializer or get_serializer()
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", json=SocketIOJson(self.serializer))
+        # Binary encoding offered to clients that ask for it in their connect auth
+        self.binary_serializer = get_serializer("msgpack", binary=True) if "msgpack" in available_serializers() else None
         self.host = host
         self.port = port
+        self.history_size = history_size
+        # Timebase that clients sync to and that timer anchors are sent in
+        self.clock = server_clock
+        # Maximum state broadcasts per second to observer rooms; None sends every change at once
+        self.observer_broadcast_hz = observer_broadcast_hz
         self.server_thread: Optional[threading.Thread] = None
-        self.get_game_state_callback = get_game_state_callback
-        self.update_score_callback = update_score_callback
-        self.increment_cp_callback = increment_cp_callback
-        self.end_turn_callback = end_turn_callback
-        self.concede_game_callback = concede_game_callback
+        # Every game this server hosts, keyed by table id, and which table each client is at
+        self.tables: Dict[str, GameTable] = {}
+        self._sid_tables: Dict[str, GameTable] = {}
+        self.add_table(
+            self.DEFAULT_TABLE_ID,
+            get_game_state_callback=get_game_state_callback,
+            update_score_callback=update_score_callback,
+            increment_cp_callback=increment_cp_callback,
+            end_turn_callback=end_turn_callback,
+            concede_game_callback=concede_game_callback,
+            new_game_callback=new_game_callback,
+            update_game_phase_callback=update_game_phase_callback,
+            update_round_callback=update_round_callback,
+            update_timer_callback=update_timer_callback,
+        )
         self._setup_routes()
         self._setup_socket_handlers()
 
+    def add_table(self, table_id, **callbacks) -> GameTable:
+        """
+        Hosts another game on this server. Its clients connect with
+        `auth.table = table_id` and are served from /table/<table_id>/.
+        """
+        table_id = str(table_id)
+        if table_id in self.tables:
+            raise ValueError(f"Table {table_id} is already hosted")
+        table = GameTable(
+            table_id, self.socketio, self.serializer, self.binary_serializer,
+            history_size=self.history_size, observer_broadcast_hz=self.observer_broadcast_hz, **callbacks,
+        )
+        self.tables[table_id] = table
+        return table
+
+    def remove_table(self, table_id):
+        table = self.tables.pop(str(table_id), None)
+        if table is not None:
+            table.close()
+
+    def get_table(self, table_id=DEFAULT_TABLE_ID) -> Optional[GameTable]:
+        return self.tables.get(str(table_id))
+
+    def _table_for_sid(self, sid) -> Optional[GameTable]:
+        return self._sid_tables.get(sid)
+
     def _setup_routes(self):
         @self.app.route('/')
         def index():
@@ -41,97 +112,204 @@ class WebSocketServer:
 
         @self.app.route('/player/<int:player_id>')
         def player_client(player_id):
-            if player_id not in [1, 2]:
-                return "Invalid Player ID", 404
-            return render_template('player.html', player_id=player_id)
+            return self._render_player(self.DEFAULT_TABLE_ID, player_id)
+
+        @self.app.route('/table/<table_id>/')
+        def table_index(table_id):
+            if table_id not in self.tables:
+                return "Unknown table", 404
+            return send_from_directory(self.app.static_folder, 'index.html')
+
+        @self.app.route('/table/<table_id>/player/<int:player_id>')
+        def table_player_client(table_id, player_id):
+            return self._render_player(table_id, player_id)
+
+        @self.app.route('/table/<table_id>/<path:path>')
+        def serve_table_static(table_id, path):
+            # The observer page uses relative asset paths; every table shares the same files
+            return send_from_directory(self.app.static_folder, path)
+
+        @self.app.route('/metrics')
+        def serve_metrics():
+            return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+        @self.app.route('/trace')
+        def serve_trace():
+            # Switches tracing and writes files, so it is not open to the rest of the LAN
+            if request.remote_addr not in LOCAL_ADDRESSES:
+                return "Tracing is only available from the device itself", 403
+            # ?enable=1 starts recording spans, ?enable=0 stops and writes the trace file
+            enable = request.args.get('enable')
+            if enable == '1':
+                tracing.tracer.start()
+            elif enable == '0':
+                tracing.tracer.stop()
+            else:
+                tracing.tracer.save()
+            return Response(tracing.tracer.to_json(), content_type="application/json")
+
+        @self.app.route('/stalls')
+        def serve_stalls():
+            # Stacks show the app's source paths and code, so like /trace it stays on the device
+            if request.remote_addr not in LOCAL_ADDRESSES:
+                return "Stall reports are only available from the device itself", 403
+            # The longest Kivy main loop stalls with the main thread's stack; ?format=text for reading
+            if request.args.get('format') == 'text':
+                return Response(watchdog.watchdog.format_report(), content_type="text/plain; charset=utf-8")
+            return Response(json.dumps(watchdog.watchdog.report()), content_type="application/json")
 
         @self.app.route('/<path:path>')
         def serve_static(path):
             return send_from_directory(self.app.static_folder, path)
 
+    def _render_player(self, table_id, player_id):
+        if table_id not in self.tables:
+            return "Unknown table", 404
+        if player_id not in [1, 2]:
+            return "Invalid Player ID", 404
+        return render_template('player.html', player_id=player_id, table_id=table_id)
+
+    def _on(self, event):
+        """Registers a Socket.IO handler that is counted and timed in /metrics."""
+        received = metrics.EVENTS_RECEIVED.labels(event)
+        handler_seconds = metrics.HANDLER_SECONDS.labels(event)
+
+        def decorator(handler):
+            @functools.wraps(handler)
+            def instrumented(*args, **kwargs):
+                received.inc()
+                # Player pages tag each command with a trace id that follows it through save and broadcast
+                data = args[0] if args else None
+                trace_id = data.get('trace_id') if isinstance(data, dict) else None
+                with handler_seconds.time(), tracing.correlation(trace_id), tracing.span(f"socket:{event}"):
+                    return handler(*args, **kwargs)
+            self.socketio.on(event)(instrumented)
+            return handler
+        return decorator
+
     def _setup_socket_handlers(self):
-        @self.socketio.on('connect')
-        def handle_connect():
-            logger.info(f"Client connected: {request.sid}")
-            # Immediately send the current game state to the newly connected client
-            if self.get_game_state_callback:
-                game_state = self.get_game_state_callback()
-                emit('game_state_update', game_state)
-            else:
-                logger.warning("No game state callback registered, cannot send initial state.")
+        @self._on('connect')
+        def handle_connect(auth=None):
+            auth = auth if isinstance(auth, dict) else {}
+            table = self.get_table(auth.get('table') or self.DEFAULT_TABLE_ID)
+            if table is None:
+                logger.warning(f"Client {request.sid} asked for unknown table {auth.get('table')!r}")
+                return False
+            self._sid_tables[request.sid] = table
+            table.connect(request.sid, auth)
 
-        @self.socketio.on('disconnect')
+        @self._on('disconnect')
         def handle_disconnect():
+            table = self._sid_tables.pop(request.sid, None)
+            if table is not None:
+                table.disconnect(request.sid)
             logger.info(f"Client disconnected: {request.sid}")
 
-        @self.socketio.on('request_game_state')
-        def handle_game_state_request():
-            if self.get_game_state_callback:
-                game_state = self.get_game_state_callback()
-                emit("game_state_update", game_state)
+        @self._on('request_game_state')
+        def handle_game_state_request(data=None):
+            # Clients also send this when they detect a gap in the patch versions
+            table = self._table_for_sid(request.sid)
+            if table and table.get_game_state_callback:
+                if isinstance(data, dict) and data.get('version') is not None:
+                    logger.info(f"Client {request.sid} at version {data['version']} requested a snapshot")
+                table.send_snapshot(request.sid)
             else:
                 logger.warning("No game state callback registered")
 
-        @self.socketio.on("update_score")
+        @self._on('clock_sync')
+        def handle_clock_sync(data=None):
+            # Answered through the Socket.IO ack so the reply carries no other queued traffic
+            return self.clock.sync_reply(data)
+
+        @self._on("update_score")
         def handle_score_update(data):
-            if self.update_score_callback:
+            table = self._table_for_sid(request.sid)
+            if table and table.update_score_callback:
                 logger.info(f"Received score update event: {data}")
-                self.update_score_callback(data)
+                return ack_for(table.update_score_callback(data))
             else:
                 logger.warning("No score update callback registered.")
 
-        @self.socketio.on("increment_cp")
+        @self._on("increment_cp")
         def handle_cp_update(data):
-            if self.increment_cp_callback:
+            table = self._table_for_sid(request.sid)
+            if table and table.increment_cp_callback:
                 logger.info(f"Received CP increment event: {data}")
-                self.increment_cp_callback(data)
+                return ack_for(table.increment_cp_callback(data))
             else:
                 logger.warning("No CP increment callback registered.")
 
-        @self.socketio.on("end_turn")
+        @self._on("end_turn")
         def handle_end_turn(data):
-            if self.end_turn_callback:
+            table = self._table_for_sid(request.sid)
+            if table and table.end_turn_callback:
                 logger.info(f"Received end turn event: {data}")
-                self.end_turn_callback(data)
+                return ack_for(table.end_turn_callback(data))
             else:
                 logger.warning("No end turn callback registered.")
 
-        @self.socketio.on("concede_game")
+        @self._on("concede_game")
         def handle_concede_game(data):
-            if self.concede_game_callback:
+            table = self._table_for_sid(request.sid)
+            if table and table.concede_game_callback:
                 logger.info(f"Received concede game event: {data}")
-                self.concede_game_callback(data)
+                return ack_for(table.concede_game_callback(data))
             else:
                 logger.warning("No concede game callback registered.")
 
-        @self.socketio.on('update_game_phase')
+        @self._on("new_game")
+        def handle_new_game(data=None):
+            table = self._table_for_sid(request.sid)
+            if table and table.new_game_callback:
+                logger.info(f"Received new game event: {data}")
+                return ack_for(table.new_game_callback(data if isinstance(data, dict) else {}))
+            else:
+                logger.warning("No new game callback registered.")
+
+        # The state snapshots are read-only: like the commands above, these go to whoever owns the game
+        @self._on('update_game_phase')
         def handle_game_phase_update(data):
-            if self.get_game_state_callback:
-                game_state = self.get_game_state_callback()
-                new_phase = data.get('phase')
-                if new_phase is not None:
-                    game_state['phase'] = new_phase
-                    self.broadcast_game_phase_update(new_phase)
+            table = self._table_for_sid(request.sid)
+            new_phase = data.get('phase') if isinstance(data, dict) else None
+            if new_phase is None:
+                return
+            if table and table.update_game_phase_callback:
+                ack = ack_for(table.update_game_phase_callback(data))
+                if _applied(ack):
+                    self.broadcast_game_phase_update(new_phase, table.table_id)
                     logger.info(f"Game phase updated to: {new_phase}")
+                return ack
+            else:
+                logger.warning("No game phase update callback registered.")
 
-        @self.socketio.on('update_round')
+        @self._on('update_round')
         def handle_round_update(data):
-            if self.get_game_state_callback:
-                game_state = self.get_game_state_callback()
-                new_round = data.get('round')
-                if new_round is not None:
-                    game_state['round'] = new_round
-                    self.broadcast_round_update(new_round)
+            table = self._table_for_sid(request.sid)
+            new_round = data.get('round') if isinstance(data, dict) else None
+            if new_round is None:
+                return
+            if table and table.update_round_callback:
+                ack = ack_for(table.update_round_callback(data))
+                if _applied(ack):
+                    self.broadcast_round_update(new_round, table.table_id)
                     logger.info(f"Round updated to: {new_round}")
+                return ack
+            else:
+                logger.warning("No round update callback registered.")
 
-        @self.socketio.on('update_timer')
+        @self._on('update_timer')
         def handle_timer_update(data):
-            if self.get_game_state_callback:
-                game_state = self.get_game_state_callback()
-                if isinstance(data, dict) and 'status' in data:
-                    game_state['game_timer'] = data
-                    self.broadcast_timer_update(data)
+            table = self._table_for_sid(request.sid)
+            if not (isinstance(data, dict) and 'status' in data):
+                return
+            if table and table.update_timer_callback:
+                ack = ack_for(table.update_timer_callback(data))
+                if _applied(ack):
+                    self.broadcast_timer_update(data, table.table_id)
                     logger.info(f"Timer updated: {data}")
+                return ack
+            else:
+                logger.warning("No timer update callback registered.")
 
     def start(self):
         """Start the WebSocket server in a separate thread"""
@@ -154,37 +332,41 @@ class WebSocketServer:
             if self.server_thread.is_alive():
                 logger.warning("WebSocket server thread did not stop gracefully")
 
-    def broadcast_game_state(self):
+    def broadcast_game_state(self, table_id=DEFAULT_TABLE_ID):
         """
-        Broadcasts the sanitized game state to all connected clients
-        by calling the registered callback function.
+        Broadcasts the changes since the last broadcast to all clients at the
+        table as a versioned patch. Clients that miss a version ask for a snapshot.
         """
-        if self.get_game_state_callback:
-            game_state = self.get_game_state_callback()
-            self.socketio.emit('game_state_update', game_state)
-            logger.info("Broadcasted full game state update to all clients.")
+        table = self.get_table(table_id)
+        if table and table.get_game_state_callback:
+            versions = table.broadcast()
+            logger.info(f"Broadcasted game state versions {versions} to table {table.table_id}.")
         else:
-            logger.warning("Cannot broadcast game state: no callback registered.")
+            logger.warning(f"Cannot broadcast game state for table {table_id}: no callback registered.")
+
+    def stats(self):
+        """Per-table, per-role broadcast counters (versions, clients, dropped states, cache hits)."""
+        return {table_id: table.stats() for table_id, table in self.tables.items()}
 
-    def broadcast_score_update(self, player_id: int, new_score: int):
-        """Broadcast score update to all connected clients"""
-        self.socketio.emit("score_update", {"player_id": player_id, "score": new_score})
+    def broadcast_score_update(self, player_id: int, new_score: int, table_id=DEFAULT_TABLE_ID):
+        """Broadcast score update to the observers at a table"""
+        self.get_table(table_id).emit("score_update", {"player_id": player_id, "score": new_score}, roles=OBSERVER_ONLY)
 
-    def broadcast_cp_update(self, player_id: int, new_cp: int):
-        """Broadcast CP update to all connected clients"""
-        self.socketio.emit('cp_update', {
+    def broadcast_cp_update(self, player_id: int, new_cp: int, table_id=DEFAULT_TABLE_ID):
+        """Broadcast CP update to the observers at a table"""
+        self.get_table(table_id).emit('cp_update', {
             'player_id': player_id,
             'cp': new_cp
-        })
+        }, roles=OBSERVER_ONLY)
 
-    def broadcast_timer_update(self, timer_data: Dict[str, Any]):
-        """Broadcast timer update to all connected clients"""
-        self.socketio.emit('timer_update', timer_data)
+    def broadcast_timer_update(self, timer_data: Dict[str, Any], table_id=DEFAULT_TABLE_ID):
+        """Broadcast timer update to the observers at a table"""
+        self.get_table(table_id).emit('timer_update', timer_data, roles=OBSERVER_ONLY)
 
-    def broadcast_round_update(self, round_number: int):
-        """Broadcast round update to all connected clients"""
-        self.socketio.emit('round_update', {'round': round_number})
+    def broadcast_round_update(self, round_number: int, table_id=DEFAULT_TABLE_ID):
+        """Broadcast round update to the observers at a table"""
+        self.get_table(table_id).emit('round_update', {'round': round_number}, roles=OBSERVER_ONLY)
 
-    def broadcast_game_phase_update(self, phase: str):
-        """Broadcast game phase update to all connected clients"""
-        self.socketio.emit("game_phase_update", {"phase": phase}) 
\ No newline at end of file
+    def broadcast_game_phase_update(self, phase: str, table_id=DEFAULT_TABLE_ID):
+        """Broadcast game phase update to the observers at a table"""
+        self.get_table(table_id).emit("game_phase_update", {"phase": phase}, roles=OBSERVER_ONLY) 
@@ -81,21 +81,21 @@ class ConnectPopup(Popup):
         # Observer Client
         observer_box = BoxLayout(orientation='vertical')
         observer_box.add_widget(Label(text="Observer Client", font_size='18sp'))
-        observer_qr = Image(source=app.observer_qr_path)
+        observer_qr = Image(texture=app.qr_textures.get('observer'))
         observer_box.add_widget(observer_qr)
         grid.add_widget(observer_box)
 
         # Player 1 Client
         p1_box = BoxLayout(orientation='vertical')
         p1_box.add_widget(Label(text="Player 1 Client", font_size='18sp'))
-        p1_qr = Image(source=app.p1_qr_path)
+        p1_qr = Image(texture=app.qr_textures.get('player1'))
         p1_box.add_widget(p1_qr)
         grid.add_widget(p1_box)
 
         # Player 2 Client
         p2_box = BoxLayout(orientation='vertical')
         p2_box.add_widget(Label(text="Player 2 Client", font_size='18sp'))
-        p2_qr = Image(source=app.p2_qr_path)
+        p2_qr = Image(texture=app.qr_textures.get('player2'))
         p2_box.add_widget(p2_qr)
         grid.add_widget(p2_box)
         return grid
@@ -0,0 +1,134 @@
+"""
+QR codes for the web client URLs, cached on disk across restarts.
+
+Entries are content-addressed: the file name is a hash of the URL and the
+texture size, and holds the QR code already scaled to that size as 8-bit grey
+pixels. The URLs only change when `get_local_ip()` does, so a normal boot finds
+every code on disk. It neither imports `qrcode` nor decodes a PNG. The bytes
+go straight into a texture (`texture()`, main thread only). On a miss the code
+is rendered from the `qrcode` module matrix (no PIL image, no PNG) and written
+to the cache. The least recently used files beyond `max_files` are deleted, so
+a device that moves between networks does not fill `.cache/`.
+
+`pixels()` does the file and `qrcode` work and is called from the splash
+screen's background thread; this module only imports Kivy inside `texture()`.
+"""
+
+import hashlib
+import math
+import os
+import threading
+
+from persistence.atomic_file import atomic_write
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "qr")
+QR_PORT = 6969
+QR_SIZE = 300 # Texture side in pixels; the name entry screen shows the codes at 150dp
+BORDER = 4 # Quiet zone, in modules, as qrcode.make() adds
+DARK, LIGHT = b"\x00", b"\xff"
+
+
+def client_urls(ip, port=QR_PORT):
+    """The URL each QR code on the name entry screen and the network popup points at."""
+    return {
+        "observer": f"http://{ip}:{port}/",
+        "player1": f"http://{ip}:{port}/player/1",
+        "player2": f"http://{ip}:{port}/player/2",
+    }
+
+
+def scale_matrix(matrix, size):
+    """
+    Scales a QR module matrix (rows of booleans, True is dark) by the largest
+    whole factor that fits `size`. Returns (side, pixels): grey bytes, bottom
+    row first as Kivy textures expect.
+    """
+    modules = len(matrix)
+    scale = max(1, size // modules)
+    dark, light = DARK * scale, LIGHT * scale
+    rows = [b"".join(dark if module else light for module in row) * scale for row in reversed(matrix)]
+    return modules * scale, b"".join(rows)
+
+
+def render_pixels(url, size):
+    """Renders `url` with the qrcode module (imported here, only on a cache miss)."""
+    import qrcode
+    qr = qrcode.QRCode(border=BORDER)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return scale_matrix(qr.get_matrix(), size)
+
+
+class QRCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, renderer=render_pixels, max_files=12):
+        self.cache_dir = cache_dir
+        self.renderer = renderer
+        self.max_files = max_files
+        self._pixels = {} # (url, size) -> (side, pixels)
+        self._textures = {} # (url, size) -> Texture
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+
+    @staticmethod
+    def key(url, size):
+        return hashlib.sha1(f"{size}:{url}".encode("utf-8")).hexdigest()
+
+    def path(self, url, size):
+        return os.path.join(self.cache_dir, self.key(url, size) + ".qr")
+
+    def pixels(self, url, size=QR_SIZE):
+        """Returns (side, pixels) for `url`, from memory, then disk, rendering it only if neither has it."""
+        with self._lock:
+            cached = self._pixels.get((url, size))
+            if cached is not None:
+                self.memory_hits += 1
+                return cached
+            path = self.path(url, size)
+            cached = self._read(path)
+            if cached is not None:
+                self.disk_hits += 1
+                os.utime(path) # Marks the file as recently used for prune()
+            else:
+                cached = self.renderer(url, size)
+                self.renders += 1
+                os.makedirs(self.cache_dir, exist_ok=True)
+                atomic_write(path, cached[1])
+                self.prune()
+            self._pixels[(url, size)] = cached
+            return cached
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        side = math.isqrt(len(data))
+        if not data or side * side != len(data):
+            return None # Truncated or foreign file; rendered again and replaced
+        return side, data
+
+    def prune(self):
+        """Deletes the least recently used cache files beyond `max_files`. Returns how many went."""
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".qr")]
+        except FileNotFoundError:
+            return 0
+        paths = sorted((os.path.join(self.cache_dir, name) for name in names), key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_files:]:
+            os.remove(path)
+        return max(0, len(paths) - self.max_files)
+
+    def texture(self, url, size=QR_SIZE):
+        """The QR code for `url` as a Kivy texture. Main thread only; reuses the texture once made."""
+        texture = self._textures.get((url, size))
+        if texture is None:
+            from kivy.graphics.texture import Texture
+            side, data = self.pixels(url, size)
+            texture = Texture.create(size=(side, side), colorfmt="luminance")
+            texture.mag_filter = "nearest" # Keeps module edges sharp when the widget scales it up
+            texture.blit_buffer(data, colorfmt="luminance", bufferfmt="ubyte")
+            self._textures[(url, size)] = texture
+        return texture